@@ -1,34 +1,95 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel import Session, select
+from sqlalchemy import event
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from App.auth.cache import TTLCache
 from App.models.models import User
 from App.models.db import get_session
 import os
 import hashlib
+import time
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Argon2 costs; after a change, passwords are rehashed as their users log in
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+# Hashes computed at once; more logins than this queue rather than add load
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
 # Password hashing
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+
+# argon2 releases the GIL while hashing, so threads hash in parallel
+# without blocking the event loop
+_hash_pool: Optional[ThreadPoolExecutor] = None
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
+# Decoded token payloads by token, and users by id, so authenticating a
+# request normally takes neither a signature check nor a query. Each
+# server process has its own; the TTL bounds how long another process
+# can keep serving a user this one changed.
+token_cache = TTLCache()
+user_cache = TTLCache()
+
+
+def invalidate_user(user_id: int):
+    """Make the next request of this user load it from the database again"""
+    user_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User):
+    # Runs on flush of any ORM change to a user; bulk UPDATE/DELETE
+    # statements skip it and have to call invalidate_user themselves
+    invalidate_user(target.id)
+
+
+def _get_hash_pool() -> ThreadPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="argon2")
+    return _hash_pool
+
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def _in_hash_pool(func: Callable, *args):
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_pool(), func, *args)
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password using argon2, on the hashing pool"""
+    return await _in_hash_pool(pwd_context.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash, on the hashing pool"""
+    return await _in_hash_pool(pwd_context.verify, plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -61,11 +122,20 @@ def decode_token(token: str) -> dict:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ) -> User:
-    """Get the current authenticated user from the token"""
+    """Get the current authenticated user from the token.
+
+    Served from token_cache and user_cache when possible; the user is then
+    shared between requests and must not be modified or added to a session.
+    """
     token = credentials.credentials
-    payload = decode_token(token)
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_token(token)
+        # Never cached past its expiry
+        exp = payload.get("exp")
+        token_cache.put(token, payload, exp - time.time() if isinstance(exp, (int, float)) else None)
     
     user_id: int = payload.get("user_id")
     if user_id is None:
@@ -74,26 +144,41 @@ async def get_current_user(
             detail="Invalid authentication credentials",
         )
     
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
     # Get user from database
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
     
+    user_cache.put(user_id, user)
     return user
 
 
-def authenticate_user(session: Session, email: str, password: str) -> Optional[User]:
-    """Authenticate a user by email and password"""
+async def authenticate_user(session: AsyncSession, email: str, password: str) -> Optional[User]:
+    """Authenticate a user by email and password.
+
+    A password hashed with other argon2 costs than the configured ones is
+    rehashed with them.
+    """
     statement = select(User).where(User.email == email)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
     
     if not user:
         return None
     
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await _in_hash_pool(pwd_context.verify_and_update, password, user.hashed_password)
+    if not valid:
         return None
+
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        session.add(user)
+        await session.commit()
     
     return user
\ No newline at end of file
@@ -1,11 +1,42 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from App.auth.auth import shutdown_hash_pool
+from App.models.db import close_database
+from App.services.benchmarks import start_benchmark_scheduler, stop_benchmark_scheduler
+from App.services.http_client import start_http_client, close_http_client
+from App.services.jobs import start_job_runner, stop_job_runner
+from App.services.load_workers import shutdown_worker_pool
+from App.services.log_writer import start_log_writer, stop_log_writer
+
 from App.routes.proxy import router as proxy_router
 from App.routes.auth import router as auth_router
 from App.routes.rate_limit import router as rate_limit_router
 from App.routes.open_api import router as openapi_router 
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled upstream client for the whole app, so repeated calls reuse connections
+    await start_http_client()
+    await start_log_writer()
+    await start_job_runner()
+    await start_benchmark_scheduler()
+    try:
+        yield
+    finally:
+        await stop_benchmark_scheduler()
+        await stop_job_runner()
+        shutdown_worker_pool()
+        shutdown_hash_pool()
+        # After the producers stop, so every queued proxy log is flushed
+        await stop_log_writer()
+        await close_http_client()
+        await close_database()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,6 +44,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read by the frontend to revalidate OpenAPI indexes
+    expose_headers=["ETag"],
 )
 
 app.include_router(proxy_router)
@@ -1,8 +1,62 @@
-from sqlmodel import create_engine, Session
+import os
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from App.models.models import DATABASE_URL
 
-engine = create_engine(DATABASE_URL, echo=True)
+# Configuration
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() in ("1", "true", "yes")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
 
-def get_session():
-    with Session(engine) as session:
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync SQLite driver for aiosqlite, other URLs must already name an async driver"""
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    return url
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run while the proxy log writer is inserting
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA cache_size=-20000")  # ~20 MB
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+# Sync engine, used by Alembic and one-off scripts
+engine = create_engine(DATABASE_URL, echo=SQL_ECHO)
+
+# Async engine, used by every route and background task
+async_engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    echo=SQL_ECHO,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+)
+
+if IS_SQLITE:
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+
+async_session = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def get_session():
+    async with async_session() as session:
         yield session
+
+
+async def close_database():
+    """Dispose of pooled connections, called from the app lifespan"""
+    await async_engine.dispose()
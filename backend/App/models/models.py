@@ -3,7 +3,7 @@ from typing import Optional, List
 import datetime  
 from datetime import timezone, datetime 
 import os
-from sqlalchemy import Column
+from sqlalchemy import Column, Index, UniqueConstraint
 from sqlalchemy.dialects.sqlite import JSON
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./App/database.db")
@@ -25,18 +25,57 @@ class User(SQLModel, table=True):
 
 class ProxyLog(SQLModel, table=True):
     __tablename__ = "proxy_logs"
+    __table_args__ = (
+        # Serves the per-user history, newest first, with (timestamp, id) as the page cursor
+        Index("ix_proxy_logs_user_id_timestamp_id", "user_id", "timestamp", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
     method: str
     url: str
+    host: Optional[str] = None
     status_code: Optional[int] = None
     response_time_ms: int
     timestamp: datetime = Field(default_factory=get_utc_now, index=True)
 
+    # Phase breakdown in milliseconds, see services/timings.py.
+    # dns, connect and tls stay null when a pooled connection was reused.
+    queue_ms: Optional[float] = None
+    dns_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+    download_ms: Optional[float] = None
+
     user: Optional[User] = Relationship(back_populates="proxy_logs")
 
 
+class ProxyLogRollup(SQLModel, table=True):
+    """Pre-aggregated proxy traffic per user, time bucket, host and endpoint.
+
+    Updated as logs are written, so analytics never scan proxy_logs. Rows
+    with endpoint "*" hold the totals of the whole host.
+    """
+    __tablename__ = "proxy_log_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "granularity", "bucket_start", "host", "endpoint", name="uq_proxy_log_rollups_key"),
+        Index("ix_proxy_log_rollups_lookup", "user_id", "granularity", "endpoint", "bucket_start"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    granularity: str  # minute, hour or day
+    bucket_start: datetime
+    host: str
+    endpoint: str  # "METHOD /path" with id-like segments collapsed, or "*"
+
+    request_count: int = 0
+    error_count: int = 0
+    # Sparse LatencyHistogram.to_dict(), merged to answer percentile queries
+    latency: dict = Field(sa_column=Column(JSON))
+
+
 class SavedRequest(SQLModel, table=True):
     __tablename__ = "saved_requests"
 
@@ -48,5 +87,62 @@ class SavedRequest(SQLModel, table=True):
     url: str
     headers: dict = Field(sa_column=Column(JSON))
     body: dict | None = Field(default=None, sa_column=Column(JSON))
+    # Groups requests that are run together as a batch
+    collection: Optional[str] = Field(default=None, index=True)
+
+    # Benchmarked requests are sent benchmark_iterations times per run, on
+    # demand and, when benchmark_interval (seconds) is set, on a schedule
+    benchmark: bool = Field(default=False, index=True)
+    benchmark_iterations: int = 20
+    benchmark_interval: Optional[int] = None
+    last_benchmark_at: Optional[datetime] = None
 
     created_at: datetime = Field(default_factory=get_utc_now)
+
+
+class BenchmarkRun(SQLModel, table=True):
+    __tablename__ = "benchmark_runs"
+    __table_args__ = (
+        # Serves a request's run history and its rolling baseline, newest first
+        Index("ix_benchmark_runs_saved_request_id_started_at", "saved_request_id", "started_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    saved_request_id: int = Field(foreign_key="saved_requests.id")
+    user_id: int = Field(foreign_key="users.id", index=True)
+
+    # "manual" or "schedule"
+    trigger: str
+    started_at: datetime = Field(default_factory=get_utc_now)
+    iterations: int
+    # Latency of every iteration that got a response, in milliseconds
+    samples: list = Field(sa_column=Column(JSON))
+    # Iterations per status code, "error" for those that got no response
+    status_counts: dict = Field(sa_column=Column(JSON))
+    p50_ms: Optional[float] = None
+    p90_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    # Percentile deltas and significance against the runs before it
+    comparison: dict | None = Field(default=None, sa_column=Column(JSON))
+    regression: bool = Field(default=False, index=True)
+
+
+class RateLimitJob(SQLModel, table=True):
+    __tablename__ = "rate_limit_jobs"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id", index=True)
+
+    # queued -> running -> completed | failed | cancelled
+    status: str = Field(default="queued", index=True)
+    request: dict = Field(sa_column=Column(JSON))
+    progress: dict | None = Field(default=None, sa_column=Column(JSON))
+    result: dict | None = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+    cancel_requested: bool = False
+
+    created_at: datetime = Field(default_factory=get_utc_now, index=True)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Touched by the worker holding the job; a stale one means that worker is gone
+    heartbeat_at: Optional[datetime] = None
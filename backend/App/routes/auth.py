@@ -1,20 +1,21 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from App.schemas.auth import UserRegister, UserLogin, Token, UserResponse
 from App.models.models import User
 from App.models.db import get_session
-from App.auth.auth import hash_password, authenticate_user, create_access_token, get_current_user
+from App.auth.auth import hash_password, authenticate_user, create_access_token, get_current_user, token_cache, user_cache
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister, session: Session = Depends(get_session)):
+async def register(user_data: UserRegister, session: AsyncSession = Depends(get_session)):
     """Register a new user"""
     
     # Check if email already exists
     statement = select(User).where(User.email == user_data.email)
-    existing_user = session.exec(statement).first()
+    existing_user = (await session.exec(statement)).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -23,7 +24,7 @@ async def register(user_data: UserRegister, session: Session = Depends(get_sessi
     
     # Check if username already exists
     statement = select(User).where(User.username == user_data.username)
-    existing_user = session.exec(statement).first()
+    existing_user = (await session.exec(statement)).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -31,7 +32,7 @@ async def register(user_data: UserRegister, session: Session = Depends(get_sessi
         )
     
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     new_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -39,17 +40,17 @@ async def register(user_data: UserRegister, session: Session = Depends(get_sessi
     )
     
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
+    await session.refresh(new_user)
     
     return new_user
 
 
 @router.post("/login", response_model=Token)
-async def login(credentials: UserLogin, session: Session = Depends(get_session)):
+async def login(credentials: UserLogin, session: AsyncSession = Depends(get_session)):
     """Login and get access token"""
     
-    user = authenticate_user(session, credentials.email, credentials.password)
+    user = await authenticate_user(session, credentials.email, credentials.password)
     
     if not user:
         raise HTTPException(
@@ -69,4 +70,10 @@ async def login(credentials: UserLogin, session: Session = Depends(get_session))
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: User = Depends(get_current_user)):
     """Get current user information"""
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+@router.get("/cache-stats")
+async def get_auth_cache_stats(current_user: User = Depends(get_current_user)):
+    """Hit and miss counts of the token and user caches of this server process"""
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
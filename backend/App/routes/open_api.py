@@ -1,259 +1,197 @@
 # routes/openapi.py
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 import httpx
-from urllib.parse import urlparse
 from App.auth.auth import get_current_user
 from App.models.models import User
+from App.routes.rate_limit import sse_event
+from App.services.compression import etag_matches
+from App.services.http_client import get_http_client
+from App.services.openapi_cache import ParsedSpec, SpecFetchError, spec_cache
+from App.services.openapi_parser import SpecError
 
 router = APIRouter(prefix="/api", tags=["openapi"])
 
+# Index entries per "endpoints" event of /load-openapi/stream
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+
+def load_error(e: Exception) -> HTTPException:
+    """What a failed spec load is reported as"""
+    if isinstance(e, (SpecError, SpecFetchError)):
+        return HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, httpx.TimeoutException):
+        return HTTPException(
+            status_code=400, 
+            detail="Request timeout. The spec URL took too long to respond."
+        )
+    if isinstance(e, httpx.HTTPError):
+        return HTTPException(
+            status_code=400, 
+            detail=f"Network error: {str(e)}"
+        )
+    return HTTPException(
+        status_code=500, 
+        detail=f"Error parsing spec: {str(e)}"
+    )
+
+
+def index_response(parsed: ParsedSpec, cached: bool, request: Request, conditional: bool = False) -> Response:
+    """The precompressed index, or a 304 for a conditional request that matches it"""
+    headers = {
+        "ETag": parsed.etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "private, no-cache",
+        "X-Spec-Cache": "hit" if cached else "miss",
+    }
+    if conditional and etag_matches(request.headers.get("if-none-match"), parsed.etag):
+        return Response(status_code=304, headers=headers)
+
+    body, encoding = parsed.index.encoded(request.headers.get("accept-encoding"))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.post("/load-openapi")
 async def load_openapi(
     payload: dict,
+    request: Request,
     current_user: User = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(get_http_client),
 ):
+    """A compact index of a spec's endpoints: id, method, path, url, summary and tags.
+
+    Operation details come from /openapi/{spec_id}/operations/{id}. Parses
+    are cached across users by content hash and revalidated with a
+    conditional GET, so reloading an unchanged spec skips parsing and
+    re-encoding altogether; the index is sent precompressed (gzip or
+    brotli). Clients revalidate what they hold with GET /openapi/{spec_id}.
+    """
     spec_url = payload.get("spec_url")
     
     if not spec_url:
         raise HTTPException(status_code=400, detail="spec_url is required")
     
     try:
-        async with httpx.AsyncClient(timeout=15, follow_redirects=True) as client:
-            res = await client.get(spec_url)
-            
-            if res.status_code != 200:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Failed to fetch spec: HTTP {res.status_code}"
-                )
-            
-            # Check content type
-            content_type = res.headers.get("content-type", "").lower()
-            
-            # Try to parse as JSON
-            try:
-                spec = res.json()
-            except Exception as json_err:
-                # Check if it's HTML
-                if "text/html" in content_type or res.text.strip().startswith("<!DOCTYPE") or res.text.strip().startswith("<html"):
-                    raise HTTPException(
-                        status_code=400,
-                        detail="URL returned HTML instead of JSON. Make sure you're using the direct spec URL (e.g., /openapi.json or /swagger.json), not the docs page URL."
-                    )
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid JSON response. Content-Type: {content_type}. Error: {str(json_err)}"
-                )
-            
-            # Validate it's an OpenAPI spec
-            if "openapi" not in spec and "swagger" not in spec:
-                raise HTTPException(
-                    status_code=400, 
-                    detail="Invalid OpenAPI spec: missing 'openapi' or 'swagger' field. This doesn't appear to be a valid OpenAPI specification."
-                )
-            
-            # Parse endpoints
-            endpoints = []
-            base_url = ""
-            
-            # Get base URL from servers
-            servers = spec.get("servers", [])
-            if servers and len(servers) > 0:
-                server_url = servers[0].get("url", "")
-                if server_url:
-                    base_url = server_url.rstrip('/')
-            
-            # If no base_url from servers, try to extract from spec_url
-            if not base_url:
-                parsed = urlparse(spec_url)
-                base_url = f"{parsed.scheme}://{parsed.netloc}"
-            
-            # Parse paths
-            paths = spec.get("paths", {})
-            
-            if not paths:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No paths found in OpenAPI spec"
-                )
-            
-            for path, methods in paths.items():
-                for method, details in methods.items():
-                    method_upper = method.upper()
-                    if method_upper in ["GET", "POST", "PUT", "DELETE", "PATCH"]:
-                        
-                        # Extract request body examples
-                        request_body_example = None
-                        examples_list = []
-                        
-                        request_body = details.get("requestBody", {})
-                        if request_body:
-                            content = request_body.get("content", {})
-                            json_content = content.get("application/json", {})
-                            schema = json_content.get("schema", {})
-                            
-                            # Extract multiple examples if present (OpenAPI 3.0 format)
-                            examples = json_content.get("examples", {})
-                            if examples and isinstance(examples, dict):
-                                for example_name, example_data in examples.items():
-                                    if isinstance(example_data, dict):
-                                        examples_list.append({
-                                            "name": example_data.get("summary") or example_data.get("name") or example_name,
-                                            "description": example_data.get("description", ""),
-                                            "value": example_data.get("value"),
-                                        })
-                            
-                            # Single example (older format)
-                            single_example = json_content.get("example")
-                            if single_example and not examples_list:
-                                request_body_example = single_example
-                            elif examples_list and len(examples_list) > 0:
-                                # Use first example as default
-                                request_body_example = examples_list[0].get("value")
-                            elif not examples_list and not single_example:
-                                # Generate from schema if no examples (resolve $ref first)
-                                resolved_schema = resolve_schema_ref(schema, spec)
-                                request_body_example = generate_example_from_schema(resolved_schema)
-                        
-                        # Extract parameters
-                        parameters = details.get("parameters", [])
-                        
-                        # Build full URL
-                        full_url = f"{base_url}{path}" if base_url else path
-                        
-                        endpoint = {
-                            "method": method_upper,
-                            "path": path,
-                            "url": full_url,
-                            "summary": details.get("summary", ""),
-                            "description": details.get("description", ""),
-                            "parameters": parameters,
-                            "requestBodyExample": request_body_example,
-                            "examples": examples_list,
-                            "tags": details.get("tags", []),
-                        }
-                        endpoints.append(endpoint)
-            
-            return {
-                "spec": spec,
-                "endpoints": endpoints,
-                "info": spec.get("info", {}),
-                "servers": servers,
-                "version": spec.get("openapi") or spec.get("swagger"),
-            }
-    
-    except HTTPException:
-        raise
-    except httpx.TimeoutException:
-        raise HTTPException(
-            status_code=400, 
-            detail="Request timeout. The spec URL took too long to respond."
-        )
-    except httpx.HTTPError as e:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Network error: {str(e)}"
-        )
+        parsed, cached = await spec_cache.load(client, spec_url)
     except Exception as e:
-        raise HTTPException(
-            status_code=500, 
-            detail=f"Error parsing spec: {str(e)}"
-        )
+        raise load_error(e)
+    return index_response(parsed, cached, request)
 
 
-def resolve_schema_ref(schema, spec):
-    """Resolve $ref in schema to actual schema definition"""
-    if not isinstance(schema, dict):
-        return schema
-    
-    if "$ref" in schema:
-        ref = schema["$ref"]
-        # $ref format: "#/components/schemas/SchemaName"
-        parts = ref.split("/")
-        if len(parts) >= 4 and parts[0] == "#":
-            schema_name = parts[-1]
-            return spec.get("components", {}).get("schemas", {}).get(schema_name, {})
-    
-    return schema
+@router.get("/openapi/{spec_id}")
+async def refresh_openapi(
+    spec_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    """The index of a loaded spec, reloaded from its URL.
+
+    A matching If-None-Match gets a 304 when the spec has not changed;
+    when it has, the new index comes back under a new spec_id.
+    """
+    known = spec_cache.get(spec_id)
+    if known is None:
+        raise HTTPException(status_code=404, detail="Spec is no longer loaded, load it again")
+    try:
+        parsed, cached = await spec_cache.load(client, known.spec_url)
+    except Exception as e:
+        raise load_error(e)
+    return index_response(parsed, cached, request, conditional=True)
 
 
-def generate_example_from_schema(schema):
-    """Generate a simple example from a JSON schema"""
-    if not schema or not isinstance(schema, dict):
-        return None
-    
-    # Handle $ref (shouldn't happen if resolved, but just in case)
-    if "$ref" in schema:
-        return None
-    
-    # Handle arrays
-    if schema.get("type") == "array":
-        items = schema.get("items", {})
-        item_example = generate_example_from_schema(items)
-        return [item_example] if item_example else []
-    
-    # Handle objects
-    properties = schema.get("properties", {})
-    if not properties:
-        return None
-    
-    example = {}
-    required_fields = schema.get("required", [])
-    
-    for key, value in properties.items():
-        # Skip read-only fields
-        if value.get("readOnly"):
-            continue
-            
-        # Check if field has an example
-        if "example" in value:
-            example[key] = value["example"]
-            continue
-        
-        # Check if field has a default
-        if "default" in value:
-            example[key] = value["default"]
-            continue
-        
-        # Generate based on type
-        prop_type = value.get("type")
-        
-        if prop_type == "string":
-            # Check for format hints
-            prop_format = value.get("format")
-            prop_enum = value.get("enum")
-            
-            if prop_enum:
-                example[key] = prop_enum[0]  # Use first enum value
-            elif prop_format == "email":
-                example[key] = "user@example.com"
-            elif prop_format == "password":
-                example[key] = "password123"
-            elif prop_format == "date":
-                example[key] = "2024-01-01"
-            elif prop_format == "date-time":
-                example[key] = "2024-01-01T00:00:00Z"
-            elif prop_format == "uri":
-                example[key] = "https://example.com"
-            elif "username" in key.lower():
-                example[key] = "username"
-            elif "name" in key.lower():
-                example[key] = "Example Name"
-            else:
-                max_length = value.get("maxLength", 50)
-                example[key] = "string" if max_length > 10 else "str"
-        elif prop_type == "number":
-            example[key] = 0.0
-        elif prop_type == "integer":
-            example[key] = 0
-        elif prop_type == "boolean":
-            example[key] = True
-        elif prop_type == "array":
-            items = value.get("items", {})
-            item_example = generate_example_from_schema(items)
-            example[key] = [item_example] if item_example else []
-        elif prop_type == "object":
-            nested = generate_example_from_schema(value)
-            example[key] = nested if nested else {}
-    
-    return example if example else None
\ No newline at end of file
+@router.post("/load-openapi/stream")
+async def load_openapi_stream(
+    payload: dict,
+    current_user: User = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    """The same index as /load-openapi, as server-sent events for very large specs.
+
+    "endpoints" events carry pages of up to page_size index entries and
+    start while a JSON spec is still downloading; "done" carries spec_id,
+    info, servers, version and the total, and "error" a failed load's
+    detail. Early entries are built before $refs can be resolved, so their
+    example_count only counts inline examples; operation details are
+    always complete.
+    """
+    spec_url = payload.get("spec_url")
+    if not spec_url:
+        raise HTTPException(status_code=400, detail="spec_url is required")
+    page_size = payload.get("page_size", DEFAULT_PAGE_SIZE)
+    if not isinstance(page_size, int) or not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+
+    async def events():
+        try:
+            async for event, data in spec_cache.stream(client, spec_url, page_size):
+                yield sse_event(event, data)
+        except Exception as e:
+            error = load_error(e)
+            yield sse_event("error", {"status_code": error.status_code, "detail": error.detail})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/openapi/{spec_id}/operations/{operation_id:path}")
+async def get_operation(
+    spec_id: str,
+    operation_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    """Parameters, request body example and named examples of one operation"""
+    parsed = spec_cache.get(spec_id)
+    if parsed is None:
+        raise HTTPException(status_code=404, detail="Spec is no longer loaded, load it again")
+    operation = parsed.operations.get(operation_id)
+    if operation is None:
+        raise HTTPException(status_code=404, detail="Operation not found")
+
+    # The spec id changes with the content, so an operation never changes under it
+    etag = f'"{spec_id}:{hashlib.sha256(operation_id.encode()).hexdigest()[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(operation, headers=headers)
+
+
+@router.get("/openapi/{spec_id}/search")
+async def search_operations(
+    spec_id: str,
+    q: str = "",
+    tag: list[str] = Query(default=[]),
+    method: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    current_user: User = Depends(get_current_user),
+):
+    """Operations matching q, best first, with tag counts for narrowing down.
+
+    Words match exactly, by prefix or with one typo, in paths,
+    operationIds, summaries, descriptions, tags and parameter names.
+    Every tag given must be on a result.
+    """
+    parsed = spec_cache.get(spec_id)
+    if parsed is None:
+        raise HTTPException(status_code=404, detail="Spec is no longer loaded, load it again")
+    started = time.perf_counter()
+    found = parsed.search(q, tags=tag, method=method, limit=limit, offset=offset)
+    found["took_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return found
+
+
+@router.get("/openapi-cache-stats")
+async def get_openapi_cache_stats(current_user: User = Depends(get_current_user)):
+    """Size and hit counts of the parsed spec cache (all users)"""
+    return spec_cache.stats()
@@ -1,14 +1,40 @@
+import base64
+import contextlib
+import hashlib
+import json
 import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Literal, Optional
+from urllib.parse import urlsplit
 import httpx
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from App.auth.auth import get_current_user
 from App.models.models import *
 from App.schemas.proxy import *
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from App.models.db import get_session
 from App.models.models import ProxyLog
+from App.routes.rate_limit import sse_event
+from App.services.benchmarks import (
+    BENCHMARK_MAX_ITERATIONS, BENCHMARK_MIN_INTERVAL, run_benchmark,
+)
+from App.services.batch_runner import BATCH_MAX_CONCURRENCY, BATCH_MAX_REQUESTS, run_batch, summarize
+from App.services.http_client import HTTP_MAX_CONNECTIONS_PER_HOST, get_http_client, pool_stats
+from App.services.log_writer import enqueue_proxy_log
+from App.services.response_cache import (
+    CachedResponse, bypasses_cache, cache_key, response_cache, wants_revalidation,
+)
+from App.services.upstream import (
+    PROXY_MAX_BUFFERED_BYTES, PROXY_PREVIEW_BYTES,
+    UpstreamTooLarge, decode_body, fetch_buffered, open_upstream, passthrough_headers,
+)
+from App.services.single_flight import SingleFlight
+from App.services.timings import RequestTimings, log_timing_fields
 
 router = APIRouter(prefix="/api", tags=["proxy"])
+proxy_flights = SingleFlight()
 def generate_name(method: str, url: str) -> str:
     try:
         path = url.split("://", 1)[1].split("/", 1)[1]
@@ -19,17 +45,53 @@ def generate_name(method: str, url: str) -> str:
     return f"{method} {path}"
 
 @router.post("/proxy", response_model=ProxyResponse)
-async def proxy_request(payload: ProxyRequest, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)):
-    start_time = time.time()
+async def proxy_request(
+    payload: ProxyRequest,
+    current_user: User = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    if payload.mode == "preview":
+        limit = min(payload.preview_bytes or PROXY_PREVIEW_BYTES, PROXY_MAX_BUFFERED_BYTES)
+    else:
+        limit = PROXY_MAX_BUFFERED_BYTES
+
+    url = str(payload.url)
+    request_headers = dict(payload.headers or {})
+    key = cached = None
+    if payload.method not in ("GET", "HEAD", "OPTIONS"):
+        # RFC 9111 section 4.4, an unsafe request makes what we hold for the URL stale
+        response_cache.invalidate(current_user.id, url)
+    elif payload.cache and payload.method == "GET" and payload.mode == "buffered" and not bypasses_cache(request_headers):
+        key = cache_key(current_user.id, payload.method, url, request_headers)
+        cached = response_cache.get(key, request_headers)
+        if cached is not None and cached.fresh and not wants_revalidation(request_headers):
+            response_cache.hits += 1
+            return cached_proxy_response(cached, "hit", 0)
+        if cached is not None:
+            request_headers.update(cached.validators())
+
+    start_time = time.perf_counter()
+
+    async def fetch():
+        return await fetch_buffered(
+            client, payload.method, url, request_headers, payload.body,
+            limit, truncate=payload.mode == "preview",
+        )
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.request(
-                method=payload.method,
-                url=str(payload.url),
-                headers=payload.headers,
-                json=payload.body if payload.method != "GET" else None
+        if payload.method in ("GET", "HEAD"):
+            # Identical requests in flight share one upstream call
+            response, coalesced = await proxy_flights.do(
+                flight_key(payload.method, url, request_headers, payload.body, limit, payload.mode), fetch
             )
+        else:
+            response, coalesced = await fetch(), False
+
+    except UpstreamTooLarge as e:
+        raise HTTPException(
+            status_code=502,
+            detail=f"{e}, use preview mode or /api/proxy/stream"
+        )
 
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Upstream request timed out")
@@ -40,53 +102,272 @@ async def proxy_request(payload: ProxyRequest, current_user: User = Depends(get_
             detail=f"Request failed: {str(e)}"
         )
 
-    elapsed_ms = int((time.time() - start_time) * 1000)
+    elapsed_ms = int((time.perf_counter() - start_time) * 1000)
+    phases = response.timings.phases()
 
-    # Try to parse JSON response, fall back to text
-    try:
-        response_body = response.json()
-    except ValueError:
-        response_body = response.text
+    # Every caller gets its own log, coalesced or not
     log = ProxyLog(
     user_id=current_user.id,
     method=payload.method,
-    url=str(payload.url),
+    url=url,
+    host=urlsplit(url).hostname,
     status_code=response.status_code,
-    response_time_ms=elapsed_ms
+    response_time_ms=elapsed_ms,
+    **log_timing_fields(phases)
     )
 
-    session.add(log)
-    session.commit()
+    # Written in the background in batches, so the response never waits on the database
+    await enqueue_proxy_log(log)
 
+    if key is not None:
+        if cached is not None and response.status_code == 304:
+            response_cache.refresh(key, cached, response)
+            response_cache.revalidations += 1
+            return cached_proxy_response(cached, "revalidated", elapsed_ms, coalesced, phases)
+        response_cache.put(key, payload.headers or {}, response)
+        response_cache.misses += 1
 
     return ProxyResponse(
         status=response.status_code,
         headers=dict(response.headers),
-        body=response_body,
-        response_time=elapsed_ms
+        body=decode_body(response.content, response.encoding, response.truncated),
+        response_time=elapsed_ms,
+        truncated=response.truncated,
+        body_bytes=len(response.content),
+        total_bytes=response.total_bytes,
+        cache="miss" if key is not None else None,
+        coalesced=coalesced,
+        timings=phases,
     )
 
-from sqlmodel import select
-from App.schemas.logs import LogEntry
-@router.get("/proxy/logs", response_model=list[LogEntry])
-async def get_proxy_logs(
+
+def flight_key(method: str, url: str, headers: dict, body: Any, limit: int, mode: str) -> str:
+    """Requests only share a call when everything sent upstream is identical,
+    credentials and body included, so nobody sees a response made for someone else"""
+    normalized = sorted((name.lower(), value) for name, value in headers.items())
+    # A GET may carry a body too, and the upstream may answer according to it
+    encoded_body = json.dumps(body, sort_keys=True, default=str)
+    return hashlib.sha256(repr((method, url, normalized, encoded_body, limit, mode)).encode()).hexdigest()
+
+
+def cached_proxy_response(
+    cached: CachedResponse, outcome: str, elapsed_ms: int, coalesced: bool = False, phases: Optional[dict] = None
+) -> ProxyResponse:
+    return ProxyResponse(
+        status=cached.status,
+        headers=cached.headers,
+        body=decode_body(cached.content, cached.encoding, False),
+        response_time=elapsed_ms,
+        body_bytes=len(cached.content),
+        total_bytes=len(cached.content),
+        cache=outcome,
+        coalesced=coalesced,
+        timings=phases,
+    )
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """A StreamingResponse whose cleanup runs however sending ends: at the
+    end of the body, on a disconnect, or before the body was started at
+    all, which a generator's finally would miss"""
+
+    def __init__(self, content, cleanup: Callable[[], Awaitable[None]], **kwargs):
+        super().__init__(content, **kwargs)
+        self.cleanup = cleanup
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.cleanup()
+
+
+@router.post("/proxy/stream")
+async def proxy_stream(
+    payload: ProxyRequest,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    client: httpx.AsyncClient = Depends(get_http_client),
 ):
-    statement = (
-        select(ProxyLog)
-        .where(ProxyLog.user_id == current_user.id)
-        .order_by(ProxyLog.timestamp.desc())
+    """Pass the upstream body through in chunks, without buffering it.
+
+    The body is sent as received (still compressed, with its
+    Content-Encoding), so memory per request stays at one chunk. Upstream
+    status, headers, time to headers and the phases up to then come back
+    as X-Proxy-* headers; the proxy log, with the download time, is
+    written once the body has been sent.
+    """
+    if payload.method not in ("GET", "HEAD", "OPTIONS"):
+        # RFC 9111 section 4.4, as in /proxy
+        response_cache.invalidate(current_user.id, str(payload.url))
+    timings = RequestTimings()
+    stack = AsyncExitStack()
+
+    try:
+        response = await open_upstream(
+            client, stack, payload.method, str(payload.url), payload.headers, payload.body, timings
+        )
+    except httpx.TimeoutException:
+        await stack.aclose()
+        raise HTTPException(status_code=504, detail="Upstream request timed out")
+    except httpx.RequestError as e:
+        await stack.aclose()
+        raise HTTPException(
+            status_code=502,
+            detail=f"Request failed: {str(e)}"
+        )
+
+    phases = timings.phases()
+
+    async def finish():
+        timings.mark("body.complete")
+        await stack.aclose()
+        await enqueue_proxy_log(ProxyLog(
+            user_id=current_user.id,
+            method=payload.method,
+            url=str(payload.url),
+            host=urlsplit(str(payload.url)).hostname,
+            status_code=response.status_code,
+            response_time_ms=int((time.perf_counter() - timings.started) * 1000),
+            **log_timing_fields(timings.phases()),
+        ))
+
+    headers = passthrough_headers(response)
+    headers.update({
+        "X-Proxy-Status": str(response.status_code),
+        "X-Proxy-Headers": json.dumps(dict(response.headers)),
+        "X-Proxy-Response-Time": str(int(phases["total_ms"])),
+        "X-Proxy-Timings": json.dumps(phases),
+    })
+    return ClosingStreamingResponse(
+        response.aiter_raw(),
+        finish,
+        headers=headers,
+        media_type=response.headers.get("content-type", "application/octet-stream"),
     )
 
-    return session.exec(statement).all()
+
+@router.get("/proxy/pool-stats", response_model=PoolStats)
+async def get_pool_stats(current_user: User = Depends(get_current_user)):
+    """Connection pool usage of the shared upstream client"""
+    return pool_stats()
+
+
+@router.get("/proxy/cache-stats", response_model=CacheStats)
+async def get_cache_stats(current_user: User = Depends(get_current_user)):
+    """Size and hit counts of the response cache (all users)"""
+    return response_cache.stats()
+
+
+@router.delete("/proxy/cache")
+async def clear_cache(current_user: User = Depends(get_current_user)):
+    """Forget every cached response of the current user"""
+    return {"removed": response_cache.clear(current_user.id)}
+
+from sqlmodel import select, or_, and_
+from App.schemas.logs import AnalyticsReport, LogPage
+from App.services.rollups import query_rollups
+
+# Window returned when the caller gives no since, per granularity
+DEFAULT_ANALYTICS_WINDOW = {"minute": timedelta(hours=1), "hour": timedelta(days=1), "day": timedelta(days=30)}
+
+
+def encode_log_cursor(log: ProxyLog) -> str:
+    raw = f"{log.timestamp.isoformat()}|{log.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_log_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        timestamp, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def as_utc_naive(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC, compare like with like
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@router.get("/proxy/logs", response_model=LogPage)
+async def get_proxy_logs(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    method: Optional[str] = None,
+    status_min: Optional[int] = None,
+    status_max: Optional[int] = None,
+    host: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """A page of the user's proxy history, newest first.
+
+    Pages are keyed on (timestamp, id) rather than offsets, so every page
+    is one range scan of ix_proxy_logs_user_id_timestamp_id however deep
+    into the history it is.
+    """
+    statement = select(ProxyLog).where(ProxyLog.user_id == current_user.id)
+
+    if cursor:
+        timestamp, log_id = decode_log_cursor(cursor)
+        statement = statement.where(or_(
+            ProxyLog.timestamp < timestamp,
+            and_(ProxyLog.timestamp == timestamp, ProxyLog.id < log_id),
+        ))
+    if method:
+        statement = statement.where(ProxyLog.method == method.upper())
+    if status_min is not None:
+        statement = statement.where(ProxyLog.status_code >= status_min)
+    if status_max is not None:
+        statement = statement.where(ProxyLog.status_code <= status_max)
+    if host:
+        statement = statement.where(ProxyLog.host == host.lower())
+    if since:
+        statement = statement.where(ProxyLog.timestamp >= as_utc_naive(since))
+    if until:
+        statement = statement.where(ProxyLog.timestamp < as_utc_naive(until))
+
+    # One extra row tells us whether there is a next page without a COUNT
+    statement = statement.order_by(ProxyLog.timestamp.desc(), ProxyLog.id.desc()).limit(limit + 1)
+    logs = (await session.exec(statement)).all()
+
+    next_cursor = encode_log_cursor(logs[limit - 1]) if len(logs) > limit else None
+    return LogPage(items=logs[:limit], next_cursor=next_cursor)
+
+
+@router.get("/proxy/analytics", response_model=AnalyticsReport)
+async def get_proxy_analytics(
+    granularity: Literal["minute", "hour", "day"] = "hour",
+    group_by: Literal["host", "endpoint"] = "host",
+    host: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Request counts, error rates and latency percentiles over time.
+
+    Served from the rollup tables the log writer keeps up to date, so the
+    cost depends on the number of buckets, not the number of logs.
+    """
+    until = as_utc_naive(until or datetime.now(timezone.utc))
+    since = as_utc_naive(since) if since else until - DEFAULT_ANALYTICS_WINDOW[granularity]
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+
+    series = await query_rollups(session, current_user.id, granularity, since, until, group_by, host)
+    return AnalyticsReport(granularity=granularity, since=since, until=until, series=series)
 
 
 @router.post("/proxy/saved",response_model=SavedRequestCreate)
 async def save_request(
     payload: SavedRequestCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     name = payload.name or generate_name(payload.method, str(payload.url))
     saved_request = SavedRequest(
@@ -95,49 +376,208 @@ async def save_request(
         method=payload.method,
         url=str(payload.url),
         headers=payload.headers,
-        body=payload.body
+        body=payload.body,
+        collection=payload.collection,
     )
     session.add(saved_request)
-    session.commit()
-    session.refresh(saved_request)
+    await session.commit()
+    await session.refresh(saved_request)
     return saved_request
 @router.get("/proxy/saved", response_model=list[SavedRequestRead])
 async def get_saved_requests(
+    collection: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     statement = (
         select(SavedRequest)
         .where(SavedRequest.user_id == current_user.id)
         .order_by(SavedRequest.created_at.desc())
     )
+    if collection is not None:
+        statement = statement.where(SavedRequest.collection == collection)
 
-    return session.exec(statement).all()
+    return (await session.exec(statement)).all()
+@router.post("/proxy/saved/run", response_model=BatchRunResponse)
+async def run_saved_requests(
+    payload: BatchRunRequest,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    """Replay saved requests, by ids or by collection, concurrently.
+
+    Results come back in the order the requests were saved, or with
+    stream set, as server-sent "result" events in the order they finish
+    followed by one "summary". Bodies are left out unless include_body
+    is set, and are cut to the preview size.
+    """
+    if (payload.ids is None) == (payload.collection is None):
+        raise HTTPException(status_code=400, detail="Give either ids or collection")
+    if payload.concurrency > BATCH_MAX_CONCURRENCY:
+        raise HTTPException(status_code=400, detail=f"concurrency may be at most {BATCH_MAX_CONCURRENCY}")
+
+    statement = select(SavedRequest).where(SavedRequest.user_id == current_user.id)
+    if payload.ids is not None:
+        statement = statement.where(SavedRequest.id.in_(payload.ids))
+    else:
+        statement = statement.where(SavedRequest.collection == payload.collection)
+    saved_requests = (await session.exec(statement.order_by(SavedRequest.created_at, SavedRequest.id))).all()
+
+    if payload.ids is not None:
+        missing = set(payload.ids) - {saved.id for saved in saved_requests}
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Saved requests not found: {sorted(missing)}")
+    if not saved_requests:
+        raise HTTPException(status_code=404, detail="No saved requests in this collection")
+    if len(saved_requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"A batch may run at most {BATCH_MAX_REQUESTS} requests")
+
+    batch = run_batch(
+        client, current_user.id, saved_requests, payload.concurrency,
+        payload.per_host or HTTP_MAX_CONNECTIONS_PER_HOST, payload.include_body,
+    )
+    started = time.perf_counter()
+
+    if not payload.stream:
+        results = [result async for result in batch]
+        summary = summarize(results, int((time.perf_counter() - started) * 1000))
+        order = {saved.id: position for position, saved in enumerate(saved_requests)}
+        results.sort(key=lambda result: order[result.id])
+        return BatchRunResponse(results=results, summary=summary)
+
+    async def events():
+        results = []
+        # Closing the generator, when the client goes away, cancels the rest
+        async with contextlib.aclosing(batch):
+            async for result in batch:
+                results.append(result)
+                yield sse_event("result", result.model_dump())
+        summary = summarize(results, int((time.perf_counter() - started) * 1000))
+        yield sse_event("summary", summary.model_dump())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 @router.delete("/proxy/saved/{request_id}")
 async def delete_saved_request(
     request_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    saved_request = session.get(SavedRequest, request_id)
+    saved_request = await session.get(SavedRequest, request_id)
 
     if not saved_request or saved_request.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Saved request not found")
 
-    session.delete(saved_request)
-    session.commit()
+    runs = await session.exec(select(BenchmarkRun).where(BenchmarkRun.saved_request_id == request_id))
+    for run in runs:
+        await session.delete(run)
+    await session.delete(saved_request)
+    await session.commit()
 
     return {"detail": "Saved request deleted"}
 @router.get("/proxy/saved/{request_id}", response_model=SavedRequestRead)
 async def get_saved_request(
     request_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    saved_request = session.get(SavedRequest, request_id)
+    saved_request = await session.get(SavedRequest, request_id)
 
     if not saved_request or saved_request.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Saved request not found")
 
     return saved_request
 
+
+async def get_own_saved_request(session: AsyncSession, request_id: int, user: User) -> SavedRequest:
+    saved_request = await session.get(SavedRequest, request_id)
+    if not saved_request or saved_request.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Saved request not found")
+    return saved_request
+
+
+@router.put("/proxy/saved/{request_id}/benchmark", response_model=SavedRequestRead)
+async def set_benchmark(
+    request_id: int,
+    payload: BenchmarkSettings,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Mark a saved request as benchmarked, or stop benchmarking it"""
+    saved_request = await get_own_saved_request(session, request_id, current_user)
+    if payload.iterations > BENCHMARK_MAX_ITERATIONS:
+        raise HTTPException(status_code=400, detail=f"iterations may be at most {BENCHMARK_MAX_ITERATIONS}")
+    if payload.interval is not None and payload.interval < BENCHMARK_MIN_INTERVAL:
+        raise HTTPException(status_code=400, detail=f"interval must be at least {BENCHMARK_MIN_INTERVAL} seconds")
+
+    saved_request.benchmark = payload.enabled
+    saved_request.benchmark_iterations = payload.iterations
+    saved_request.benchmark_interval = payload.interval
+    session.add(saved_request)
+    await session.commit()
+    await session.refresh(saved_request)
+    return saved_request
+
+
+@router.post("/proxy/saved/{request_id}/benchmark/run", response_model=BenchmarkRunRead)
+async def run_saved_benchmark(
+    request_id: int,
+    payload: Optional[BenchmarkRunRequest] = None,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    """Benchmark a saved request now and compare it to its recent runs.
+
+    The response comes once every iteration is done; a run counts
+    towards later baselines like a scheduled one.
+    """
+    saved_request = await get_own_saved_request(session, request_id, current_user)
+    if not saved_request.benchmark:
+        raise HTTPException(status_code=400, detail="Benchmarking is not enabled for this request")
+    iterations = payload.iterations if payload and payload.iterations else saved_request.benchmark_iterations
+    if iterations > BENCHMARK_MAX_ITERATIONS:
+        raise HTTPException(status_code=400, detail=f"iterations may be at most {BENCHMARK_MAX_ITERATIONS}")
+
+    # Also pushes the next scheduled run back a full interval
+    saved_request.last_benchmark_at = get_utc_now()
+    session.add(saved_request)
+    await session.commit()
+    return await run_benchmark(client, saved_request, "manual", iterations)
+
+
+@router.get("/proxy/saved/{request_id}/benchmark/runs", response_model=list[BenchmarkRunRead])
+async def get_benchmark_runs(
+    request_id: int,
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """A saved request's benchmark runs, newest first"""
+    await get_own_saved_request(session, request_id, current_user)
+    statement = (
+        select(BenchmarkRun)
+        .where(BenchmarkRun.saved_request_id == request_id)
+        .order_by(BenchmarkRun.started_at.desc(), BenchmarkRun.id.desc())
+        .limit(limit)
+    )
+    return (await session.exec(statement)).all()
+
+
+@router.get("/proxy/benchmarks/regressions", response_model=list[BenchmarkRunRead])
+async def get_benchmark_regressions(
+    since: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Benchmark runs of any of the user's requests that were flagged as regressions, newest first"""
+    statement = select(BenchmarkRun).where(BenchmarkRun.user_id == current_user.id, BenchmarkRun.regression)
+    if since:
+        statement = statement.where(BenchmarkRun.started_at >= as_utc_naive(since))
+    statement = statement.order_by(BenchmarkRun.started_at.desc(), BenchmarkRun.id.desc()).limit(limit)
+    return (await session.exec(statement)).all()
@@ -1,73 +1,190 @@
 import asyncio
-import httpx
-from fastapi import APIRouter, Depends
+import json
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from App.models.models import *
+from App.models.db import get_session
 from App.auth.auth import get_current_user
-from App.schemas.rate_limit import RateLimitTestRequest, RateLimitTestResult
+from App.schemas.rate_limit import (
+    RateLimitTestRequest,
+    RateLimitTestResult,
+    RateLimitJobSummary,
+    RateLimitJobRead,
+    RateLimitDiscoveryRequest,
+    RateLimitDiscoveryResult,
+)
+from App.services.discovery import discover_rate_limit
+from App.services.jobs import job_runner, FINISHED_STATUSES
+from App.services.load_stats import LoadTestStats
+from App.services.load_test import run_load_test
 
 router = APIRouter(prefix="/api", tags=["rate-limit"])
-async def send_request(client, payload):
-    try:
-        res = await client.request(
-            method=payload.method,
-            url=str(payload.url),
-            headers=payload.headers,
-            json=payload.body if payload.method != "GET" else None,
-            timeout=10
-        )
-        return res.status_code
-    except Exception:
-        return None
+
+# Streaming runs in progress on this worker: run_id -> (user_id, task)
+_active_runs: dict[str, tuple[int, asyncio.Task]] = {}
+
+
 @router.post("/rate-limit-test", response_model=RateLimitTestResult)
 async def rate_limit_test(
     payload: RateLimitTestRequest,
     current_user: User = Depends(get_current_user),
 ):
-    total = 0
-    success = 0
-    rate_limited = 0
-    errors = 0
-
-    first_429_request = None
-    first_429_second = None
-
-    async with httpx.AsyncClient() as client:
-        for second in range(payload.duration):
-            tasks = [
-                send_request(client, payload)
-                for _ in range(payload.rps)
-            ]
-
-            results = await asyncio.gather(*tasks)
-
-            for status in results:
-                total += 1
-
-                if status == 429:
-                    rate_limited += 1
-                    if first_429_request is None:
-                        first_429_request = total
-                        first_429_second = second + 1
-                elif status and status < 400:
-                    success += 1
-                else:
-                    errors += 1
-
-            # pacing: ensure per-second execution
-            await asyncio.sleep(1)
-
-    max_safe_rps = None
-    if first_429_request and first_429_second:
-        successful_requests_before_429 = first_429_request - 1
-        max_safe_rps = successful_requests_before_429 // first_429_second
-
-    return RateLimitTestResult(
-        total_requests=total,
-        successful_requests=success,
-        rate_limited_requests=rate_limited,
-        other_errors=errors,
-        first_429_at_request=first_429_request,
-        first_429_at_second=first_429_second,
-        max_safe_rps_estimate=max_safe_rps,
+    return await run_load_test(payload)
+
+
+@router.post("/rate-limit-discover", response_model=RateLimitDiscoveryResult)
+async def rate_limit_discover(
+    payload: RateLimitDiscoveryRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Ramp up or binary-search the rate until the target starts limiting"""
+    return await discover_rate_limit(payload)
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/rate-limit-test/stream")
+async def rate_limit_test_stream(
+    payload: RateLimitTestRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Run a rate limit test and stream per-second aggregates as server-sent events.
+
+    Events: "started" (with the run_id), one "progress" per second, then
+    "result" or "cancelled". Closing the connection or calling
+    DELETE /api/rate-limit-test/{run_id} stops all in-flight sends.
+    """
+    run_id = uuid.uuid4().hex
+    stats = LoadTestStats(payload.duration)
+    task = asyncio.create_task(run_load_test(payload, stats))
+    _active_runs[run_id] = (current_user.id, task)
+
+    async def events():
+        try:
+            yield sse_event("started", {"run_id": run_id, "target_rps": payload.rps, "duration": payload.duration})
+
+            second = 0
+            while True:
+                await asyncio.wait({task}, timeout=1)
+                if task.done():
+                    break
+                if second < payload.duration:
+                    second += 1
+                yield sse_event("progress", stats.progress(second))
+
+            if task.cancelled():
+                yield sse_event("cancelled", stats.progress(second))
+            elif task.exception() is not None:
+                yield sse_event("error", {"detail": str(task.exception())})
+            else:
+                yield sse_event("result", task.result().model_dump())
+        finally:
+            # Also reached when the client disconnects mid-run
+            task.cancel()
+            _active_runs.pop(run_id, None)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/rate-limit-test/{run_id}")
+async def cancel_rate_limit_test(
+    run_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    run = _active_runs.get(run_id)
+    if not run or run[0] != current_user.id:
+        raise HTTPException(status_code=404, detail="Rate limit test not found")
+
+    run[1].cancel()
+    return {"detail": "Rate limit test cancelled"}
+
+
+async def create_job(session: AsyncSession, user_id: int, payload: RateLimitTestRequest) -> RateLimitJob:
+    job = RateLimitJob(user_id=user_id, request=payload.model_dump(mode="json"))
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    job_runner.submit(job.id)
+    return job
+
+
+async def get_user_job(session: AsyncSession, job_id: int, user_id: int) -> RateLimitJob:
+    job = await session.get(RateLimitJob, job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Rate limit job not found")
+    return job
+
+
+@router.post("/rate-limit-jobs", response_model=RateLimitJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def submit_rate_limit_job(
+    payload: RateLimitTestRequest,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Queue a rate limit test and return its job id right away"""
+    return await create_job(session, current_user.id, payload)
+
+
+@router.get("/rate-limit-jobs", response_model=list[RateLimitJobSummary])
+async def list_rate_limit_jobs(
+    limit: int = 50,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    statement = (
+        select(RateLimitJob)
+        .where(RateLimitJob.user_id == current_user.id)
+        .order_by(RateLimitJob.created_at.desc())
+        .limit(min(max(limit, 1), 200))
     )
 
+    return (await session.exec(statement)).all()
+
+
+@router.get("/rate-limit-jobs/{job_id}", response_model=RateLimitJobRead)
+async def get_rate_limit_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    return await get_user_job(session, job_id, current_user.id)
+
+
+@router.post("/rate-limit-jobs/{job_id}/cancel", response_model=RateLimitJobRead)
+async def cancel_rate_limit_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    job = await get_user_job(session, job_id, current_user.id)
+    if job.status in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Rate limit job is already {job.status}")
+
+    # Whichever worker runs the job sees the flag on its next progress write
+    job.cancel_requested = True
+    session.add(job)
+    await session.commit()
+    job_runner.cancel(job_id)
+
+    await session.refresh(job)
+    return job
+
+
+@router.post("/rate-limit-jobs/{job_id}/rerun", response_model=RateLimitJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def rerun_rate_limit_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Queue a new job with the same settings as a past one"""
+    job = await get_user_job(session, job_id, current_user.id)
+    return await create_job(session, current_user.id, RateLimitTestRequest(**job.request))
@@ -1,15 +1,55 @@
 # schemas/logs.py
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Literal, Optional
+
+from App.schemas.rate_limit import LatencySummary
 
 class LogEntry(BaseModel):
     id: int
     user_id: int
     method: str
-    url: HttpUrl
+    url: str  # stored already validated, re-parsing every row only costs time
+    host: Optional[str] = None
     status_code: int | None
     response_time_ms: int
     timestamp: datetime
+    queue_ms: Optional[float] = None
+    dns_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+    download_ms: Optional[float] = None
 
     class Config:
         from_attributes = True
+
+
+class LogPage(BaseModel):
+    items: List[LogEntry]
+    next_cursor: Optional[str]  # pass back as ?cursor= to get the next page, null on the last one
+
+
+class AnalyticsBucket(BaseModel):
+    start: datetime
+    requests: int
+    errors: int
+    error_rate: float
+    latency: LatencySummary
+
+
+class AnalyticsSeries(BaseModel):
+    host: str
+    endpoint: Optional[str]  # "METHOD /path" with ids collapsed to {id}, null when grouped by host
+    requests: int
+    errors: int
+    error_rate: float
+    latency: LatencySummary
+    buckets: List[AnalyticsBucket]
+
+
+class AnalyticsReport(BaseModel):
+    granularity: Literal["minute", "hour", "day"]
+    since: datetime
+    until: datetime
+    series: List[AnalyticsSeries]
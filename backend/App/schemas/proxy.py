@@ -1,12 +1,19 @@
-from typing import Dict, Optional, Any
-from pydantic import BaseModel, HttpUrl, field_validator
+from typing import Dict, Literal, Optional, Any
+from pydantic import BaseModel, Field, HttpUrl, field_validator
 from datetime import datetime
+from App.schemas.rate_limit import LatencySummary
 #First Schemas
 class ProxyRequest(BaseModel):
     method: str
     url: HttpUrl
     headers: Optional[Dict[str, str]] = {}
     body: Optional[Any] = None
+    # buffered: the whole body, up to PROXY_MAX_BUFFERED_BYTES
+    # preview: only the first preview_bytes, the rest is never downloaded
+    mode: Literal["buffered", "preview"] = "buffered"
+    preview_bytes: Optional[int] = Field(default=None, gt=0)
+    # Serve GETs from this user's response cache when Cache-Control allows it
+    cache: bool = False
 
     @field_validator("method")
     def validate_method(cls, v):
@@ -17,11 +24,53 @@ class ProxyRequest(BaseModel):
         return v
 
 
+class PhaseTimings(BaseModel):
+    """Where the time of an upstream request went, in milliseconds"""
+    queue_ms: Optional[float]  # waiting for a host slot or a pooled connection
+    dns_ms: Optional[float]
+    connect_ms: Optional[float]
+    tls_ms: Optional[float]
+    ttfb_ms: Optional[float]  # request sent and server think time, up to the response headers
+    download_ms: Optional[float]
+    total_ms: Optional[float]
+    reused_connection: bool  # dns, connect and tls are null when true
+
+
 class ProxyResponse(BaseModel):
     status: int
     headers: Dict[str, str]
     body: Any
     response_time: int  # milliseconds
+    truncated: bool = False  # body is only the first body_bytes of the response
+    body_bytes: int = 0
+    total_bytes: Optional[int] = None  # null when truncated and the upstream sent no Content-Length
+    # hit: served from cache, revalidated: upstream answered 304, null when the cache was not used
+    cache: Optional[Literal["hit", "miss", "revalidated"]] = None
+    coalesced: bool = False  # shared the upstream call of an identical request already in flight
+    timings: Optional[PhaseTimings] = None  # null for cache hits, no upstream call was made
+
+
+class PoolStats(BaseModel):
+    started: bool
+    http2: bool
+    open_connections: int
+    idle_connections: int
+    active_connections: int
+    total_requests: int
+    connections_opened: int
+    reused_connections: int
+    max_connections: int
+    max_connections_per_host: int
+    max_keepalive_connections: int
+    keepalive_expiry: float
+
+class CacheStats(BaseModel):
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    revalidations: int
 
 class SavedRequestCreate(BaseModel):
     name: str | None = None
@@ -29,6 +78,7 @@ class SavedRequestCreate(BaseModel):
     url: HttpUrl
     headers: Optional[Dict[str, str]] = {}
     body: Optional[Any] = None
+    collection: Optional[str] = None
 
     @field_validator("method")
     def validate_method(cls, v):
@@ -39,7 +89,75 @@ class SavedRequestCreate(BaseModel):
         return v
 class SavedRequestRead(SavedRequestCreate):
     id: int
+    benchmark: bool = False
+    benchmark_iterations: int = 20
+    benchmark_interval: Optional[int] = None
+    last_benchmark_at: Optional[datetime] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class BatchRunRequest(BaseModel):
+    """Saved requests to run: the given ids, or every request in a collection"""
+    ids: Optional[list[int]] = Field(default=None, min_length=1)
+    collection: Optional[str] = None
+    concurrency: int = Field(default=20, ge=1)
+    per_host: Optional[int] = Field(default=None, ge=1)
+    include_body: bool = False
+    stream: bool = False
+
+class BatchResult(BaseModel):
+    id: int
+    name: str
+    method: str
+    url: str
+    status: Optional[int] = None
+    ok: bool = False
+    response_time: Optional[int] = None
+    error: Optional[str] = None
+    body_bytes: int = 0
+    truncated: bool = False
+    body: Optional[Any] = None
+    timings: Optional[PhaseTimings] = None
+
+class BatchSummary(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    errors: int
+    elapsed_ms: int
+    latency: LatencySummary
+
+class BatchRunResponse(BaseModel):
+    results: list[BatchResult]
+    summary: BatchSummary
+
+
+class BenchmarkSettings(BaseModel):
+    """Whether a saved request is benchmarked, how many times per run and,
+    with interval (seconds), how often it runs on its own"""
+    enabled: bool
+    iterations: int = Field(default=20, ge=1)
+    interval: Optional[int] = Field(default=None, ge=1)
+
+class BenchmarkRunRequest(BaseModel):
+    iterations: Optional[int] = Field(default=None, ge=1)
+
+class BenchmarkRunRead(BaseModel):
+    id: int
+    saved_request_id: int
+    trigger: str
+    started_at: datetime
+    iterations: int
+    samples: list[float]
+    status_counts: Dict[str, int]
+    p50_ms: Optional[float]
+    p90_ms: Optional[float]
+    p99_ms: Optional[float]
+    comparison: Optional[Dict[str, Any]]
+    regression: bool
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,13 @@
-from pydantic import BaseModel, HttpUrl, field_validator
-from typing import Dict, Optional, Any
+import os
+from pydantic import BaseModel, HttpUrl, field_validator, model_validator
+from typing import Dict, List, Optional, Any
 from typing_extensions import Literal
+from datetime import datetime
+
+# Configuration
+# One event loop can't reliably drive more than this, past it the test needs worker processes
+LOAD_TEST_MAX_RPS_PER_WORKER = int(os.getenv("LOAD_TEST_MAX_RPS_PER_WORKER", "1000"))
+LOAD_TEST_MAX_WORKERS = int(os.getenv("LOAD_TEST_MAX_WORKERS", str(os.cpu_count() or 1)))
 
 class RateLimitTestRequest(BaseModel):
     method: Literal["GET", "POST", "PUT", "DELETE", "PATCH"]
@@ -10,18 +17,70 @@ class RateLimitTestRequest(BaseModel):
 
     rps: int           # requests per second
     duration: int      # seconds
+    arrival: Literal["uniform", "poisson"] = "uniform"  # spacing between sends
+    workers: int = 1   # processes to split the load across
 
     @field_validator("rps")
     def validate_rps(cls, v):
-        if v <= 0 or v > 1000:
-            raise ValueError("rps must be between 1 and 1000")
+        max_rps = LOAD_TEST_MAX_RPS_PER_WORKER * LOAD_TEST_MAX_WORKERS
+        if v <= 0 or v > max_rps:
+            raise ValueError(f"rps must be between 1 and {max_rps}")
+        return v
+
+    @field_validator("workers")
+    def validate_workers(cls, v):
+        if v <= 0 or v > LOAD_TEST_MAX_WORKERS:
+            raise ValueError(f"workers must be between 1 and {LOAD_TEST_MAX_WORKERS}")
         return v
 
+    @model_validator(mode="after")
+    def validate_rps_per_worker(self):
+        if self.rps > LOAD_TEST_MAX_RPS_PER_WORKER * self.workers:
+            raise ValueError(
+                f"rps above {LOAD_TEST_MAX_RPS_PER_WORKER} per worker needs more workers"
+            )
+        return self
+
     @field_validator("duration")
     def validate_duration(cls, v):
         if v <= 0 or v > 60:
             raise ValueError("duration must be between 1 and 60 seconds")
         return v
+class LatencySummary(BaseModel):
+    """Latency percentiles in milliseconds, measured from each request's scheduled send time"""
+    count: int
+    min_ms: Optional[float]
+    max_ms: Optional[float]
+    mean_ms: Optional[float]
+    p50_ms: Optional[float]
+    p90_ms: Optional[float]
+    p99_ms: Optional[float]
+    p999_ms: Optional[float]
+
+
+class SecondStats(BaseModel):
+    """Aggregates for the requests scheduled in one second of the test"""
+    second: int
+    sent: int
+    ok_2xx: int
+    rate_limited: int
+    errors: int
+    p50_ms: Optional[float]
+    p90_ms: Optional[float]
+    p99_ms: Optional[float]
+
+
+class LimiterEstimate(BaseModel):
+    """Rate limiter details read from Retry-After, X-RateLimit-* and IETF RateLimit headers"""
+    limit: Optional[float] = None
+    remaining_min: Optional[float] = None
+    window_seconds: Optional[float] = None
+    burst: Optional[float] = None
+    retry_after_seconds: Optional[float] = None
+    sustained_rps: Optional[float] = None  # limit / window when both are known
+    policy: Optional[str] = None
+
+
 class RateLimitTestResult(BaseModel):
     total_requests: int
     successful_requests: int
@@ -32,3 +91,80 @@ class RateLimitTestResult(BaseModel):
     first_429_at_second: Optional[int]
 
     max_safe_rps_estimate: Optional[int]
+
+    target_rps: int
+    achieved_rps: float
+    dropped_requests: int  # never sent: too far behind schedule or too many in flight
+    late_requests: int     # sent, but behind their scheduled time
+
+    latency: LatencySummary
+    timeline: List[SecondStats]
+    error_reasons: Dict[str, int]  # exception name or "HTTP <status>" -> count
+    limiter: LimiterEstimate = LimiterEstimate()
+
+
+class RateLimitJobSummary(BaseModel):
+    id: int
+    status: str
+    request: RateLimitTestRequest
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class RateLimitJobRead(RateLimitJobSummary):
+    progress: Optional[Dict[str, Any]]  # running totals, updated every second
+    result: Optional[RateLimitTestResult]
+    error: Optional[str]
+
+
+class RateLimitDiscoveryRequest(BaseModel):
+    method: Literal["GET", "POST", "PUT", "DELETE", "PATCH"]
+    url: HttpUrl
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+    strategy: Literal["ramp", "binary"] = "binary"
+    min_rps: int = 1
+    max_rps: int = 100
+    step_rps: int = 10            # ramp only: rate added after each passing probe
+    step_duration: int = 5        # seconds per probe, stretched to the limiter window when known
+    tolerance_rps: int = 1        # binary only: stop once the bounds are this close
+    max_p99_ms: Optional[float] = None   # a probe over this p99 latency fails
+    max_error_rate: float = 0.01  # a probe with more non-429 errors than this fails
+    max_total_requests: int = 20000
+
+    @model_validator(mode="after")
+    def validate_bounds(self):
+        max_rps = LOAD_TEST_MAX_RPS_PER_WORKER * LOAD_TEST_MAX_WORKERS
+        if self.min_rps <= 0 or self.max_rps > max_rps or self.min_rps > self.max_rps:
+            raise ValueError(f"min_rps and max_rps must satisfy 1 <= min_rps <= max_rps <= {max_rps}")
+        if self.step_rps <= 0 or self.tolerance_rps <= 0:
+            raise ValueError("step_rps and tolerance_rps must be positive")
+        if self.step_duration <= 0 or self.step_duration > 60:
+            raise ValueError("step_duration must be between 1 and 60 seconds")
+        return self
+
+
+class DiscoveryProbe(BaseModel):
+    rps: int
+    duration: int
+    total_requests: int
+    rate_limited_requests: int
+    other_errors: int
+    achieved_rps: float
+    p99_ms: Optional[float]
+    passed: bool
+    reason: Optional[str]  # why the probe failed
+
+
+class RateLimitDiscoveryResult(BaseModel):
+    strategy: str
+    max_sustained_rps: Optional[int]  # highest probed rate with no 429s and latency in budget
+    probes: List[DiscoveryProbe]
+    total_requests: int
+    stopped_reason: str
+    limiter: LimiterEstimate
@@ -0,0 +1,115 @@
+# services/batch_runner.py
+import asyncio
+import os
+import time
+from typing import AsyncIterator
+from urllib.parse import urlsplit
+
+import httpx
+
+from App.models.models import ProxyLog, SavedRequest
+from App.schemas.proxy import BatchResult, BatchSummary, PhaseTimings
+from App.services.histogram import LatencyHistogram
+from App.services.http_client import HTTP_MAX_CONNECTIONS_PER_HOST
+from App.services.log_writer import enqueue_proxy_log
+from App.services.timings import log_timing_fields
+from App.services.upstream import PROXY_PREVIEW_BYTES, decode_body, fetch_buffered
+
+# Configuration
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "1000"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "100"))
+
+
+async def run_saved_request(
+    client: httpx.AsyncClient, user_id: int, saved: SavedRequest, include_body: bool
+) -> BatchResult:
+    """One saved request through the pooled proxy path, logged like /api/proxy.
+
+    Only the first PROXY_PREVIEW_BYTES of the body are read, which is
+    plenty to check a response and keeps a large batch's memory flat.
+    """
+    result = BatchResult(id=saved.id, name=saved.name, method=saved.method, url=saved.url)
+    started = time.perf_counter()
+    try:
+        response = await fetch_buffered(
+            client, saved.method, saved.url, saved.headers or {}, saved.body,
+            PROXY_PREVIEW_BYTES, truncate=True,
+        )
+    except httpx.TimeoutException:
+        result.error = "Upstream request timed out"
+        return result
+    except httpx.RequestError as e:
+        result.error = f"Request failed: {str(e)}"
+        return result
+
+    elapsed_ms = int((time.perf_counter() - started) * 1000)
+    phases = response.timings.phases()
+    await enqueue_proxy_log(ProxyLog(
+        user_id=user_id,
+        method=saved.method,
+        url=saved.url,
+        host=urlsplit(saved.url).hostname,
+        status_code=response.status_code,
+        response_time_ms=elapsed_ms,
+        **log_timing_fields(phases),
+    ))
+
+    result.status = response.status_code
+    result.ok = response.status_code < 400
+    result.response_time = elapsed_ms
+    result.body_bytes = len(response.content)
+    result.truncated = response.truncated
+    result.timings = PhaseTimings(**phases)
+    if include_body:
+        result.body = decode_body(response.content, response.encoding, response.truncated)
+    return result
+
+
+async def run_batch(
+    client: httpx.AsyncClient,
+    user_id: int,
+    requests: list[SavedRequest],
+    concurrency: int,
+    per_host: int = HTTP_MAX_CONNECTIONS_PER_HOST,
+    include_body: bool = False,
+) -> AsyncIterator[BatchResult]:
+    """Run saved requests concurrently, yielding each result as it finishes.
+
+    At most ``concurrency`` requests are in flight, and at most
+    ``per_host`` of them (on top of the shared client's own per-host cap)
+    to any one host. A request waits for its host before it takes a
+    concurrency slot, so a batch dominated by one slow host still keeps
+    the others busy. Closing the iterator cancels what is left.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    host_slots: dict[str, asyncio.Semaphore] = {}
+
+    async def run(saved: SavedRequest) -> BatchResult:
+        host = urlsplit(saved.url).netloc
+        host_slot = host_slots.setdefault(host, asyncio.Semaphore(per_host))
+        async with host_slot, slots:
+            return await run_saved_request(client, user_id, saved, include_body)
+
+    tasks = [asyncio.create_task(run(saved)) for saved in requests]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def summarize(results: list[BatchResult], elapsed_ms: int) -> BatchSummary:
+    histogram = LatencyHistogram()
+    for result in results:
+        if result.response_time is not None:
+            histogram.record(result.response_time)
+    return BatchSummary(
+        total=len(results),
+        succeeded=sum(1 for result in results if result.ok),
+        failed=sum(1 for result in results if result.status is not None and not result.ok),
+        errors=sum(1 for result in results if result.error is not None),
+        elapsed_ms=elapsed_ms,
+        latency=histogram.summary(),
+    )
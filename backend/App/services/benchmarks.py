@@ -0,0 +1,261 @@
+# services/benchmarks.py
+import asyncio
+import logging
+import math
+import os
+from collections import Counter
+from datetime import timedelta
+from typing import Optional
+
+import httpx
+from sqlalchemy import update
+from sqlmodel import select
+
+from App.models.db import async_session
+from App.models.models import BenchmarkRun, SavedRequest, get_utc_now
+from App.services.batch_runner import run_saved_request
+from App.services.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+BENCHMARK_MAX_ITERATIONS = int(os.getenv("BENCHMARK_MAX_ITERATIONS", "200"))
+BENCHMARK_MIN_INTERVAL = int(os.getenv("BENCHMARK_MIN_INTERVAL", "60"))
+BENCHMARK_BASELINE_RUNS = int(os.getenv("BENCHMARK_BASELINE_RUNS", "5"))
+BENCHMARK_ALPHA = float(os.getenv("BENCHMARK_ALPHA", "0.01"))
+BENCHMARK_MIN_SLOWDOWN = float(os.getenv("BENCHMARK_MIN_SLOWDOWN", "0.1"))
+BENCHMARK_ERROR_RATE_MARGIN = float(os.getenv("BENCHMARK_ERROR_RATE_MARGIN", "0.05"))
+BENCHMARK_MAX_CONCURRENT = int(os.getenv("BENCHMARK_MAX_CONCURRENT", "2"))
+BENCHMARK_SCHEDULER_INTERVAL = 15.0  # seconds between looks for due benchmarks
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(samples: list[float], percent: float) -> Optional[float]:
+    """Linearly interpolated percentile (0-100) of unsorted samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * percent / 100
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return round(ordered[low] + (ordered[high] - ordered[low]) * (position - low), 3)
+
+
+def slower_p_value(current: list[float], baseline: list[float]) -> float:
+    """One-sided Mann-Whitney U test that ``current`` tends to be larger than ``baseline``.
+
+    Uses the normal approximation with tie and continuity corrections,
+    which holds from about 8 samples a side. Rank based, so a few
+    outliers do not decide it the way they would a t-test on latencies.
+    """
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted([(value, True) for value in current] + [(value, False) for value in baseline])
+    rank_sum = 0.0
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j < len(combined) and combined[j][0] == combined[i][0]:
+            j += 1
+        # Tied values share the mean of the ranks they span (1-based)
+        rank = (i + j + 1) / 2
+        rank_sum += rank * sum(1 for _, is_current in combined[i:j] if is_current)
+        tie_term += (j - i) ** 3 - (j - i)
+        i = j
+    n = n1 + n2
+    u = rank_sum - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def error_rate(status_counts: dict) -> float:
+    """Share of iterations that got no response or a 5xx"""
+    total = sum(status_counts.values())
+    if not total:
+        return 0.0
+    errors = sum(
+        count for status, count in status_counts.items()
+        if status == "error" or (status.isdigit() and int(status) >= 500)
+    )
+    return errors / total
+
+
+def compare(samples: list[float], status_counts: dict, baseline: list[BenchmarkRun]) -> Optional[dict]:
+    """How a run compares to the runs before it, None without any.
+
+    A run is a regression when its latencies are significantly higher
+    (BENCHMARK_ALPHA) and its median is at least BENCHMARK_MIN_SLOWDOWN
+    slower, or when its error rate is BENCHMARK_ERROR_RATE_MARGIN above
+    the baseline's.
+    """
+    if not baseline:
+        return None
+    baseline_samples = [sample for run in baseline for sample in run.samples]
+    baseline_counts = Counter()
+    for run in baseline:
+        baseline_counts.update(run.status_counts)
+
+    percentiles = {}
+    for percent in PERCENTILES:
+        before, after = percentile(baseline_samples, percent), percentile(samples, percent)
+        delta = round(after - before, 3) if before is not None and after is not None else None
+        percentiles[f"p{percent}"] = {
+            "baseline_ms": before,
+            "current_ms": after,
+            "delta_ms": delta,
+            "delta_pct": round(delta / before * 100, 1) if delta is not None and before else None,
+        }
+    p_value = slower_p_value(samples, baseline_samples)
+    errors_before, errors_after = error_rate(baseline_counts), error_rate(status_counts)
+
+    reasons = []
+    median_change = percentiles["p50"]["delta_pct"]
+    if p_value < BENCHMARK_ALPHA and median_change is not None and median_change >= BENCHMARK_MIN_SLOWDOWN * 100:
+        reasons.append("latency")
+    if errors_after - errors_before > BENCHMARK_ERROR_RATE_MARGIN:
+        reasons.append("errors")
+    return {
+        "baseline_runs": len(baseline),
+        "baseline_samples": len(baseline_samples),
+        "percentiles": percentiles,
+        "p_value": round(p_value, 6),
+        "error_rate": {"baseline": round(errors_before, 4), "current": round(errors_after, 4)},
+        "regression": bool(reasons),
+        "reasons": reasons,
+    }
+
+
+async def run_benchmark(
+    client: httpx.AsyncClient, saved: SavedRequest, trigger: str, iterations: Optional[int] = None
+) -> BenchmarkRun:
+    """Send a saved request ``iterations`` times and store the run with its comparison.
+
+    Iterations go one after another, so the run measures the upstream
+    rather than queueing behind itself. Each is logged like any proxy call.
+    """
+    iterations = iterations or saved.benchmark_iterations
+    started_at = get_utc_now()
+    samples, status_counts = [], Counter()
+    for _ in range(iterations):
+        result = await run_saved_request(client, saved.user_id, saved, include_body=False)
+        if result.status is None:
+            status_counts["error"] += 1
+            continue
+        status_counts[str(result.status)] += 1
+        samples.append(result.timings.total_ms)
+
+    async with async_session() as session:
+        # The rolling baseline: the runs just before this one
+        baseline = (await session.exec(
+            select(BenchmarkRun)
+            .where(BenchmarkRun.saved_request_id == saved.id)
+            .order_by(BenchmarkRun.started_at.desc(), BenchmarkRun.id.desc())
+            .limit(BENCHMARK_BASELINE_RUNS)
+        )).all()
+        comparison = compare(samples, status_counts, baseline)
+        run = BenchmarkRun(
+            saved_request_id=saved.id,
+            user_id=saved.user_id,
+            trigger=trigger,
+            started_at=started_at,
+            iterations=iterations,
+            samples=samples,
+            status_counts=dict(status_counts),
+            p50_ms=percentile(samples, 50),
+            p90_ms=percentile(samples, 90),
+            p99_ms=percentile(samples, 99),
+            comparison=comparison,
+            regression=bool(comparison and comparison["regression"]),
+        )
+        session.add(run)
+        await session.commit()
+        await session.refresh(run)
+    if run.regression:
+        logger.warning("Benchmark of saved request %d regressed: %s", saved.id, ", ".join(comparison["reasons"]))
+    return run
+
+
+class BenchmarkScheduler:
+    """Runs scheduled benchmarks once their interval has passed.
+
+    Every server process looks for due benchmarks, and claims one by
+    moving its last_benchmark_at forward with a conditional UPDATE, so
+    each is run by exactly one of them.
+    """
+
+    def __init__(self, interval: float = BENCHMARK_SCHEDULER_INTERVAL, max_concurrent: int = BENCHMARK_MAX_CONCURRENT):
+        self.interval = interval
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._task: Optional[asyncio.Task] = None
+        self._runs: set[asyncio.Task] = set()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        tasks = [task for task in [self._task, *self._runs] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                for saved in await self._claim_due():
+                    task = asyncio.create_task(self._run(saved))
+                    self._runs.add(task)
+                    task.add_done_callback(self._runs.discard)
+            except Exception:
+                logger.exception("Failed to schedule benchmarks")
+            await asyncio.sleep(self.interval)
+
+    async def _claim_due(self) -> list[SavedRequest]:
+        # Timestamps are stored as naive UTC, compare like with like
+        now = get_utc_now().replace(tzinfo=None)
+        claimed = []
+        async with async_session() as session:
+            scheduled = (await session.exec(
+                select(SavedRequest).where(SavedRequest.benchmark, SavedRequest.benchmark_interval.is_not(None))
+            )).all()
+            for saved in scheduled:
+                last = saved.last_benchmark_at
+                if last is not None and last + timedelta(seconds=saved.benchmark_interval) > now:
+                    continue
+                result = await session.execute(
+                    update(SavedRequest)
+                    .where(
+                        SavedRequest.id == saved.id,
+                        SavedRequest.last_benchmark_at == last if last is not None
+                        else SavedRequest.last_benchmark_at.is_(None),
+                    )
+                    .values(last_benchmark_at=now)
+                )
+                if result.rowcount == 1:
+                    claimed.append(saved)
+            await session.commit()
+        return claimed
+
+    async def _run(self, saved: SavedRequest):
+        try:
+            async with self._slots:
+                await run_benchmark(get_http_client(), saved, "schedule")
+        except Exception:
+            logger.exception("Scheduled benchmark of saved request %d failed", saved.id)
+
+
+benchmark_scheduler = BenchmarkScheduler()
+
+
+async def start_benchmark_scheduler():
+    await benchmark_scheduler.start()
+
+
+async def stop_benchmark_scheduler():
+    await benchmark_scheduler.stop()
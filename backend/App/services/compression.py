@@ -0,0 +1,66 @@
+# services/compression.py
+import gzip
+from typing import Optional
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip")
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def choose_encoding(accept_encoding: Optional[str], available) -> str:
+    """Best of ``available`` the Accept-Encoding header allows, "identity" when none is"""
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.partition(";")
+        key, _, value = params.partition("=")
+        if key.strip() == "q":
+            try:
+                if float(value) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    for encoding in ENCODINGS:
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+class PrecompressedBody:
+    """A response body compressed once, served in whichever encoding a client takes.
+
+    brotli is only used when the optional ``brotli`` package is installed.
+    """
+
+    def __init__(self, content: bytes):
+        self.variants = {"identity": content, "gzip": gzip.compress(content, GZIP_LEVEL)}
+        brotli = _brotli()
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(content, quality=BROTLI_QUALITY)
+
+    @property
+    def size(self) -> int:
+        return sum(len(variant) for variant in self.variants.values())
+
+    def encoded(self, accept_encoding: Optional[str]) -> tuple[bytes, str]:
+        encoding = choose_encoding(accept_encoding, self.variants)
+        return self.variants[encoding], encoding
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 asks for If-None-Match
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
@@ -0,0 +1,155 @@
+# services/discovery.py
+import asyncio
+import math
+import os
+from typing import Optional
+
+from App.schemas.rate_limit import (
+    LOAD_TEST_MAX_RPS_PER_WORKER,
+    DiscoveryProbe,
+    RateLimitDiscoveryRequest,
+    RateLimitDiscoveryResult,
+    RateLimitTestRequest,
+)
+from App.services.load_stats import LoadTestStats
+from App.services.load_test import run_load_test
+from App.services.rate_limit_headers import LimiterHints
+
+# Configuration
+DISCOVERY_MAX_COOLDOWN = float(os.getenv("DISCOVERY_MAX_COOLDOWN", "60"))
+DISCOVERY_DEFAULT_COOLDOWN = 1.0  # pause after a failed probe when the target gives no hint
+
+
+class Discovery:
+    """State shared by the probes of one discovery run"""
+
+    def __init__(self, payload: RateLimitDiscoveryRequest):
+        self.payload = payload
+        self.probes: list[DiscoveryProbe] = []
+        self.limiter = LimiterHints()
+        self.total_requests = 0
+        self.needs_cooldown = False
+
+    def probe_duration(self) -> int:
+        # A probe shorter than the limiter's window can pass on burst capacity alone
+        window = self.limiter.estimate()["window_seconds"]
+        if window:
+            return min(max(self.payload.step_duration, math.ceil(window)), 60)
+        return self.payload.step_duration
+
+    def within_budget(self, rps: int) -> bool:
+        return self.total_requests + rps * self.probe_duration() <= self.payload.max_total_requests
+
+    def cooldown(self) -> float:
+        hints = self.limiter.estimate()
+        wait = hints["retry_after_seconds"] or hints["window_seconds"] or DISCOVERY_DEFAULT_COOLDOWN
+        return min(wait, DISCOVERY_MAX_COOLDOWN)
+
+    async def probe(self, rps: int) -> bool:
+        if self.needs_cooldown:
+            # Let the limiter refill so the next probe starts from a clean slate
+            await asyncio.sleep(self.cooldown())
+
+        duration = self.probe_duration()
+        test = RateLimitTestRequest(
+            method=self.payload.method,
+            url=self.payload.url,
+            headers=self.payload.headers,
+            body=self.payload.body,
+            rps=rps,
+            duration=duration,
+            workers=math.ceil(rps / LOAD_TEST_MAX_RPS_PER_WORKER),
+        )
+        stats = LoadTestStats(duration)
+        result = await run_load_test(test, stats)
+        self.limiter.merge(stats.limiter)
+        self.total_requests += result.total_requests
+
+        reason = None
+        p99 = result.latency.p99_ms
+        if result.rate_limited_requests:
+            reason = "rate limited"
+        elif self.payload.max_p99_ms is not None and p99 is not None and p99 > self.payload.max_p99_ms:
+            reason = f"p99 {p99}ms over {self.payload.max_p99_ms}ms"
+        elif result.total_requests and result.other_errors / result.total_requests > self.payload.max_error_rate:
+            reason = "too many errors"
+
+        self.needs_cooldown = reason == "rate limited"
+        self.probes.append(DiscoveryProbe(
+            rps=rps,
+            duration=duration,
+            total_requests=result.total_requests,
+            rate_limited_requests=result.rate_limited_requests,
+            other_errors=result.other_errors,
+            achieved_rps=result.achieved_rps,
+            p99_ms=p99,
+            passed=reason is None,
+            reason=reason,
+        ))
+        return reason is None
+
+    def hinted_rps(self, low: int, high: int) -> Optional[int]:
+        """The sustained rate the headers advertise, if it lies strictly between the bounds"""
+        sustained = self.limiter.estimate()["sustained_rps"]
+        if sustained is None:
+            return None
+        rps = int(sustained)
+        if low < rps < high and all(probe.rps != rps for probe in self.probes):
+            return rps
+        return None
+
+
+async def ramp(discovery: Discovery) -> tuple[Optional[int], str]:
+    payload = discovery.payload
+    best = None
+    rps = payload.min_rps
+    while rps <= payload.max_rps:
+        if not discovery.within_budget(rps):
+            return best, "request budget exhausted"
+        if not await discovery.probe(rps):
+            return best, "limit found"
+        best = rps
+        rps += payload.step_rps
+    return best, "max_rps reached without hitting a limit"
+
+
+async def binary_search(discovery: Discovery) -> tuple[Optional[int], str]:
+    payload = discovery.payload
+    # Invariant: low passed (or is below min_rps), high failed (or is above max_rps)
+    low, high = payload.min_rps - 1, payload.max_rps + 1
+    reason = "limit found"
+
+    while high - low > payload.tolerance_rps:
+        # Jump straight to the advertised rate when the headers give one
+        rps = discovery.hinted_rps(low, high) or (low + high) // 2
+        if not discovery.within_budget(rps):
+            reason = "request budget exhausted"
+            break
+        if await discovery.probe(rps):
+            low = rps
+        else:
+            high = rps
+
+    # With a tolerance above 1, low can stop short of max_rps without any
+    # probe failing; only a failed probe means a limit was found
+    if reason == "limit found" and high > payload.max_rps:
+        reason = "max_rps reached without hitting a limit"
+    return (low if low >= payload.min_rps else None), reason
+
+
+async def discover_rate_limit(payload: RateLimitDiscoveryRequest) -> RateLimitDiscoveryResult:
+    """Find the highest sustained rate the target accepts without 429s"""
+    discovery = Discovery(payload)
+    if payload.strategy == "ramp":
+        best, reason = await ramp(discovery)
+    else:
+        best, reason = await binary_search(discovery)
+
+    return RateLimitDiscoveryResult(
+        strategy=payload.strategy,
+        max_sustained_rps=best,
+        probes=discovery.probes,
+        total_requests=discovery.total_requests,
+        stopped_reason=reason,
+        limiter=discovery.limiter.estimate(),
+    )
@@ -0,0 +1,112 @@
+# services/histogram.py
+from array import array
+from typing import Optional
+
+# Values are stored in microseconds and clamped to this range (about 71 minutes)
+HIGHEST_TRACKABLE_US = 2**32 - 1
+
+
+class LatencyHistogram:
+    """Fixed-memory, log-linear latency histogram in the spirit of HdrHistogram.
+
+    Values below 2**precision_bits microseconds get one bucket each; above
+    that every power of two is split into 2**(precision_bits - 1) linear
+    buckets, so the relative error stays under 1 / 2**(precision_bits - 1)
+    no matter how many values are recorded. Memory depends only on the
+    precision (about 14 KB at the default of 7 bits).
+    """
+
+    def __init__(self, precision_bits: int = 7):
+        self.precision_bits = precision_bits
+        self._sub_count = 1 << precision_bits
+        self._half_count = self._sub_count >> 1
+        self.counts = array("Q", bytes(8 * (self._index_of(HIGHEST_TRACKABLE_US) + 1)))
+        self.total = 0
+        self.sum_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+
+    def _index_of(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return self._sub_count + (shift - 1) * self._half_count + (value >> shift) - self._half_count
+
+    def _highest_value_of(self, index: int) -> int:
+        if index < self._sub_count:
+            return index
+        shift, top = divmod(index - self._sub_count, self._half_count)
+        shift += 1
+        return ((top + self._half_count + 1) << shift) - 1
+
+    def record(self, latency_ms: float):
+        value = min(max(int(latency_ms * 1000), 0), HIGHEST_TRACKABLE_US)
+        self.counts[self._index_of(value)] += 1
+        self.total += 1
+        self.sum_us += value
+        if self.min_us is None or value < self.min_us:
+            self.min_us = value
+        if self.max_us is None or value > self.max_us:
+            self.max_us = value
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Latency in milliseconds at the given percentile (0-100)"""
+        if not self.total:
+            return None
+        # Rank of the value we want, 1-based and never zero
+        rank = max(1, -(-self.total * percent // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                value = min(self._highest_value_of(index), self.max_us)
+                return round(max(value, self.min_us) / 1000, 3)
+        return round(self.max_us / 1000, 3)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add another histogram's values into this one (same precision only)"""
+        if other.precision_bits != self.precision_bits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self.sum_us += other.sum_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        if other.max_us is not None and (self.max_us is None or other.max_us > self.max_us):
+            self.max_us = other.max_us
+
+    def to_dict(self) -> dict:
+        """Sparse, picklable/JSON-friendly form for sending between processes"""
+        return {
+            "precision_bits": self.precision_bits,
+            "counts": {index: count for index, count in enumerate(self.counts) if count},
+            "total": self.total,
+            "sum_us": self.sum_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        histogram = cls(data["precision_bits"])
+        for index, count in data["counts"].items():
+            histogram.counts[int(index)] = count
+        histogram.total = data["total"]
+        histogram.sum_us = data["sum_us"]
+        histogram.min_us = data["min_us"]
+        histogram.max_us = data["max_us"]
+        return histogram
+
+    def summary(self) -> dict:
+        return {
+            "count": self.total,
+            "min_ms": round(self.min_us / 1000, 3) if self.min_us is not None else None,
+            "max_ms": round(self.max_us / 1000, 3) if self.max_us is not None else None,
+            "mean_ms": round(self.sum_us / self.total / 1000, 3) if self.total else None,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "p999_ms": self.percentile(99.9),
+        }
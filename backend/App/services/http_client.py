@@ -0,0 +1,164 @@
+# services/http_client.py
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from App.services.timings import TimedNetworkBackend
+
+# Configuration
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "50"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+class PoolCounters:
+    """Running totals used to tell new connections apart from reused ones"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+
+    async def on_request(self, request: httpx.Request):
+        self.requests += 1
+        timings = request.extensions.get("trace")
+        if timings is None:
+            request.extensions["trace"] = self.trace
+        else:
+            # The request is being timed as well, feed both
+            async def trace(event_name: str, info: dict):
+                await timings(event_name, info)
+                await self.trace(event_name, info)
+            request.extensions["trace"] = trace
+
+    async def trace(self, event_name: str, info: dict):
+        # httpcore only emits connect events when a brand new connection is made
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+
+class HostSlot:
+    """The per-host semaphore, with the requests holding or waiting for it"""
+
+    def __init__(self):
+        self.semaphore = asyncio.Semaphore(HTTP_MAX_CONNECTIONS_PER_HOST)
+        self.users = 0
+
+
+_client: Optional[httpx.AsyncClient] = None
+_counters = PoolCounters()
+# Only hosts with requests in flight, so it stays as small as the traffic
+_host_slots: dict[str, HostSlot] = {}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client(**overrides) -> httpx.AsyncClient:
+    """Build an AsyncClient with the application's pool settings"""
+    options = {
+        "timeout": HTTP_TIMEOUT,
+        "http2": HTTP2_ENABLED and _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+    options.update(overrides)
+    client = httpx.AsyncClient(**options)
+    # httpx has no option for the network backend, swap it on the pool it built
+    pool = getattr(client._transport, "_pool", None)
+    if pool is not None:
+        pool._network_backend = TimedNetworkBackend()
+    return client
+
+
+async def start_http_client():
+    """Create the shared client, called from the app lifespan"""
+    global _client, _counters
+    if _client is None:
+        _counters = PoolCounters()
+        _client = create_http_client(event_hooks={"request": [_counters.on_request]})
+
+
+async def close_http_client():
+    """Close the shared client and every pooled connection"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    _host_slots.clear()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Dependency returning the shared client"""
+    if _client is None:
+        raise RuntimeError("HTTP client is not started")
+    return _client
+
+
+@asynccontextmanager
+async def host_slot(url: str):
+    """Cap the number of concurrent upstream requests to a single host.
+
+    A host's slot is dropped as soon as no request holds or waits for it.
+    """
+    parts = urlsplit(url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    slot = _host_slots.get(key)
+    if slot is None:
+        slot = _host_slots[key] = HostSlot()
+    slot.users += 1
+    try:
+        async with slot.semaphore:
+            yield
+    finally:
+        slot.users -= 1
+        if not slot.users and _host_slots.get(key) is slot:
+            del _host_slots[key]
+
+
+def pool_stats() -> dict:
+    """Snapshot of the shared connection pool.
+
+    Connection counts come from httpx/httpcore internals; if those change
+    shape they are reported as "unavailable" rather than failing.
+    """
+    connection_counts = {"open_connections": 0, "idle_connections": 0, "active_connections": 0}
+    if _client is not None:
+        try:
+            pool = _client._transport._pool
+            open_connections = [c for c in pool.connections if not c.is_closed()]
+            idle = sum(1 for c in open_connections if c.is_idle())
+            connection_counts = {
+                "open_connections": len(open_connections),
+                "idle_connections": idle,
+                "active_connections": len(open_connections) - idle,
+            }
+        except (AttributeError, TypeError):
+            connection_counts = dict.fromkeys(connection_counts, "unavailable")
+
+    return {
+        "started": _client is not None,
+        "http2": bool(_client is not None and HTTP2_ENABLED and _http2_available()),
+        **connection_counts,
+        "total_requests": _counters.requests,
+        "connections_opened": _counters.connections_opened,
+        "reused_connections": max(_counters.requests - _counters.connections_opened, 0),
+        "max_connections": HTTP_MAX_CONNECTIONS,
+        "max_connections_per_host": HTTP_MAX_CONNECTIONS_PER_HOST,
+        "max_keepalive_connections": HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry": HTTP_KEEPALIVE_EXPIRY,
+    }
@@ -0,0 +1,194 @@
+# services/jobs.py
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import func, update
+
+from App.models.db import async_session
+from App.models.models import RateLimitJob, get_utc_now
+from App.schemas.rate_limit import RateLimitTestRequest
+from App.services.load_stats import LoadTestStats
+from App.services.load_test import run_load_test
+
+# Configuration
+RATE_LIMIT_MAX_CONCURRENT_JOBS = int(os.getenv("RATE_LIMIT_MAX_CONCURRENT_JOBS", "2"))
+RATE_LIMIT_JOB_STALE_AFTER = float(os.getenv("RATE_LIMIT_JOB_STALE_AFTER", "30"))
+JOB_PROGRESS_INTERVAL = 1.0  # seconds between progress writes
+JOB_HEARTBEAT_INTERVAL = 5.0  # seconds between heartbeats of a worker's jobs
+INTERRUPTED_ERROR = "Interrupted: the worker running this job stopped"
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = {"completed", "failed", "cancelled"}
+
+
+async def _update_job(job_id: int, **fields) -> Optional[RateLimitJob]:
+    async with async_session() as session:
+        job = await session.get(RateLimitJob, job_id)
+        if job is None:
+            return None
+        for key, value in fields.items():
+            setattr(job, key, value)
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+        return job
+
+
+async def _finish_job(job_id: int, status: str, **fields):
+    """Record a job's final status unless it already has one"""
+    async with async_session() as session:
+        job = await session.get(RateLimitJob, job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return
+    await _update_job(job_id, status=status, finished_at=get_utc_now(), **fields)
+
+
+class JobRunner:
+    """Runs rate limit test jobs in the background, at most max_concurrent at a time.
+
+    Jobs live in the rate_limit_jobs table, so any worker can list and poll
+    them. Cancelling sets cancel_requested; the worker running the job sees
+    it on its next progress write and stops the test.
+
+    Every worker heartbeats the jobs it holds, queued or running. A job
+    whose heartbeat goes stale lost its worker to a crash or a kill, and
+    is failed as interrupted by whichever worker notices first.
+    """
+
+    def __init__(self, max_concurrent: int = RATE_LIMIT_MAX_CONCURRENT_JOBS):
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await self.recover_interrupted()
+        self._heartbeat = asyncio.create_task(self._beat())
+
+    def submit(self, job_id: int):
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job running on this worker, returns False if it isn't here"""
+        task = self._tasks.get(job_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    async def stop(self):
+        """Cancel every job still running on this worker and wait for them"""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def recover_interrupted(self) -> int:
+        """Fail the queued and running jobs no worker has heartbeat for
+        RATE_LIMIT_JOB_STALE_AFTER seconds, returns how many"""
+        # Timestamps are stored as naive UTC, compare like with like
+        now = get_utc_now().replace(tzinfo=None)
+        async with async_session() as session:
+            result = await session.execute(
+                update(RateLimitJob)
+                .where(
+                    RateLimitJob.status.in_(("queued", "running")),
+                    func.coalesce(RateLimitJob.heartbeat_at, RateLimitJob.created_at)
+                    < now - timedelta(seconds=RATE_LIMIT_JOB_STALE_AFTER),
+                    RateLimitJob.id.not_in(list(self._tasks)),
+                )
+                .values(status="failed", error=INTERRUPTED_ERROR, finished_at=now)
+            )
+            await session.commit()
+        if result.rowcount:
+            logger.warning("Marked %d interrupted rate limit job(s) as failed", result.rowcount)
+        return result.rowcount
+
+    async def _beat(self):
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+            try:
+                if self._tasks:
+                    async with async_session() as session:
+                        await session.execute(
+                            update(RateLimitJob)
+                            .where(RateLimitJob.id.in_(list(self._tasks)))
+                            .values(heartbeat_at=get_utc_now().replace(tzinfo=None))
+                        )
+                        await session.commit()
+                await self.recover_interrupted()
+            except Exception:
+                logger.exception("Rate limit job heartbeat failed")
+
+    async def _run(self, job_id: int):
+        try:
+            async with self._slots:
+                await self._execute(job_id)
+        except asyncio.CancelledError:
+            # Cancelled while still queued, or the server is shutting down
+            await _finish_job(job_id, "cancelled")
+            raise
+        except Exception as e:
+            await _finish_job(job_id, "failed", error=str(e))
+
+    async def _execute(self, job_id: int):
+        async with async_session() as session:
+            job = await session.get(RateLimitJob, job_id)
+            if job is None or job.status != "queued":
+                return
+            if job.cancel_requested:
+                await _finish_job(job_id, "cancelled")
+                return
+            payload = RateLimitTestRequest(**job.request)
+
+        await _update_job(job_id, status="running", started_at=get_utc_now())
+        stats = LoadTestStats(payload.duration)
+        test = asyncio.create_task(run_load_test(payload, stats))
+
+        try:
+            second = 0
+            while True:
+                await asyncio.wait({test}, timeout=JOB_PROGRESS_INTERVAL)
+                if test.done():
+                    break
+                second = min(second + 1, payload.duration)
+                job = await _update_job(job_id, progress=stats.progress(second))
+                if job is None or job.cancel_requested:
+                    test.cancel()
+        finally:
+            # Reached on shutdown or cancel too, so sends never outlive the job
+            test.cancel()
+
+        if test.cancelled():
+            await _finish_job(job_id, "cancelled", progress=stats.progress(second))
+            return
+
+        result = test.result()
+        await _finish_job(
+            job_id,
+            "completed",
+            progress=stats.progress(payload.duration),
+            result=result.model_dump(mode="json"),
+        )
+
+
+job_runner = JobRunner()
+
+
+async def start_job_runner():
+    """Recover jobs interrupted by a dead worker and start heartbeating, called from the app lifespan"""
+    await job_runner.start()
+
+
+async def stop_job_runner():
+    """Cancel this worker's jobs on shutdown, called from the app lifespan"""
+    await job_runner.stop()
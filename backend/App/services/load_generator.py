@@ -0,0 +1,121 @@
+# services/load_generator.py
+import asyncio
+import os
+import random
+from typing import Awaitable, Callable, Iterable, Iterator
+
+# Configuration
+LOAD_TEST_MAX_IN_FLIGHT = int(os.getenv("LOAD_TEST_MAX_IN_FLIGHT", "5000"))
+LOAD_TEST_LATE_THRESHOLD = float(os.getenv("LOAD_TEST_LATE_THRESHOLD_MS", "10")) / 1000
+LOAD_TEST_MAX_LATENESS = float(os.getenv("LOAD_TEST_MAX_LATENESS_MS", "1000")) / 1000
+
+
+def arrival_offsets(
+    rps: int,
+    duration: int,
+    arrival: str = "uniform",
+    worker: int = 0,
+    workers: int = 1,
+) -> Iterator[float]:
+    """Yield send times in seconds from the start of the test.
+
+    "uniform" spaces requests exactly 1/rps apart, "poisson" draws
+    exponential gaps with the same mean so arrivals look like real traffic.
+    When the test is split across workers, each one gets every workers-th
+    uniform slot (or a Poisson stream at rps / workers), so together they
+    produce the requested rate.
+    """
+    if arrival == "poisson":
+        rate = rps / workers
+        offset = random.expovariate(rate)
+        while offset < duration:
+            yield offset
+            offset += random.expovariate(rate)
+        return
+
+    for index in range(worker, rps * duration, workers):
+        yield index / rps
+
+
+class ScheduleReport:
+    """What the scheduler actually managed to do"""
+
+    def __init__(self):
+        self.sent = 0
+        self.dropped = 0
+        self.late = 0
+        self.elapsed = 0.0
+
+    def merge(self, other: "ScheduleReport"):
+        self.sent += other.sent
+        self.dropped += other.dropped
+        self.late += other.late
+        self.elapsed = max(self.elapsed, other.elapsed)
+
+    def to_dict(self) -> dict:
+        return {"sent": self.sent, "dropped": self.dropped, "late": self.late, "elapsed": self.elapsed}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScheduleReport":
+        report = cls()
+        report.sent = data["sent"]
+        report.dropped = data["dropped"]
+        report.late = data["late"]
+        report.elapsed = data["elapsed"]
+        return report
+
+    def achieved_rps(self, duration: int) -> float:
+        # Sends are spread over the whole test window, so never divide by less than it
+        window = max(self.elapsed, duration)
+        return round(self.sent / window, 2) if window else 0.0
+
+
+async def run_open_loop(
+    send: Callable[[int, float, float], Awaitable[None]],
+    offsets: Iterable[float],
+    max_in_flight: int = LOAD_TEST_MAX_IN_FLIGHT,
+) -> ScheduleReport:
+    """Fire send(index, offset, scheduled_at) at each offset without waiting on responses.
+
+    scheduled_at is the loop time the send was due, so callers can measure
+    latency from the schedule and not hide the scheduler's own delay.
+    Pacing is done against the event loop's monotonic clock. A send that
+    misses its slot by more than LOAD_TEST_LATE_THRESHOLD is counted as
+    late; one that misses it by more than LOAD_TEST_MAX_LATENESS, or that
+    would exceed max_in_flight, is dropped instead of being sent in a
+    catch-up burst.
+    """
+    loop = asyncio.get_running_loop()
+    report = ScheduleReport()
+    in_flight: set[asyncio.Task] = set()
+    start = loop.time()
+
+    try:
+        for index, offset in enumerate(offsets):
+            target = start + offset
+            delay = target - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            lateness = loop.time() - target
+            if lateness > LOAD_TEST_MAX_LATENESS or len(in_flight) >= max_in_flight:
+                report.dropped += 1
+                continue
+            if lateness > LOAD_TEST_LATE_THRESHOLD:
+                report.late += 1
+
+            task = asyncio.create_task(send(index, offset, target))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            report.sent += 1
+
+        report.elapsed = loop.time() - start
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+    finally:
+        # On cancellation stop every outstanding send right away
+        for task in in_flight:
+            task.cancel()
+
+    return report
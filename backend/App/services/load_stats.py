@@ -0,0 +1,195 @@
+# services/load_stats.py
+from collections import Counter
+from typing import Optional
+
+from App.services.histogram import LatencyHistogram
+from App.services.rate_limit_headers import LimiterHints
+
+# Per-second histograms trade precision (under 1/2**4, ~6%) for a much smaller footprint
+SECOND_PRECISION_BITS = 5
+
+
+class SecondBucket:
+    """Counters and latencies for requests scheduled within one second of the test"""
+
+    def __init__(self):
+        self.sent = 0
+        self.ok_2xx = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.latency = LatencyHistogram(SECOND_PRECISION_BITS)
+
+    def merge(self, other: "SecondBucket"):
+        self.sent += other.sent
+        self.ok_2xx += other.ok_2xx
+        self.rate_limited += other.rate_limited
+        self.errors += other.errors
+        self.latency.merge(other.latency)
+
+    def summary(self, second: int) -> dict:
+        return {
+            "second": second,
+            "sent": self.sent,
+            "ok_2xx": self.ok_2xx,
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "p50_ms": self.latency.percentile(50),
+            "p90_ms": self.latency.percentile(90),
+            "p99_ms": self.latency.percentile(99),
+        }
+
+
+class LoadTestStats:
+    """Aggregates of a load test run.
+
+    Memory is fixed by the test duration, not by the number of requests:
+    one overall histogram plus one small histogram per second.
+    """
+
+    def __init__(self, duration: int):
+        self.duration = duration
+        self.total = 0
+        self.success = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.error_reasons: Counter = Counter()
+        self.latency = LatencyHistogram()
+        self.seconds = [SecondBucket() for _ in range(duration)]
+        self.limiter = LimiterHints()
+        # (index in send order, offset) of the earliest request that got a 429
+        self.first_429: Optional[tuple[int, float]] = None
+
+    def _bucket(self, offset: float) -> SecondBucket:
+        return self.seconds[min(max(int(offset), 0), self.duration - 1)]
+
+    def mark_sent(self, offset: float):
+        self._bucket(offset).sent += 1
+
+    def record(
+        self,
+        index: int,
+        offset: float,
+        status: Optional[int],
+        latency_ms: float,
+        error: Optional[str] = None,
+        hints: Optional[dict] = None,
+    ):
+        bucket = self._bucket(offset)
+        self.total += 1
+        self.limiter.observe(hints)
+        self.latency.record(latency_ms)
+        bucket.latency.record(latency_ms)
+
+        if status == 429:
+            self.rate_limited += 1
+            bucket.rate_limited += 1
+            if self.first_429 is None or index < self.first_429[0]:
+                self.first_429 = (index, offset)
+            return
+
+        if status and 200 <= status < 300:
+            bucket.ok_2xx += 1
+        if status and status < 400:
+            self.success += 1
+            return
+
+        self.errors += 1
+        bucket.errors += 1
+        self.error_reasons[error or f"HTTP {status}"] += 1
+
+    def progress(self, second: int) -> dict:
+        """Running totals plus the aggregates of the given (1-based) second"""
+        current = self.seconds[min(max(second, 1), self.duration) - 1]
+        return {
+            "sent": sum(bucket.sent for bucket in self.seconds),
+            "completed": self.total,
+            "successful_requests": self.success,
+            "rate_limited_requests": self.rate_limited,
+            "other_errors": self.errors,
+            "latency": self.latency.summary(),
+            "current": current.summary(second),
+        }
+
+    def merge(self, other: "LoadTestStats"):
+        """Fold in the stats of another run of the same test, e.g. from a worker process"""
+        self.total += other.total
+        self.success += other.success
+        self.rate_limited += other.rate_limited
+        self.errors += other.errors
+        self.error_reasons.update(other.error_reasons)
+        self.latency.merge(other.latency)
+        for bucket, other_bucket in zip(self.seconds, other.seconds):
+            bucket.merge(other_bucket)
+        self.limiter.merge(other.limiter)
+        if other.first_429 and (self.first_429 is None or other.first_429[0] < self.first_429[0]):
+            self.first_429 = other.first_429
+
+    def to_dict(self) -> dict:
+        return {
+            "duration": self.duration,
+            "total": self.total,
+            "success": self.success,
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "error_reasons": dict(self.error_reasons),
+            "latency": self.latency.to_dict(),
+            "seconds": [
+                {
+                    "sent": bucket.sent,
+                    "ok_2xx": bucket.ok_2xx,
+                    "rate_limited": bucket.rate_limited,
+                    "errors": bucket.errors,
+                    "latency": bucket.latency.to_dict(),
+                }
+                for bucket in self.seconds
+            ],
+            "first_429": self.first_429,
+            "limiter": self.limiter.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LoadTestStats":
+        stats = cls(data["duration"])
+        stats.total = data["total"]
+        stats.success = data["success"]
+        stats.rate_limited = data["rate_limited"]
+        stats.errors = data["errors"]
+        stats.error_reasons = Counter(data["error_reasons"])
+        stats.latency = LatencyHistogram.from_dict(data["latency"])
+        for bucket, bucket_data in zip(stats.seconds, data["seconds"]):
+            bucket.sent = bucket_data["sent"]
+            bucket.ok_2xx = bucket_data["ok_2xx"]
+            bucket.rate_limited = bucket_data["rate_limited"]
+            bucket.errors = bucket_data["errors"]
+            bucket.latency = LatencyHistogram.from_dict(bucket_data["latency"])
+        stats.first_429 = tuple(data["first_429"]) if data["first_429"] else None
+        stats.limiter = LimiterHints.from_dict(data["limiter"])
+        return stats
+
+    def timeline(self) -> list[dict]:
+        return [bucket.summary(second + 1) for second, bucket in enumerate(self.seconds)]
+
+    def result_fields(self) -> dict:
+        """Everything RateLimitTestResult needs apart from the schedule report"""
+        first_429_request = None
+        first_429_second = None
+        max_safe_rps = None
+        if self.first_429:
+            first_429_request = self.first_429[0] + 1
+            first_429_second = int(self.first_429[1]) + 1
+            successful_requests_before_429 = first_429_request - 1
+            max_safe_rps = successful_requests_before_429 // first_429_second
+
+        return {
+            "total_requests": self.total,
+            "successful_requests": self.success,
+            "rate_limited_requests": self.rate_limited,
+            "other_errors": self.errors,
+            "first_429_at_request": first_429_request,
+            "first_429_at_second": first_429_second,
+            "max_safe_rps_estimate": max_safe_rps,
+            "latency": self.latency.summary(),
+            "timeline": self.timeline(),
+            "error_reasons": dict(self.error_reasons),
+            "limiter": self.limiter.estimate(),
+        }
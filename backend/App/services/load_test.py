@@ -0,0 +1,85 @@
+# services/load_test.py
+import asyncio
+from typing import Optional
+
+import httpx
+
+from App.schemas.rate_limit import RateLimitTestRequest, RateLimitTestResult
+from App.services.http_client import create_http_client
+from App.services.load_generator import arrival_offsets, run_open_loop, ScheduleReport, LOAD_TEST_MAX_IN_FLIGHT
+from App.services.load_stats import LoadTestStats
+from App.services.rate_limit_headers import parse_rate_limit_headers
+
+
+async def send_request(client, payload):
+    """Send one request, returning (status_code, error_reason, rate_limit_hints)"""
+    try:
+        res = await client.request(
+            method=payload.method,
+            url=str(payload.url),
+            headers=payload.headers,
+            json=payload.body if payload.method != "GET" else None,
+            timeout=10
+        )
+        return res.status_code, None, parse_rate_limit_headers(res.headers)
+    except Exception as e:
+        return None, type(e).__name__, None
+
+
+async def execute_load(
+    payload: RateLimitTestRequest,
+    stats: LoadTestStats,
+    worker: int = 0,
+    workers: int = 1,
+) -> ScheduleReport:
+    """Drive this worker's share of the test on the current event loop"""
+    loop = asyncio.get_running_loop()
+
+    async def send(index, offset, scheduled_at):
+        # Global position in send order, so the first 429 is comparable across workers
+        index = index * workers + worker
+        stats.mark_sent(offset)
+        status, error, hints = await send_request(client, payload)
+        # Measured from the scheduled time, so queueing delay is not hidden
+        latency_ms = (loop.time() - scheduled_at) * 1000
+        stats.record(index, offset, status, latency_ms, error, hints)
+
+    # A dedicated pool sized for the test, so it never starves /api/proxy
+    share = max(payload.rps // workers, 1)
+    limits = httpx.Limits(max_connections=LOAD_TEST_MAX_IN_FLIGHT, max_keepalive_connections=share)
+    async with create_http_client(limits=limits) as client:
+        return await run_open_loop(
+            send, arrival_offsets(payload.rps, payload.duration, payload.arrival, worker, workers)
+        )
+
+
+def build_result(payload: RateLimitTestRequest, stats: LoadTestStats, schedule: ScheduleReport) -> RateLimitTestResult:
+    return RateLimitTestResult(
+        **stats.result_fields(),
+        target_rps=payload.rps,
+        achieved_rps=schedule.achieved_rps(payload.duration),
+        dropped_requests=schedule.dropped,
+        late_requests=schedule.late,
+    )
+
+
+async def run_load_test(
+    payload: RateLimitTestRequest,
+    stats: Optional[LoadTestStats] = None,
+) -> RateLimitTestResult:
+    """Run one paced load test, filling stats as responses arrive.
+
+    Pass your own stats object to read partial results while the test runs
+    (with workers > 1 it is only filled in when the workers finish).
+    Cancelling the calling task stops every in-flight send.
+    """
+    stats = stats or LoadTestStats(payload.duration)
+
+    if payload.workers > 1:
+        # Imported here because the worker module imports this one
+        from App.services.load_workers import execute_distributed
+        schedule = await execute_distributed(payload, stats)
+    else:
+        schedule = await execute_load(payload, stats)
+
+    return build_result(payload, stats, schedule)
@@ -0,0 +1,90 @@
+# services/load_workers.py
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from App.schemas.rate_limit import LOAD_TEST_MAX_WORKERS, RateLimitTestRequest
+from App.services.load_generator import ScheduleReport
+from App.services.load_stats import LoadTestStats
+from App.services.load_test import execute_load
+
+# Head start given to the workers so they all begin on the same tick
+WORKER_START_DELAY = 1.0
+STOP_POLL_INTERVAL = 0.1
+
+_pool: Optional[ProcessPoolExecutor] = None
+_manager = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _manager
+    if _pool is None:
+        # spawn, not fork: the parent has a running event loop and open sockets
+        context = multiprocessing.get_context("spawn")
+        _manager = context.Manager()
+        _pool = ProcessPoolExecutor(max_workers=LOAD_TEST_MAX_WORKERS, mp_context=context)
+    return _pool
+
+
+def shutdown_worker_pool():
+    """Stop the worker processes, called from the app lifespan"""
+    global _pool, _manager
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+    if _manager is not None:
+        _manager.shutdown()
+        _manager = None
+
+
+async def _worker_run(payload: RateLimitTestRequest, worker: int, workers: int, start_at: float, stop_event):
+    stats = LoadTestStats(payload.duration)
+
+    delay = start_at - time.time()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    test = asyncio.create_task(execute_load(payload, stats, worker, workers))
+    # The parent can't cancel a task in another process, so watch for its stop flag
+    while not test.done():
+        await asyncio.wait({test}, timeout=STOP_POLL_INTERVAL)
+        if not test.done() and stop_event.is_set():
+            test.cancel()
+            break
+
+    schedule = ScheduleReport() if test.cancelled() else test.result()
+    return {"stats": stats.to_dict(), "schedule": schedule.to_dict()}
+
+
+def _worker_main(payload_data: dict, worker: int, workers: int, start_at: float, stop_event) -> dict:
+    """Entry point in each worker process: its own event loop and its own httpx pool"""
+    payload = RateLimitTestRequest(**payload_data)
+    return asyncio.run(_worker_run(payload, worker, workers, start_at, stop_event))
+
+
+async def execute_distributed(payload: RateLimitTestRequest, stats: LoadTestStats) -> ScheduleReport:
+    """Split the test's rate across payload.workers processes and merge what they measured"""
+    pool = _get_pool()
+    stop_event = _manager.Event()
+    loop = asyncio.get_running_loop()
+    start_at = time.time() + WORKER_START_DELAY
+    payload_data = payload.model_dump(mode="json")
+
+    futures = [
+        loop.run_in_executor(pool, _worker_main, payload_data, worker, payload.workers, start_at, stop_event)
+        for worker in range(payload.workers)
+    ]
+
+    try:
+        results = await asyncio.gather(*futures)
+    except asyncio.CancelledError:
+        stop_event.set()
+        raise
+
+    schedule = ScheduleReport()
+    for result in results:
+        stats.merge(LoadTestStats.from_dict(result["stats"]))
+        schedule.merge(ScheduleReport.from_dict(result["schedule"]))
+    return schedule
@@ -0,0 +1,147 @@
+# services/log_writer.py
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from sqlalchemy import insert
+
+from App.models.db import async_session
+from App.models.models import ProxyLog
+from App.services.rollups import prune_rollups, update_rollups
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+PROXY_LOG_BATCH_SIZE = int(os.getenv("PROXY_LOG_BATCH_SIZE", "200"))
+PROXY_LOG_FLUSH_INTERVAL = float(os.getenv("PROXY_LOG_FLUSH_INTERVAL", "1.0"))
+PROXY_LOG_QUEUE_SIZE = int(os.getenv("PROXY_LOG_QUEUE_SIZE", "10000"))
+ROLLUP_PRUNE_INTERVAL = 3600.0
+
+_STOP = object()
+
+
+class ProxyLogWriter:
+    """Write-behind persistence for ProxyLog rows.
+
+    Handlers put logs on a bounded queue and return immediately; a
+    background task inserts them in batches once PROXY_LOG_BATCH_SIZE rows
+    are waiting or PROXY_LOG_FLUSH_INTERVAL seconds have passed. When the
+    queue is full, enqueue waits, which slows producers down instead of
+    letting memory grow. A writer task that dies is logged and restarted,
+    so enqueue never waits on a queue nobody drains.
+
+    Each batch is folded into the analytics rollups in the same
+    transaction, so rollups and raw logs never disagree.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = PROXY_LOG_BATCH_SIZE,
+        flush_interval: float = PROXY_LOG_FLUSH_INTERVAL,
+        queue_size: int = PROXY_LOG_QUEUE_SIZE,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_prune: Optional[float] = None
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._start_task()
+
+    async def enqueue(self, log: ProxyLog):
+        if self._queue is None or self._task.done():
+            # Writer not running (e.g. scripts and tests, or cancelled), fall back to a direct write
+            await self._write([log])
+            return
+        await self._queue.put(log)
+
+    async def stop(self):
+        """Write out everything still queued, then stop the background task"""
+        if self._task is None:
+            return
+        # The sentinel queues up behind every pending log, so nothing is left out
+        if not self._task.done():
+            await self._queue.put(_STOP)
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._queue = None
+
+    def _start_task(self):
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._restart_if_crashed)
+
+    def _restart_if_crashed(self, task: asyncio.Task):
+        if task is not self._task or task.cancelled() or task.exception() is None:
+            return
+        # The batch in hand is lost, whatever is still queued is written by the new task
+        logger.error("Proxy log writer crashed, restarting it", exc_info=task.exception())
+        self._start_task()
+
+    async def _next_batch(self) -> tuple[list[ProxyLog], bool]:
+        """Wait for logs, then gather more until the batch is full or due.
+
+        Returns the batch and whether the stop sentinel was reached.
+        """
+        batch = []
+        item = await self._queue.get()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while item is not _STOP:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                return batch, False
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return batch, False
+        return batch, True
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._write(batch)
+
+    async def _write(self, batch: list[ProxyLog]):
+        # A Core executemany, the ORM would insert row by row to fetch every new id
+        rows = [log.model_dump(exclude={"id"}) for log in batch]
+        try:
+            async with async_session() as session:
+                await session.execute(insert(ProxyLog), rows)
+                await update_rollups(session, batch)
+                if self._prune_due():
+                    await prune_rollups(session)
+                await session.commit()
+        except Exception:
+            logger.exception("Failed to write %d proxy logs", len(batch))
+
+    def _prune_due(self) -> bool:
+        now = time.monotonic()
+        if self._last_prune is not None and now - self._last_prune < ROLLUP_PRUNE_INTERVAL:
+            return False
+        self._last_prune = now
+        return True
+
+
+proxy_log_writer = ProxyLogWriter()
+
+
+async def enqueue_proxy_log(log: ProxyLog):
+    await proxy_log_writer.enqueue(log)
+
+
+async def start_log_writer():
+    await proxy_log_writer.start()
+
+
+async def stop_log_writer():
+    await proxy_log_writer.stop()
@@ -0,0 +1,320 @@
+# services/openapi_cache.py
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+import ijson
+
+from App.services.compression import PrecompressedBody
+from App.services.openapi_parser import SpecError, is_yaml, load_spec_document, parse_spec
+from App.services.openapi_search import SearchIndex
+from App.services.openapi_stream import StreamingIndex, index_entry
+from App.services.single_flight import SingleFlight
+
+# Configuration
+OPENAPI_CACHE_MAX_BYTES = int(os.getenv("OPENAPI_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+OPENAPI_FETCH_TIMEOUT = float(os.getenv("OPENAPI_FETCH_TIMEOUT", "15"))
+# A streamed body that still is not valid JSON this far in is an error, not YAML
+STREAM_SNIFF_BYTES = 64 * 1024
+
+
+class SpecFetchError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"Failed to fetch spec: HTTP {status_code}")
+        self.status_code = status_code
+
+
+class ParsedSpec:
+    """A parsed spec: a compact endpoint index, encoded and compressed once,
+    the full details of each operation, served one at a time, and a search
+    index over the operations"""
+
+    def __init__(self, spec_url: str, content_hash: str, result: dict):
+        self.spec_url = spec_url
+        self.content_hash = content_hash
+        self.info = result["info"]
+        self.servers = result["servers"]
+        self.version = result["version"]
+        # Stands for this URL and this content, details requests name the spec by it
+        self.spec_id = hashlib.sha256(f"{spec_url}\n{content_hash}".encode()).hexdigest()[:32]
+        self.operations = {endpoint["id"]: endpoint for endpoint in result["endpoints"]}
+        self.search_index = SearchIndex(result["endpoints"])
+        self._positions = list(self.operations)
+        index = {
+            "spec_id": self.spec_id,
+            "info": result["info"],
+            "servers": result["servers"],
+            "version": result["version"],
+            "endpoints": [index_entry(endpoint) for endpoint in result["endpoints"]],
+        }
+        self.index = PrecompressedBody(json.dumps(index, separators=(",", ":")).encode())
+        # Operation dicts take a few times their JSON size in memory
+        operations_size = len(json.dumps(result["endpoints"]))
+        self.size = self.index.size + operations_size * 3 + self.search_index.approximate_bytes
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.spec_id}"'
+
+    def search(self, query: str, **filters) -> dict:
+        """SearchIndex.search, with index entries in place of positions"""
+        found = self.search_index.search(query, **filters)
+        found["results"] = [
+            {**index_entry(self.operations[self._positions[position]]), "score": score}
+            for position, score in found["results"]
+        ]
+        return found
+
+
+class _Validators:
+    def __init__(self, content_hash: str, etag: Optional[str], last_modified: Optional[str]):
+        self.content_hash = content_hash
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class SpecCache:
+    """Parsed OpenAPI specs, shared by every user.
+
+    Parses are stored by spec URL and SHA-256 of the document (the URL
+    matters, it supplies the base URL when the spec has no servers), and
+    each URL remembers the hash and validators of its last fetch. A load
+    sends a conditional GET; a 304, or a 200 whose body hashes to the
+    stored parse, reuses that parse. Least recently used parses go first once
+    OPENAPI_CACHE_MAX_BYTES is reached; the latest one is kept even if it
+    is larger than that by itself, so its spec_id can be resolved.
+    """
+
+    def __init__(self, max_bytes: int = OPENAPI_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._parsed: OrderedDict[tuple[str, str], ParsedSpec] = OrderedDict()
+        self._urls: dict[str, _Validators] = {}
+        self._ids: dict[str, tuple[str, str]] = {}
+        self._flights = SingleFlight()
+
+    async def load(self, client: httpx.AsyncClient, spec_url: str) -> tuple[ParsedSpec, bool]:
+        """The parsed spec behind ``spec_url`` and whether it came from the cache.
+
+        Concurrent loads of one URL share a single fetch.
+        """
+        outcome, _ = await self._flights.do(spec_url, lambda: self._load(client, spec_url))
+        return outcome
+
+    async def stream(
+        self, client: httpx.AsyncClient, spec_url: str, page_size: int
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """Load ``spec_url`` as a series of events, for specs too large to wait for.
+
+        ("endpoints", {"endpoints": [...]}) pages of index entries are
+        yielded while a JSON document is still downloading (see
+        StreamingIndex), then pages of whatever the full parse found that
+        was not streamed (everything, for YAML and for cached parses), then
+        one ("done", {...}) with the index metadata. The parse is cached
+        exactly as load() caches it, so operation details can be fetched
+        by the spec_id in "done".
+
+        A JSON body is decoded once, as it arrives, and hashed in the same
+        pass; only its first STREAM_SNIFF_BYTES are held, in case it turns
+        out not to be JSON at all and has to be loaded like load() does.
+        """
+        known = self._known(spec_url)
+        streamed: set[str] = set()
+        page: list[dict] = []
+        async with client.stream(
+            "GET",
+            spec_url,
+            headers=known.headers() if known else None,
+            follow_redirects=True,
+            timeout=OPENAPI_FETCH_TIMEOUT,
+        ) as res:
+            if res.status_code == 304 and known is not None:
+                parsed, cached = self._hit(spec_url, known.content_hash), True
+                if parsed is None:
+                    # Evicted while the upstream answered, fetch it whole
+                    parsed, cached = await self._load(client, spec_url, conditional=False)
+            elif res.status_code != 200:
+                raise SpecFetchError(res.status_code)
+            else:
+                content_type = res.headers.get("content-type", "").lower()
+                index = None if is_yaml(content_type, spec_url) else StreamingIndex(spec_url)
+                digest = hashlib.sha256()
+                # The body so far, while it may still need loading as a whole
+                chunks: Optional[list[bytes]] = []
+                received = 0
+                async for chunk in res.aiter_bytes():
+                    digest.update(chunk)
+                    received += len(chunk)
+                    if chunks is not None:
+                        chunks.append(chunk)
+                    if index is None:
+                        continue
+                    try:
+                        page += index.feed(chunk)
+                    except ijson.JSONError as e:
+                        if chunks is None:
+                            raise SpecError(f"Invalid JSON response. Content-Type: {content_type}. Error: {e}")
+                        # Not JSON from the start (YAML or HTML), nothing was streamed
+                        index, page = None, []
+                        continue
+                    if received > STREAM_SNIFF_BYTES:
+                        chunks = None
+                    while len(page) >= page_size:
+                        streamed.update(entry["id"] for entry in page[:page_size])
+                        yield "endpoints", {"endpoints": page[:page_size]}
+                        page = page[page_size:]
+
+                if index is None:
+                    parsed, cached = await self._parsed_content(spec_url, b"".join(chunks), res.headers)
+                else:
+                    try:
+                        index.close()
+                    except ijson.JSONError as e:
+                        raise SpecError(f"Invalid JSON response. Content-Type: {content_type}. Error: {e}")
+                    document = index.document()
+                    parsed, cached = await self._cached_or_parse(
+                        spec_url, digest.hexdigest(), res.headers,
+                        lambda content_hash: ParsedSpec(spec_url, content_hash, parse_spec(document, spec_url)),
+                    )
+                    del document, index
+
+        if page:
+            streamed.update(entry["id"] for entry in page)
+            yield "endpoints", {"endpoints": page}
+        rest = [
+            index_entry(endpoint)
+            for operation_id, endpoint in parsed.operations.items()
+            if operation_id not in streamed
+        ]
+        for start in range(0, len(rest), page_size):
+            yield "endpoints", {"endpoints": rest[start:start + page_size]}
+        yield "done", {
+            "spec_id": parsed.spec_id,
+            "etag": parsed.etag,
+            "info": parsed.info,
+            "servers": parsed.servers,
+            "version": parsed.version,
+            "total": len(parsed.operations),
+            "cache": "hit" if cached else "miss",
+        }
+
+    async def _load(
+        self, client: httpx.AsyncClient, spec_url: str, conditional: bool = True
+    ) -> tuple[ParsedSpec, bool]:
+        known = self._known(spec_url) if conditional else None
+        res = await client.get(
+            spec_url,
+            headers=known.headers() if known else None,
+            follow_redirects=True,
+            timeout=OPENAPI_FETCH_TIMEOUT,
+        )
+
+        if res.status_code == 304 and known is not None:
+            parsed = self._hit(spec_url, known.content_hash)
+            if parsed is not None:
+                return parsed, True
+            # Another URL's parse evicted this one while the upstream answered
+            return await self._load(client, spec_url, conditional=False)
+        if res.status_code != 200:
+            raise SpecFetchError(res.status_code)
+        return await self._parsed_content(spec_url, res.content, res.headers)
+
+    def _known(self, spec_url: str) -> Optional[_Validators]:
+        """Validators of the URL's last fetch, if its parse is still cached"""
+        known = self._urls.get(spec_url)
+        if known is not None and (spec_url, known.content_hash) not in self._parsed:
+            return None
+        return known
+
+    async def _parsed_content(
+        self, spec_url: str, content: bytes, headers: httpx.Headers
+    ) -> tuple[ParsedSpec, bool]:
+        content_type = headers.get("content-type", "").lower()
+        return await self._cached_or_parse(
+            spec_url, hashlib.sha256(content).hexdigest(), headers,
+            lambda content_hash: self._parse(content, content_type, spec_url, content_hash),
+        )
+
+    async def _cached_or_parse(
+        self, spec_url: str, content_hash: str, headers: httpx.Headers, parse: Callable[[str], ParsedSpec]
+    ) -> tuple[ParsedSpec, bool]:
+        """The cached parse of this content, or ``parse(content_hash)`` stored as it"""
+        self._urls[spec_url] = _Validators(
+            content_hash, headers.get("etag"), headers.get("last-modified")
+        )
+        parsed = self._hit(spec_url, content_hash)
+        if parsed is not None:
+            return parsed, True
+
+        # Parsing a large spec takes long enough to stall every other request
+        parsed = await asyncio.to_thread(parse, content_hash)
+        self.misses += 1
+        self._store(spec_url, parsed)
+        return parsed, False
+
+    @staticmethod
+    def _parse(content: bytes, content_type: str, spec_url: str, content_hash: str) -> ParsedSpec:
+        spec = load_spec_document(content, content_type, spec_url)
+        return ParsedSpec(spec_url, content_hash, parse_spec(spec, spec_url))
+
+    def get(self, spec_id: str) -> Optional[ParsedSpec]:
+        """A spec still in the cache, by the spec_id of its index"""
+        key = self._ids.get(spec_id)
+        if key is None:
+            return None
+        self._parsed.move_to_end(key)
+        return self._parsed[key]
+
+    def _hit(self, spec_url: str, content_hash: str) -> Optional[ParsedSpec]:
+        """The cached parse, None if it has been evicted since it was looked up"""
+        key = (spec_url, content_hash)
+        if key not in self._parsed:
+            return None
+        self.hits += 1
+        self._parsed.move_to_end(key)
+        return self._parsed[key]
+
+    def _store(self, spec_url: str, parsed: ParsedSpec):
+        # A changed document replaces the URL's previous parse
+        for key in [key for key in self._parsed if key[0] == spec_url]:
+            self._remove(key)
+        key = (spec_url, parsed.content_hash)
+        self._parsed[key] = parsed
+        self._ids[parsed.spec_id] = key
+        self.size += parsed.size
+        # The newest parse stays even alone over budget, its spec_id was just handed out
+        while self.size > self.max_bytes and len(self._parsed) > 1:
+            evicted = next(iter(self._parsed))
+            self._remove(evicted)
+            self._urls.pop(evicted[0], None)
+
+    def _remove(self, key: tuple[str, str]):
+        parsed = self._parsed.pop(key)
+        self._ids.pop(parsed.spec_id, None)
+        self.size -= parsed.size
+
+    def stats(self) -> dict:
+        return {
+            "specs": len(self._parsed),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+spec_cache = SpecCache()
@@ -0,0 +1,333 @@
+# services/openapi_parser.py
+import json
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import yaml
+
+from App.services.openapi_refs import RefResolver
+
+# Nested objects deeper than this are left out of generated examples
+MAX_EXAMPLE_DEPTH = 32
+HTTP_METHODS = ("GET", "POST", "PUT", "DELETE", "PATCH")
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+
+class _SpecLoader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
+    """libyaml's safe loader when available, leaving dates as strings so
+    parsed specs stay JSON serializable"""
+
+
+_SpecLoader.yaml_implicit_resolvers = {
+    first: [resolver for resolver in resolvers if resolver[0] != "tag:yaml.org,2002:timestamp"]
+    for first, resolvers in _SpecLoader.yaml_implicit_resolvers.items()
+}
+
+
+class SpecError(Exception):
+    """The document is not an OpenAPI spec we can use, the message says why"""
+
+
+def is_yaml(content_type: str, spec_url: str) -> bool:
+    return "yaml" in content_type or urlparse(spec_url).path.lower().endswith(YAML_EXTENSIONS)
+
+
+def load_spec_document(content: bytes, content_type: str, spec_url: str = "") -> dict:
+    """Decode the fetched JSON or YAML document, telling HTML docs pages apart from broken JSON"""
+    if is_yaml(content_type, spec_url):
+        return load_yaml_document(content)
+    try:
+        return json.loads(content)
+    except ValueError as json_err:
+        text = content.decode("utf-8", errors="replace").strip()
+        # Check if it's HTML
+        if "text/html" in content_type or text.startswith("<!DOCTYPE") or text.startswith("<html"):
+            raise SpecError(
+                "URL returned HTML instead of JSON. Make sure you're using the direct spec URL (e.g., /openapi.json or /swagger.json), not the docs page URL."
+            )
+        # YAML served without a telling Content-Type or extension
+        if not text.startswith(("{", "[")):
+            try:
+                return load_yaml_document(content)
+            except SpecError:
+                pass
+        raise SpecError(
+            f"Invalid JSON response. Content-Type: {content_type}. Error: {str(json_err)}"
+        )
+
+
+def load_yaml_document(content: bytes) -> dict:
+    try:
+        spec = yaml.load(content, Loader=_SpecLoader)
+    except yaml.YAMLError as e:
+        raise SpecError(f"Invalid YAML response. Error: {str(e)}")
+    if not isinstance(spec, dict):
+        raise SpecError("Invalid YAML response. Error: the document is not a mapping")
+    return spec
+
+
+def base_url_of(servers: Any, spec_url: str) -> str:
+    """The first server URL, or the spec URL's origin when the spec names no server"""
+    if isinstance(servers, list) and servers and isinstance(servers[0], dict):
+        server_url = servers[0].get("url", "")
+        if server_url:
+            return server_url.rstrip('/')
+    parsed = urlparse(spec_url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def operation_id_of(method: str, path: str, details: dict, operation_ids: set) -> str:
+    operation_id = details.get("operationId")
+    if not operation_id or operation_id in operation_ids:
+        operation_id = f"{method} {path}"
+    operation_ids.add(operation_id)
+    return operation_id
+
+
+def parse_spec(spec: dict, spec_url: str) -> dict:
+    """Endpoint list and metadata of a decoded spec.
+
+    Every endpoint gets an "id": its operationId, or "method path" when the
+    operationId is missing or already taken.
+    """
+    # Validate it's an OpenAPI spec
+    if "openapi" not in spec and "swagger" not in spec:
+        raise SpecError(
+            "Invalid OpenAPI spec: missing 'openapi' or 'swagger' field. This doesn't appear to be a valid OpenAPI specification."
+        )
+
+    # Parse endpoints
+    endpoints = []
+
+    # Base URL from servers, or from spec_url
+    servers = spec.get("servers", [])
+    base_url = base_url_of(servers, spec_url)
+
+    # Parse paths
+    paths = spec.get("paths", {})
+
+    if not paths:
+        raise SpecError(
+            "No paths found in OpenAPI spec"
+        )
+
+    resolver = RefResolver(spec)
+    examples = ExampleGenerator(resolver)
+    operation_ids = set()
+
+    for path, methods in paths.items():
+        methods = resolver.deref(methods)
+        if not isinstance(methods, dict):
+            continue
+        # Path-level parameters apply to every operation under the path
+        path_parameters = methods.get("parameters", [])
+        for method, details in methods.items():
+            method_upper = method.upper()
+            if method_upper in HTTP_METHODS:
+
+                # Extract request body examples
+                request_body_example = None
+                examples_list = []
+
+                # Extract parameters, operation-level ones win over path-level ones
+                parameters = merge_parameters(resolver, path_parameters, details.get("parameters", []))
+
+                request_body = resolver.deref(details.get("requestBody")) or swagger2_body(parameters)
+                if request_body:
+                    content = request_body.get("content", {})
+                    json_content = content.get("application/json", {})
+                    schema = json_content.get("schema", {})
+
+                    # Extract multiple examples if present (OpenAPI 3.0 format)
+                    examples_map = json_content.get("examples", {})
+                    if examples_map and isinstance(examples_map, dict):
+                        for example_name, example_data in examples_map.items():
+                            example_data = resolver.deref(example_data)
+                            if isinstance(example_data, dict):
+                                examples_list.append({
+                                    "name": example_data.get("summary") or example_data.get("name") or example_name,
+                                    "description": example_data.get("description", ""),
+                                    "value": example_data.get("value"),
+                                })
+
+                    # Single example (older format)
+                    single_example = json_content.get("example")
+                    if single_example and not examples_list:
+                        request_body_example = single_example
+                    elif examples_list and len(examples_list) > 0:
+                        # Use first example as default
+                        request_body_example = examples_list[0].get("value")
+                    elif not examples_list and not single_example:
+                        # Generate from schema if no examples
+                        request_body_example = examples.example(schema)
+
+                # Build full URL
+                full_url = f"{base_url}{path}" if base_url else path
+
+                operation_id = operation_id_of(method, path, details, operation_ids)
+
+                endpoint = {
+                    "id": operation_id,
+                    "method": method_upper,
+                    "path": path,
+                    "url": full_url,
+                    "summary": details.get("summary", ""),
+                    "description": details.get("description", ""),
+                    "parameters": parameters,
+                    "requestBodyExample": request_body_example,
+                    "examples": examples_list,
+                    "tags": details.get("tags", []),
+                }
+                endpoints.append(endpoint)
+
+    return {
+        "endpoints": endpoints,
+        "info": spec.get("info", {}),
+        "servers": servers,
+        "version": spec.get("openapi") or spec.get("swagger"),
+    }
+
+
+def merge_parameters(resolver: RefResolver, path_parameters: list, operation_parameters: list) -> list:
+    """Parameters with $refs resolved, keyed on (name, in) as the spec defines them"""
+    merged = {}
+    for parameter in list(path_parameters or []) + list(operation_parameters or []):
+        parameter = resolver.deref(parameter)
+        if not isinstance(parameter, dict):
+            continue
+        if "schema" in parameter:
+            parameter = {**parameter, "schema": resolver.schema(parameter["schema"]) or {}}
+        merged[(parameter.get("name"), parameter.get("in"))] = parameter
+    return list(merged.values())
+
+
+def swagger2_body(parameters: list) -> Optional[dict]:
+    """A Swagger 2.0 "in: body" parameter in the shape of an OpenAPI 3 requestBody"""
+    for parameter in parameters:
+        if parameter.get("in") == "body":
+            return {"content": {"application/json": {"schema": parameter.get("schema", {})}}}
+    return None
+
+
+class ExampleGenerator:
+    """Example request bodies built from the schemas of one spec.
+
+    Examples of shared schemas are built once and reused. A schema that
+    contains itself is expanded one level and then cut off, and nesting
+    stops at MAX_EXAMPLE_DEPTH, so neither recursive models nor very deep
+    chains of refs can end in a RecursionError.
+    """
+
+    def __init__(self, resolver: RefResolver):
+        self.resolver = resolver
+        self._examples: dict[int, Any] = {}
+        self._building: set[int] = set()
+
+    def example(self, schema: Any) -> Any:
+        """Generate a simple example from a JSON schema, None when there is nothing to show"""
+        schema = self._variant(self.resolver.schema(schema))
+        if not schema:
+            return None
+        key = id(schema)
+        if key in self._examples:
+            return self._examples[key]
+        if key in self._building or len(self._building) >= MAX_EXAMPLE_DEPTH:
+            return None
+        self._building.add(key)
+        try:
+            example = self._build(schema)
+        finally:
+            self._building.discard(key)
+        self._examples[key] = example
+        return example
+
+    def _variant(self, schema: Optional[dict]) -> Optional[dict]:
+        # oneOf/anyOf: the first option we can resolve stands in for all of them
+        if schema and not schema.get("properties"):
+            for option in schema.get("oneOf") or schema.get("anyOf") or []:
+                option = self.resolver.schema(option)
+                if option:
+                    return option
+        return schema
+
+    def _build(self, schema: dict) -> Any:
+        if "example" in schema:
+            return schema["example"]
+
+        # Handle arrays
+        if schema.get("type") == "array":
+            item_example = self.example(schema.get("items", {}))
+            return [item_example] if item_example else []
+
+        # Handle objects
+        properties = schema.get("properties", {})
+        if not properties:
+            return None
+
+        example = {}
+        for key, value in properties.items():
+            value = self._variant(self.resolver.schema(value))
+            if not value:
+                continue
+            # Skip read-only fields
+            if value.get("readOnly"):
+                continue
+            # Check if field has an example
+            if "example" in value:
+                example[key] = value["example"]
+                continue
+            # Check if field has a default
+            if "default" in value:
+                example[key] = value["default"]
+                continue
+            prop_example = self._property(key, value)
+            if prop_example is not _SKIP:
+                example[key] = prop_example
+
+        return example if example else None
+
+    def _property(self, key: str, value: dict) -> Any:
+        # Generate based on type, nested models may only be known by their properties
+        prop_type = value.get("type") or ("object" if value.get("properties") else None)
+
+        if prop_type == "string":
+            # Check for format hints
+            prop_format = value.get("format")
+            prop_enum = value.get("enum")
+
+            if prop_enum:
+                return prop_enum[0]  # Use first enum value
+            elif prop_format == "email":
+                return "user@example.com"
+            elif prop_format == "password":
+                return "password123"
+            elif prop_format == "date":
+                return "2024-01-01"
+            elif prop_format == "date-time":
+                return "2024-01-01T00:00:00Z"
+            elif prop_format == "uri":
+                return "https://example.com"
+            elif "username" in key.lower():
+                return "username"
+            elif "name" in key.lower():
+                return "Example Name"
+            else:
+                max_length = value.get("maxLength", 50)
+                return "string" if max_length > 10 else "str"
+        elif prop_type == "number":
+            return 0.0
+        elif prop_type == "integer":
+            return 0
+        elif prop_type == "boolean":
+            return True
+        elif prop_type == "array":
+            item_example = self.example(value.get("items", {}))
+            return [item_example] if item_example else []
+        elif prop_type == "object":
+            nested = self.example(value)
+            return nested if nested else {}
+        return _SKIP
+
+
+# Marks a property with no usable type, left out of the example
+_SKIP = object()
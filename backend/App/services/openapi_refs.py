@@ -0,0 +1,94 @@
+# services/openapi_refs.py
+from typing import Any, Optional
+from urllib.parse import unquote
+
+# allOf nested deeper than this (through refs) is not merged any further
+MAX_MERGE_DEPTH = 64
+# Keywords merged from every allOf member into the combined schema
+MERGED_KEYWORDS = ("properties", "required")
+
+
+class RefResolver:
+    """Resolves the local $refs of one spec.
+
+    Works for any JSON pointer into the document: OpenAPI 3 components
+    (schemas, parameters, requestBodies, examples, ...) and Swagger 2
+    definitions and parameters alike. Every pointer is looked up once and
+    every allOf is merged once, so resolving a spec costs time linear in
+    its size however often schemas are shared. Circular chains resolve to
+    None rather than recursing forever, and so does allOf nested more
+    than MAX_MERGE_DEPTH levels. External refs (other files or
+    URLs) are not fetched and resolve to None.
+    """
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self._pointers: dict[str, Any] = {}
+        # Keyed by id() of nodes inside self.spec, which lives as long as we do
+        self._merged: dict[int, dict] = {}
+        self._merging: set[int] = set()
+
+    def lookup(self, ref: str) -> Any:
+        """The node a single "#/a/b/c" pointer names"""
+        if ref in self._pointers:
+            return self._pointers[ref]
+        node = self.spec if ref.startswith("#") else None
+        for token in ref[1:].split("/")[1:] if node is not None else ():
+            # RFC 6901 escapes, plus percent-encoding from the URI fragment
+            token = unquote(token).replace("~1", "/").replace("~0", "~")
+            if isinstance(node, dict):
+                node = node.get(token)
+            elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+                node = node[int(token)]
+            else:
+                node = None
+                break
+        self._pointers[ref] = node
+        return node
+
+    def deref(self, node: Any) -> Any:
+        """Follow a chain of $refs to the node it ends at"""
+        seen = set()
+        while isinstance(node, dict) and "$ref" in node:
+            ref = node["$ref"]
+            if not isinstance(ref, str) or ref in seen:
+                return None
+            seen.add(ref)
+            node = self.lookup(ref)
+        return node
+
+    def schema(self, node: Any) -> Optional[dict]:
+        """A schema with its $ref followed and any allOf merged into one object"""
+        node = self.deref(node)
+        if not isinstance(node, dict):
+            return None
+        if not isinstance(node.get("allOf"), list):
+            return node
+        key = id(node)
+        if key in self._merged:
+            return self._merged[key]
+        if key in self._merging or len(self._merging) >= MAX_MERGE_DEPTH:
+            # allOf that (indirectly) contains itself, or nests absurdly deep
+            return None
+        self._merging.add(key)
+        try:
+            merged = {name: value for name, value in node.items() if name != "allOf"}
+            properties, required = {}, []
+            for part in node["allOf"] + [node]:
+                part = part if part is node else self.schema(part)
+                if not part:
+                    continue
+                properties.update(part.get("properties") or {})
+                required += [name for name in part.get("required") or [] if name not in required]
+                for name, value in part.items():
+                    if name not in MERGED_KEYWORDS and name != "allOf":
+                        merged.setdefault(name, value)
+            if properties:
+                merged["properties"] = properties
+                merged.setdefault("type", "object")
+            if required:
+                merged["required"] = required
+        finally:
+            self._merging.discard(key)
+        self._merged[key] = merged
+        return merged
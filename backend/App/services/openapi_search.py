@@ -0,0 +1,237 @@
+# services/openapi_search.py
+import bisect
+import heapq
+import math
+import re
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import Iterable, Optional
+
+# How much a term found in each field counts towards an operation's score
+FIELD_WEIGHTS = {
+    "operation_id": 3.0,
+    "path": 3.0,
+    "summary": 2.0,
+    "tags": 2.0,
+    "parameters": 1.5,
+    "description": 1.0,
+}
+# Score of a term matched as a prefix of, or one edit away from, a word,
+# relative to matching the word itself
+PREFIX_FACTOR = 0.6
+FUZZY_FACTOR = 0.4
+# Shorter terms only match whole words (prefix) or exact spellings (fuzzy)
+MIN_PREFIX_LENGTH = 2
+MIN_FUZZY_LENGTH = 4
+# Merged scores kept for the most recently searched terms, which come
+# back on every keystroke and tag toggle of an interactive search
+TERM_CACHE_SIZE = 256
+
+# Words of camelCase, snake_case, kebab-case and path segments alike
+_WORDS = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def tokenize(text: str) -> list[str]:
+    return [word.lower() for word in _WORDS.findall(text)]
+
+
+def _deletes(word: str) -> set[str]:
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Whether a substitution, insertion, deletion or adjacent swap turns a into b"""
+    if a == b:
+        return True
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return len(diffs) == 2 and diffs[1] == diffs[0] + 1 and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+    if abs(len(a) - len(b)) != 1:
+        return False
+    short, long = (a, b) if len(a) < len(b) else (b, a)
+    i = 0
+    while i < len(short) and short[i] == long[i]:
+        i += 1
+    return short[i:] == long[i + 1:]
+
+
+class SearchIndex:
+    """An inverted index over the operations of one parsed spec.
+
+    Words of the path, operationId, summary, description, tags and
+    parameter names point at the operations they occur in, weighted by
+    field (FIELD_WEIGHTS) and by rarity (idf). Every query term must
+    match each result, either exactly, as a prefix of a word (over a
+    sorted vocabulary) or, failing that, one edit away from a word
+    (through a symmetric-delete table, so typos cost a few dict lookups
+    rather than a scan of the vocabulary).
+    """
+
+    def __init__(self, endpoints: list[dict]):
+        self.size = len(endpoints)
+        self._tags: list[list[str]] = []
+        self._methods: list[str] = []
+        postings: dict[str, dict[int, float]] = {}
+        for position, endpoint in enumerate(endpoints):
+            tags = [tag for tag in endpoint.get("tags") or [] if isinstance(tag, str)]
+            self._tags.append(tags)
+            self._methods.append(endpoint["method"])
+            fields = {
+                "operation_id": [endpoint["id"]],
+                "path": [endpoint["path"]],
+                "summary": [endpoint.get("summary") or ""],
+                "tags": tags,
+                "parameters": [
+                    param.get("name") or ""
+                    for param in endpoint.get("parameters") or []
+                    if isinstance(param, dict)
+                ],
+                "description": [endpoint.get("description") or ""],
+            }
+            for field, texts in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for text in texts:
+                    if not isinstance(text, str):
+                        continue
+                    for word in tokenize(text):
+                        ops = postings.setdefault(word, {})
+                        if ops.get(position, 0) < weight:
+                            ops[position] = weight
+
+        # Weights are scaled by idf once here, not on every query
+        self._postings: dict[str, dict[int, float]] = {}
+        for word, ops in postings.items():
+            idf = math.log(1 + self.size / len(ops))
+            self._postings[word] = {position: weight * idf for position, weight in ops.items()}
+        self._vocabulary = sorted(self._postings)
+        self._tag_positions: dict[str, set[int]] = {}
+        for position, tags in enumerate(self._tags):
+            for tag in tags:
+                self._tag_positions.setdefault(tag, set()).add(position)
+        self._term_cache: OrderedDict[str, dict[int, float]] = OrderedDict()
+        self._all_facets = [
+            {"tag": tag, "count": count}
+            for tag, count in Counter(tag for tags in self._tags for tag in tags).most_common()
+        ]
+        self._by_delete: dict[str, list[str]] = {}
+        for word in self._vocabulary:
+            if len(word) >= MIN_FUZZY_LENGTH:
+                for variant in _deletes(word):
+                    self._by_delete.setdefault(variant, []).append(word)
+
+    @property
+    def approximate_bytes(self) -> int:
+        postings = sum(len(ops) for ops in self._postings.values())
+        deletes = sum(len(words) for words in self._by_delete.values())
+        # Rough CPython costs of a dict slot with a float, and of a short str
+        return postings * 100 + (len(self._vocabulary) + deletes) * 80
+
+    def _expand(self, term: str) -> list[tuple[dict[int, float], float]]:
+        """Posting lists the term matches, each with the factor its scores take"""
+        matches = []
+        if term in self._postings:
+            matches.append((self._postings[term], 1.0))
+        if len(term) >= MIN_PREFIX_LENGTH:
+            start = bisect.bisect_left(self._vocabulary, term)
+            for word in self._vocabulary[start:]:
+                if not word.startswith(term):
+                    break
+                if word != term:
+                    matches.append((self._postings[word], PREFIX_FACTOR))
+        if not matches and len(term) >= MIN_FUZZY_LENGTH:
+            candidates = set(self._by_delete.get(term, ()))
+            for variant in _deletes(term):
+                candidates.update(self._by_delete.get(variant, ()))
+                if variant in self._postings:
+                    candidates.add(variant)
+            matches += [
+                (self._postings[word], FUZZY_FACTOR)
+                for word in sorted(candidates)
+                if _within_one_edit(term, word)
+            ]
+        return matches
+
+    @staticmethod
+    def _merge(matches: list[tuple[dict[int, float], float]]) -> dict[int, float]:
+        """Best score of every operation in any of the posting lists"""
+        if len(matches) == 1 and matches[0][1] == 1.0:
+            return matches[0][0]
+        scores: dict[int, float] = {}
+        for ops, factor in matches:
+            for position, score in ops.items():
+                score *= factor
+                if scores.get(position, 0) < score:
+                    scores[position] = score
+        return scores
+
+    def _term_scores(self, term: str, matches: list[tuple[dict[int, float], float]]) -> dict[int, float]:
+        if term in self._term_cache:
+            self._term_cache.move_to_end(term)
+            return self._term_cache[term]
+        scores = self._term_cache[term] = self._merge(matches)
+        if len(self._term_cache) > TERM_CACHE_SIZE:
+            self._term_cache.popitem(last=False)
+        return scores
+
+    def _match(self, query: str) -> Optional[dict[int, float]]:
+        """Summed scores of the operations every term matches, None for no terms"""
+        terms = [(term, self._expand(term)) for term in dict.fromkeys(tokenize(query))]
+        if not terms:
+            return None
+        # Start from the rarest term; the others are then only looked up
+        # for its operations, never walked in full
+        terms.sort(key=lambda term: sum(len(ops) for ops, _ in term[1]))
+        scores = self._term_scores(*terms[0])
+        for term, matches in terms[1:]:
+            if not scores:
+                break
+            if term in self._term_cache:
+                matches = [(self._term_scores(term, matches), 1.0)]
+            narrowed = {}
+            for position, score in scores.items():
+                best = max((ops.get(position, 0) * factor for ops, factor in matches), default=0)
+                if best:
+                    narrowed[position] = score + best
+            scores = narrowed
+        return scores
+
+    def search(
+        self,
+        query: str,
+        tags: Iterable[str] = (),
+        method: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> dict:
+        """Positions of matching operations, best first, with tag facets.
+
+        Facets count the tags of everything the query and method match,
+        before the tag filter, so the other tags stay selectable.
+        """
+        scores = self._match(query)
+        if scores is None:
+            if not method and not tags:
+                # Everything, in spec order
+                return {
+                    "total": self.size,
+                    "results": [(position, 0.0) for position in range(offset, min(offset + limit, self.size))],
+                    "facets": {"tags": self._all_facets},
+                }
+            scores = dict.fromkeys(range(self.size), 0.0)
+
+        if method:
+            method = method.upper()
+            scores = {position: score for position, score in scores.items() if self._methods[position] == method}
+        facets = Counter(chain.from_iterable(map(self._tags.__getitem__, scores)))
+        if tags:
+            tagged = set.intersection(*(self._tag_positions.get(tag, set()) for tag in set(tags)))
+            scores = {position: scores[position] for position in tagged.intersection(scores)}
+
+        ranked = heapq.nsmallest(offset + limit, scores, key=lambda position: (-scores[position], position))
+        return {
+            "total": len(scores),
+            "results": [(position, round(scores[position], 3)) for position in ranked[offset:]],
+            "facets": {"tags": [{"tag": tag, "count": count} for tag, count in facets.most_common()]},
+        }
@@ -0,0 +1,128 @@
+# services/openapi_stream.py
+import ijson
+from ijson.common import ObjectBuilder
+
+from App.services.openapi_parser import HTTP_METHODS, SpecError, base_url_of, operation_id_of
+
+
+def index_entry(endpoint: dict) -> dict:
+    """The compact form of a parsed endpoint that spec indexes list"""
+    return {
+        "id": endpoint["id"],
+        "method": endpoint["method"],
+        "path": endpoint["path"],
+        "url": endpoint["url"],
+        "summary": endpoint["summary"],
+        "tags": endpoint["tags"],
+        "example_count": len(endpoint["examples"]),
+    }
+
+
+def key_memo_dict() -> type:
+    """A dict type whose instances share one str per distinct key, as
+    json.loads does; ijson would otherwise make a new one for every key
+    of every object, a third more memory for a typical spec"""
+    keys: dict[str, str] = {}
+
+    class KeyMemoDict(dict):
+        __slots__ = ()
+
+        def __setitem__(self, key, value):
+            dict.__setitem__(self, keys.setdefault(key, key), value)
+
+    return KeyMemoDict
+
+
+class StreamingIndex:
+    """A JSON spec decoded while it downloads, with the index entries of its
+    operations as soon as each path item is complete.
+
+    The bytes go through ijson once as they arrive. Path items come out of
+    a kvitems parser whole, are turned into entries straight away and are
+    kept as the document's paths; every other top-level key is built from
+    the event stream. document() then hands parse_spec the same dict
+    json.loads would have produced, so the raw bytes never need to be
+    kept and nothing is decoded twice.
+
+    $refs may point at components further down the document, so entries
+    resolve nothing: path items that are themselves $refs are left for the
+    full parse, and example_count only counts examples written inline. Ids
+    are assigned exactly as parse_spec assigns them. feed() and close()
+    raise ijson.JSONError for a document that is not valid JSON.
+    """
+
+    def __init__(self, spec_url: str):
+        self.spec_url = spec_url
+        self.servers = None
+        self.paths: dict = {}
+        self._path_items = ijson.sendable_list()
+        self._events = ijson.sendable_list()
+        map_type = key_memo_dict()
+        self._coros = [
+            ijson.kvitems_coro(self._path_items, "paths", map_type=map_type, use_float=True),
+            ijson.parse_coro(self._events, use_float=True),
+        ]
+        self._rest = ObjectBuilder(map_type=map_type)
+        self._operation_ids: set[str] = set()
+
+    def feed(self, chunk: bytes) -> list[dict]:
+        """Entries of the path items the chunk completes"""
+        for coro in self._coros:
+            coro.send(chunk)
+        self._build_rest()
+        entries = []
+        for path, item in self._path_items:
+            self.paths[path] = item
+            entries += self._entries(path, item)
+        del self._path_items[:]
+        return entries
+
+    def close(self):
+        for coro in self._coros:
+            coro.close()
+        self._build_rest()
+
+    def document(self) -> dict:
+        """The whole decoded document, once close() has returned"""
+        document = getattr(self._rest, "value", None)
+        if not isinstance(document, dict):
+            raise SpecError("Invalid JSON response. Error: the document is not an object")
+        if self.paths:
+            document["paths"] = self.paths
+        return document
+
+    def _build_rest(self):
+        # Paths arrive through kvitems, so their events (most of a spec's) are dropped first
+        rest = [event for event in self._events if event[0] != "paths" and not event[0].startswith("paths.")]
+        del self._events[:]
+        for prefix, event, value in rest:
+            if prefix == "" and event == "map_key" and value == "paths":
+                continue
+            self._rest.event(event, value)
+            if prefix == "servers" and event == "end_array":
+                self.servers = self._rest.value["servers"]
+
+    def _entries(self, path: str, item) -> list[dict]:
+        if not isinstance(item, dict) or "$ref" in item:
+            return []
+        # servers normally precede paths; if not, early URLs use the spec's origin
+        base_url = base_url_of(self.servers, self.spec_url)
+        entries = []
+        for method, details in item.items():
+            if method.upper() not in HTTP_METHODS or not isinstance(details, dict):
+                continue
+            body = details.get("requestBody")
+            examples = {}
+            if isinstance(body, dict):
+                json_content = (body.get("content") or {}).get("application/json") or {}
+                examples = json_content.get("examples") or {}
+            entries.append({
+                "id": operation_id_of(method, path, details, self._operation_ids),
+                "method": method.upper(),
+                "path": path,
+                "url": f"{base_url}{path}" if base_url else path,
+                "summary": details.get("summary", ""),
+                "tags": details.get("tags", []),
+                "example_count": len(examples) if isinstance(examples, dict) else 0,
+            })
+        return entries
@@ -0,0 +1,163 @@
+# services/rate_limit_headers.py
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Reset values above this are unix timestamps, below it they are seconds from now
+EPOCH_THRESHOLD = 1_000_000_000
+
+# Header names in the order they are tried, lower-cased as httpx stores them
+LIMIT_HEADERS = ("x-ratelimit-limit", "ratelimit-limit", "x-rate-limit-limit")
+REMAINING_HEADERS = ("x-ratelimit-remaining", "ratelimit-remaining", "x-rate-limit-remaining")
+RESET_HEADERS = ("x-ratelimit-reset", "ratelimit-reset", "x-rate-limit-reset")
+
+
+def _first_number(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    match = re.search(r"\d+(?:\.\d+)?", value)
+    return float(match.group()) if match else None
+
+
+def _reset_seconds(value: Optional[str]) -> Optional[float]:
+    number = _first_number(value)
+    if number is None:
+        return None
+    if number > EPOCH_THRESHOLD:
+        return max(number - time.time(), 0.0)
+    return number
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value.strip())
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _structured_params(value: str) -> dict:
+    """Pull key=value pairs out of IETF RateLimit / RateLimit-Policy headers.
+
+    Handles both the older "limit=100, remaining=50, reset=30" form and the
+    structured-field form '"default";r=50;t=30' / '100;w=60;burst=20'.
+    """
+    params = dict(re.findall(r"([a-z-]+)=\"?([\d.]+)", value.lower()))
+    leading = re.match(r"\s*(\d+)", value)
+    if leading and "q" not in params and "limit" not in params:
+        params["q"] = leading.group(1)
+    return params
+
+
+def parse_rate_limit_headers(headers) -> dict:
+    """Rate limiter hints found in one response's headers, empty when there are none"""
+    hints = {}
+
+    limit = next((_first_number(headers.get(name)) for name in LIMIT_HEADERS if headers.get(name)), None)
+    remaining = next((_first_number(headers.get(name)) for name in REMAINING_HEADERS if headers.get(name)), None)
+    reset = next((_reset_seconds(headers.get(name)) for name in RESET_HEADERS if headers.get(name)), None)
+
+    combined = headers.get("ratelimit")
+    if combined:
+        params = _structured_params(combined)
+        limit = limit if limit is not None else _first_number(params.get("limit"))
+        remaining = remaining if remaining is not None else _first_number(params.get("remaining") or params.get("r"))
+        reset = reset if reset is not None else _reset_seconds(params.get("reset") or params.get("t"))
+
+    policy = headers.get("ratelimit-policy") or headers.get("x-ratelimit-policy")
+    if policy:
+        params = _structured_params(policy)
+        quota = _first_number(params.get("q") or params.get("limit"))
+        limit = limit if limit is not None else quota
+        if params.get("w"):
+            hints["window_seconds"] = float(params["w"])
+        if params.get("burst"):
+            hints["burst"] = float(params["burst"])
+        hints["policy"] = policy
+
+    retry_after = _retry_after_seconds(headers.get("retry-after"))
+
+    for key, value in (("limit", limit), ("remaining", remaining), ("reset_seconds", reset), ("retry_after_seconds", retry_after)):
+        if value is not None:
+            hints[key] = value
+    return hints
+
+
+class LimiterHints:
+    """What the responses of a test told us about the target's rate limiter.
+
+    Keeps a handful of scalars no matter how many responses are observed.
+    """
+
+    FIELDS = ("limit", "remaining_min", "reset_max", "retry_after_max", "window_seconds", "burst", "policy")
+
+    def __init__(self):
+        self.limit: Optional[float] = None
+        self.remaining_min: Optional[float] = None
+        self.reset_max: Optional[float] = None
+        self.retry_after_max: Optional[float] = None
+        self.window_seconds: Optional[float] = None
+        self.burst: Optional[float] = None
+        self.policy: Optional[str] = None
+
+    @staticmethod
+    def _max(current, value):
+        return value if current is None or (value is not None and value > current) else current
+
+    @staticmethod
+    def _min(current, value):
+        return value if current is None or (value is not None and value < current) else current
+
+    def observe(self, hints: dict):
+        if not hints:
+            return
+        self.limit = self._max(self.limit, hints.get("limit"))
+        self.remaining_min = self._min(self.remaining_min, hints.get("remaining"))
+        self.reset_max = self._max(self.reset_max, hints.get("reset_seconds"))
+        self.retry_after_max = self._max(self.retry_after_max, hints.get("retry_after_seconds"))
+        self.window_seconds = self._max(self.window_seconds, hints.get("window_seconds"))
+        self.burst = self._max(self.burst, hints.get("burst"))
+        self.policy = hints.get("policy") or self.policy
+
+    def merge(self, other: "LimiterHints"):
+        self.observe({
+            "limit": other.limit,
+            "remaining": other.remaining_min,
+            "reset_seconds": other.reset_max,
+            "retry_after_seconds": other.retry_after_max,
+            "window_seconds": other.window_seconds,
+            "burst": other.burst,
+            "policy": other.policy,
+        })
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LimiterHints":
+        hints = cls()
+        for field in cls.FIELDS:
+            setattr(hints, field, data.get(field))
+        return hints
+
+    def estimate(self) -> dict:
+        """Best guess of the limiter's window, burst and sustained rate"""
+        # Without an explicit policy, the longest reset seen is the closest thing to the window
+        window = self.window_seconds or self.reset_max
+        burst = self.burst or self.limit
+        sustained_rps = None
+        if self.limit and window:
+            sustained_rps = self.limit / window
+        return {
+            "limit": self.limit,
+            "remaining_min": self.remaining_min,
+            "window_seconds": window,
+            "burst": burst,
+            "retry_after_seconds": self.retry_after_max,
+            "sustained_rps": round(sustained_rps, 2) if sustained_rps else None,
+            "policy": self.policy,
+        }
@@ -0,0 +1,247 @@
+# services/response_cache.py
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+from App.services.upstream import BufferedResponse
+
+# Configuration
+PROXY_CACHE_MAX_BYTES = int(os.getenv("PROXY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PROXY_CACHE_MAX_ENTRY_BYTES = int(os.getenv("PROXY_CACHE_MAX_ENTRY_BYTES", str(2 * 1024 * 1024)))
+PROXY_CACHE_MAX_TTL = float(os.getenv("PROXY_CACHE_MAX_TTL", "3600"))
+
+# Statuses a cache may store without explicit freshness (RFC 9110 section 15.1)
+CACHEABLE_STATUSES = {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+# Request headers that identify the caller to the upstream. Responses to
+# different credentials are never shared, even within one user's cache.
+CREDENTIAL_HEADERS = {"authorization", "cookie", "proxy-authorization", "x-api-key", "api-key"}
+CONDITIONAL_HEADERS = {"if-none-match", "if-modified-since", "if-match", "if-unmodified-since", "if-range"}
+# Share of the time since Last-Modified used as freshness when nothing else is given
+HEURISTIC_FRACTION = 0.1
+
+
+def parse_cache_control(value: Optional[str]) -> dict:
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+def _seconds(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: httpx.Headers) -> float:
+    """Seconds the response may be served without asking the upstream again"""
+    directives = parse_cache_control(headers.get("cache-control"))
+    if "no-cache" in directives:
+        return 0.0
+    if "max-age" in directives:
+        lifetime = _seconds(directives["max-age"]) or 0.0
+    else:
+        date = _http_date(headers.get("date")) or time.time()
+        expires = _http_date(headers.get("expires"))
+        last_modified = _http_date(headers.get("last-modified"))
+        if expires is not None:
+            lifetime = max(expires - date, 0.0)
+        elif "expires" in headers:
+            # An invalid Expires means "already expired"
+            lifetime = 0.0
+        elif last_modified is not None:
+            lifetime = max(date - last_modified, 0.0) * HEURISTIC_FRACTION
+        else:
+            lifetime = 0.0
+    lifetime -= _seconds(headers.get("age")) or 0.0
+    return min(max(lifetime, 0.0), PROXY_CACHE_MAX_TTL)
+
+
+def cache_key(user_id: int, method: str, url: str, headers: dict) -> tuple:
+    """Per user, per URL and per set of credentials the request carries"""
+    credentials = sorted(
+        (name.lower(), value) for name, value in headers.items()
+        if name.lower() in CREDENTIAL_HEADERS
+    )
+    digest = hashlib.sha256(repr(credentials).encode()).hexdigest()
+    return (user_id, method, url, digest)
+
+
+def wants_revalidation(headers: dict) -> bool:
+    """The caller asked for a fresh answer with Cache-Control: no-cache or max-age=0"""
+    directives = parse_cache_control(_header(headers, "cache-control"))
+    return "no-cache" in directives or _seconds(directives.get("max-age")) == 0
+
+
+def bypasses_cache(headers: dict) -> bool:
+    """no-store, or conditional headers of the caller's own that expect the upstream's 304"""
+    if "no-store" in parse_cache_control(_header(headers, "cache-control")):
+        return True
+    return any(name.lower() in CONDITIONAL_HEADERS for name in headers)
+
+
+def _header(headers: dict, name: str) -> Optional[str]:
+    return next((value for key, value in headers.items() if key.lower() == name), None)
+
+
+class CachedResponse:
+    def __init__(self, response: BufferedResponse, request_headers: dict):
+        self.status = response.status_code
+        self.content = response.content
+        self.encoding = response.encoding
+        # Request header values the upstream said the response depends on
+        self.vary = {
+            name: _header(request_headers, name)
+            for name in (part.strip().lower() for part in response.headers.get("vary", "").split(","))
+            if name
+        }
+        self.headers: dict = {}
+        self.update(response.headers)
+
+    def update(self, response_headers: httpx.Headers):
+        """Take fresh headers from a 200 or a 304 and restart the freshness clock"""
+        # A 304 only carries some headers, keep the rest from the stored response
+        headers = httpx.Headers(self.headers)
+        headers.update(response_headers)
+        self.headers = dict(headers)
+        self.etag = headers.get("etag")
+        self.last_modified = headers.get("last-modified")
+        self.expires_at = time.monotonic() + freshness_lifetime(headers)
+        self.size = len(self.content) + sum(len(name) + len(value) for name, value in self.headers.items())
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    @property
+    def revalidatable(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+    def matches(self, request_headers: dict) -> bool:
+        return all(_header(request_headers, name) == value for name, value in self.vary.items())
+
+    def validators(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def storable(response: BufferedResponse) -> bool:
+    if response.status_code not in CACHEABLE_STATUSES or response.truncated:
+        return False
+    if len(response.content) > PROXY_CACHE_MAX_ENTRY_BYTES:
+        return False
+    if response.headers.get("vary", "").strip() == "*":
+        return False
+    directives = parse_cache_control(response.headers.get("cache-control"))
+    if "no-store" in directives:
+        return False
+    # Nothing to gain from an entry that is stale at once and cannot be revalidated
+    return freshness_lifetime(response.headers) > 0 or "etag" in response.headers or "last-modified" in response.headers
+
+
+class ResponseCache:
+    """In-memory LRU of upstream GET responses, bounded by total bytes.
+
+    Entries are keyed per user, URL and credentials, and hold the body as
+    received so it can be decoded the same way a live response is. Stale
+    entries with an ETag or Last-Modified are kept for revalidation, the
+    rest are dropped when they expire.
+    """
+
+    def __init__(self, max_bytes: int = PROXY_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+
+    def get(self, key: tuple, request_headers: dict) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not entry.matches(request_headers) or (not entry.fresh and not entry.revalidatable):
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, request_headers: dict, response: BufferedResponse):
+        if not storable(response):
+            self._remove(key)
+            return
+        self._remove(key)
+        entry = CachedResponse(response, request_headers)
+        self._entries[key] = entry
+        self.size += entry.size
+        self._evict()
+
+    def refresh(self, key: tuple, entry: CachedResponse, response: BufferedResponse):
+        """Apply a 304 to the entry it revalidated.
+
+        The entry may have been replaced or evicted while the upstream was
+        asked; it is still updated for the caller, but only counted
+        towards the cache's size if the cache still holds it.
+        """
+        if self._entries.get(key) is not entry:
+            entry.update(response.headers)
+            return
+        self.size -= entry.size
+        entry.update(response.headers)
+        self.size += entry.size
+        self._evict()
+
+    def invalidate(self, user_id: int, url: str):
+        """Drop every entry for a URL after an unsafe request to it"""
+        for key in [key for key in self._entries if key[0] == user_id and key[2] == url]:
+            self._remove(key)
+
+    def clear(self, user_id: int) -> int:
+        keys = [key for key in self._entries if key[0] == user_id]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+        }
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,209 @@
+# services/rollups.py
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from App.models.db import IS_SQLITE
+from App.models.models import ProxyLog, ProxyLogRollup
+from App.services.histogram import LatencyHistogram
+
+# Under 1/2**4, ~6% relative error, keeps each stored histogram to a few hundred bytes
+ROLLUP_PRECISION_BITS = 5
+GRANULARITIES = ("minute", "hour", "day")
+# How long fine-grained buckets are kept, day buckets are kept forever
+ROLLUP_RETENTION = {
+    "minute": timedelta(days=float(os.getenv("ROLLUP_MINUTE_RETENTION_DAYS", "7"))),
+    "hour": timedelta(days=float(os.getenv("ROLLUP_HOUR_RETENTION_DAYS", "90"))),
+}
+HOST_TOTAL = "*"
+# Columns of the rollup unique key, in the order aggregate() builds keys
+ROLLUP_KEY = ("user_id", "granularity", "bucket_start", "host", "endpoint")
+# Keys per prefetch query, 5 bound parameters each
+PREFETCH_KEYS = 150
+
+# Path segments that are ids rather than routes: numbers, UUIDs, long hex strings
+ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|[0-9a-fA-F]{16,})$")
+
+
+def endpoint_of(method: str, url: str) -> str:
+    path = urlsplit(url).path or "/"
+    segments = ["{id}" if ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return f"{method} {'/'.join(segments)}"
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class RollupDelta:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency = LatencyHistogram(ROLLUP_PRECISION_BITS)
+
+    def add(self, log: ProxyLog):
+        self.requests += 1
+        if log.status_code is None or log.status_code >= 400:
+            self.errors += 1
+        self.latency.record(log.response_time_ms)
+
+
+def aggregate(logs: Iterable[ProxyLog]) -> dict[tuple, RollupDelta]:
+    """Collapse a batch of logs into one delta per rollup row"""
+    deltas: dict[tuple, RollupDelta] = {}
+    for log in logs:
+        host = log.host or urlsplit(log.url).hostname or ""
+        endpoint = endpoint_of(log.method, log.url)
+        for granularity in GRANULARITIES:
+            start = bucket_start(log.timestamp, granularity)
+            for name in (endpoint, HOST_TOTAL):
+                key = (log.user_id, granularity, start, host, name)
+                delta = deltas.get(key)
+                if delta is None:
+                    delta = deltas[key] = RollupDelta()
+                delta.add(log)
+    return deltas
+
+
+def _upsert():
+    """An INSERT of one rollup row that adds to the counts of an existing one"""
+    insert = sqlite_insert if IS_SQLITE else postgresql_insert
+    statement = insert(ProxyLogRollup.__table__)
+    table = ProxyLogRollup.__table__.c
+    return statement.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY),
+        set_={
+            "request_count": table.request_count + statement.excluded.request_count,
+            "error_count": table.error_count + statement.excluded.error_count,
+            "latency": statement.excluded.latency,
+        },
+    )
+
+
+async def _existing_latency(session: AsyncSession, keys: list[tuple]) -> dict[tuple, dict]:
+    """Stored histograms of the rollup rows that already exist, by key"""
+    columns = [getattr(ProxyLogRollup, name) for name in ROLLUP_KEY]
+    latency = {}
+    for start in range(0, len(keys), PREFETCH_KEYS):
+        statement = select(*columns, ProxyLogRollup.latency).where(
+            tuple_(*columns).in_(keys[start:start + PREFETCH_KEYS])
+        )
+        for *key, histogram in (await session.exec(statement)).all():
+            latency[tuple(key)] = histogram
+    return latency
+
+
+async def update_rollups(session: AsyncSession, logs: list[ProxyLog]):
+    """Fold a batch of new logs into the rollup tables, inside the caller's transaction.
+
+    The batch is aggregated in memory first, so each flush touches one row
+    per (granularity, bucket, host, endpoint) it covers, not one per log.
+    Existing histograms are read in one prefetch and merged here; counts
+    are added by the upsert itself.
+    """
+    deltas = aggregate(logs)
+    if not deltas:
+        return
+    existing = await _existing_latency(session, list(deltas))
+    rows = []
+    for key, delta in deltas.items():
+        latency = delta.latency
+        if key in existing:
+            latency = LatencyHistogram.from_dict(existing[key])
+            latency.merge(delta.latency)
+        rows.append({
+            **dict(zip(ROLLUP_KEY, key)),
+            "request_count": delta.requests,
+            "error_count": delta.errors,
+            "latency": latency.to_dict(),
+        })
+    await session.execute(_upsert(), rows)
+
+
+async def prune_rollups(session: AsyncSession):
+    """Drop minute and hour buckets older than their retention"""
+    now = datetime.now(timezone.utc)
+    for granularity, retention in ROLLUP_RETENTION.items():
+        await session.exec(
+            delete(ProxyLogRollup).where(
+                ProxyLogRollup.granularity == granularity,
+                ProxyLogRollup.bucket_start < bucket_start(now - retention, granularity),
+            )
+        )
+
+
+async def query_rollups(
+    session: AsyncSession,
+    user_id: int,
+    granularity: str,
+    since: datetime,
+    until: datetime,
+    group_by: str,
+    host: Optional[str] = None,
+) -> list[dict]:
+    """Series per host (group_by="host") or per endpoint, built from rollup rows only"""
+    statement = select(ProxyLogRollup).where(
+        ProxyLogRollup.user_id == user_id,
+        ProxyLogRollup.granularity == granularity,
+        ProxyLogRollup.bucket_start >= bucket_start(since, granularity),
+        ProxyLogRollup.bucket_start < until,
+    )
+    if group_by == "host":
+        statement = statement.where(ProxyLogRollup.endpoint == HOST_TOTAL)
+    else:
+        statement = statement.where(ProxyLogRollup.endpoint != HOST_TOTAL)
+    if host:
+        statement = statement.where(ProxyLogRollup.host == host.lower())
+    statement = statement.order_by(ProxyLogRollup.bucket_start)
+
+    groups: dict[tuple, dict] = {}
+    for rollup in (await session.exec(statement)).all():
+        key = (rollup.host, None if group_by == "host" else rollup.endpoint)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                "host": rollup.host,
+                "endpoint": key[1],
+                "requests": 0,
+                "errors": 0,
+                "latency": LatencyHistogram(ROLLUP_PRECISION_BITS),
+                "buckets": [],
+            }
+        latency = LatencyHistogram.from_dict(rollup.latency)
+        group["requests"] += rollup.request_count
+        group["errors"] += rollup.error_count
+        group["latency"].merge(latency)
+        group["buckets"].append(
+            {"start": rollup.bucket_start, **summarize(rollup.request_count, rollup.error_count, latency)}
+        )
+
+    series = []
+    for group in groups.values():
+        latency = group.pop("latency")
+        group.update(summarize(group.pop("requests"), group.pop("errors"), latency))
+        series.append(group)
+    series.sort(key=lambda group: group["requests"], reverse=True)
+    return series
+
+
+def summarize(requests: int, errors: int, latency: LatencyHistogram) -> dict:
+    return {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "latency": latency.summary(),
+    }
@@ -0,0 +1,41 @@
+# services/single_flight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one.
+
+    The first caller starts the work in its own task; callers arriving
+    while it runs wait for the same task. Waiters are shielded from each
+    other, so one of them going away does not cancel the call for the rest.
+    """
+
+    def __init__(self):
+        self.started = 0
+        self.shared = 0
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Result of ``call``, and whether it came from a call already in flight"""
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.shared += 1
+        else:
+            self.started += 1
+            task = asyncio.create_task(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task), shared
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception seen, every waiter may have gone away already
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
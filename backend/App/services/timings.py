@@ -0,0 +1,119 @@
+# services/timings.py
+import asyncio
+import ipaddress
+import socket
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+import httpcore
+
+# Timings of the upstream request the current task is making, read by the
+# network backend, which has no other way to tell whose connection it opens
+current_timings: ContextVar[Optional["RequestTimings"]] = ContextVar("current_timings", default=None)
+
+
+def _ms(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return round((end - start) * 1000, 3)
+
+
+class RequestTimings:
+    """Phase timestamps of one upstream request, on the monotonic clock.
+
+    Most marks come from httpcore trace events ("connection.connect_tcp.started",
+    "http11.receive_response_headers.complete", ...). Name prefixes are
+    dropped, so HTTP/1.1 and HTTP/2 requests produce the same marks.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks: dict[str, float] = {}
+
+    def mark(self, name: str):
+        self.marks.setdefault(name, time.perf_counter())
+
+    async def trace(self, event_name: str, info: dict):
+        self.mark(event_name.split(".", 1)[1])
+
+    def phases(self) -> dict:
+        """Non-overlapping phases in milliseconds, None for those that did not happen.
+
+        dns, connect and tls are only set when a new connection was opened;
+        queue is time spent waiting for a host slot or a pooled connection.
+        """
+        marks = self.marks
+        connected = marks.get("start_tls.complete") or marks.get("connect_tcp.complete")
+        sending = marks.get("send_request_headers.started")
+        headers = marks.get("receive_response_headers.complete")
+        dns = _ms(marks.get("dns.started"), marks.get("dns.complete"))
+        connect = _ms(marks.get("connect_tcp.started"), marks.get("connect_tcp.complete"))
+        if connect is not None and dns is not None:
+            # Our backend resolves inside connect_tcp, keep the two apart
+            connect = round(connect - dns, 3)
+        return {
+            "queue_ms": _ms(self.started, marks.get("connect_tcp.started") or sending),
+            "dns_ms": dns,
+            "connect_ms": connect,
+            "tls_ms": _ms(marks.get("start_tls.started"), marks.get("start_tls.complete")),
+            "ttfb_ms": _ms(connected or sending, headers),
+            "download_ms": _ms(headers, marks.get("body.complete")),
+            "total_ms": _ms(self.started, marks.get("body.complete") or headers),
+            "reused_connection": sending is not None and "connect_tcp.started" not in marks,
+        }
+
+
+def log_timing_fields(phases: dict) -> dict:
+    """The phases a ProxyLog stores"""
+    return {name: phases[name] for name in ("queue_ms", "dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms")}
+
+
+class TimedNetworkBackend(httpcore.AsyncNetworkBackend):
+    """The default backend, with name resolution done (and timed) as a step of its own.
+
+    httpcore resolves inside connect_tcp and emits no DNS event, so the
+    lookup is done here and the connect goes to the resolved addresses in
+    order. TLS still uses the original host name for SNI and certificates.
+    """
+
+    def __init__(self, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self._backend = backend or httpcore.AnyIOBackend()
+
+    async def _resolve(self, host: str, port: int, timeout: Optional[float]) -> list[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+        timings = current_timings.get()
+        if timings is not None:
+            timings.mark("dns.started")
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await asyncio.wait_for(
+                loop.getaddrinfo(host, port, type=socket.SOCK_STREAM), timeout
+            )
+        except asyncio.TimeoutError:
+            raise httpcore.ConnectTimeout(f"Timed out resolving {host}")
+        except socket.gaierror as e:
+            raise httpcore.ConnectError(str(e))
+        if timings is not None:
+            timings.mark("dns.complete")
+        # Keep resolver order, drop the duplicates getaddrinfo returns per protocol
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        addresses = await self._resolve(host, port, timeout)
+        for address in addresses[:-1]:
+            try:
+                return await self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout):
+                continue
+        return await self._backend.connect_tcp(addresses[-1], port, timeout, local_address, socket_options)
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float):
+        await self._backend.sleep(seconds)
@@ -0,0 +1,141 @@
+# services/upstream.py
+import json
+import os
+from contextlib import AsyncExitStack
+from typing import Any, Optional
+
+import httpx
+
+from App.services.http_client import host_slot
+from App.services.timings import RequestTimings, current_timings
+
+# Configuration
+PROXY_MAX_BUFFERED_BYTES = int(os.getenv("PROXY_MAX_BUFFERED_BYTES", str(10 * 1024 * 1024)))
+PROXY_PREVIEW_BYTES = int(os.getenv("PROXY_PREVIEW_BYTES", str(64 * 1024)))
+
+# Connection-level headers that describe our hop, not the upstream body
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade", "content-length",
+}
+
+
+class UpstreamTooLarge(Exception):
+    def __init__(self, limit: int):
+        super().__init__(f"Upstream response is larger than {limit} bytes")
+        self.limit = limit
+
+
+async def open_upstream(
+    client: httpx.AsyncClient,
+    stack: AsyncExitStack,
+    method: str,
+    url: str,
+    headers: Optional[dict] = None,
+    body: Any = None,
+    timings: Optional[RequestTimings] = None,
+) -> httpx.Response:
+    """Send a request and return once the upstream headers are in.
+
+    The body is left unread. The host slot and the connection stay held
+    until ``stack`` closes, so callers can stream or read it as they need.
+    ``timings`` collects the phases of the request as it goes.
+    """
+    await stack.enter_async_context(host_slot(url))
+    request = client.build_request(
+        method=method,
+        url=url,
+        headers=headers,
+        json=body if method != "GET" else None,
+    )
+    if timings is not None:
+        request.extensions["trace"] = timings.trace
+    token = current_timings.set(timings)
+    try:
+        response = await client.send(request, stream=True)
+    finally:
+        current_timings.reset(token)
+    stack.push_async_callback(response.aclose)
+    return response
+
+
+async def read_capped(response: httpx.Response, limit: int) -> tuple[bytes, bool]:
+    """Read at most ``limit`` bytes of the (decoded) body.
+
+    Returns the bytes and whether the body went on beyond them. Reading
+    stops at the limit, so the rest is never downloaded.
+    """
+    chunks, size = [], 0
+    async for chunk in response.aiter_bytes():
+        if size + len(chunk) > limit:
+            chunks.append(chunk[:limit - size])
+            return b"".join(chunks), True
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks), False
+
+
+class BufferedResponse:
+    """An upstream response read into memory, possibly cut at a size limit"""
+
+    def __init__(self, response: httpx.Response, content: bytes, truncated: bool, timings: RequestTimings):
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.encoding = response.encoding
+        self.content = content
+        self.truncated = truncated
+        self.timings = timings
+        declared = declared_size(response)
+        self.total_bytes = declared if truncated else len(content)
+
+
+async def fetch_buffered(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    headers: Optional[dict],
+    body: Any,
+    limit: int,
+    truncate: bool = False,
+) -> BufferedResponse:
+    """Send a request and read its body, at most ``limit`` bytes of it.
+
+    Bodies over the limit raise UpstreamTooLarge, or with ``truncate`` are
+    cut short and marked truncated.
+    """
+    timings = RequestTimings()
+    async with AsyncExitStack() as stack:
+        response = await open_upstream(client, stack, method, url, headers, body, timings)
+        declared = declared_size(response)
+        if not truncate and declared is not None and declared > limit:
+            raise UpstreamTooLarge(limit)
+        content, truncated = await read_capped(response, limit)
+        if truncated and not truncate:
+            raise UpstreamTooLarge(limit)
+        timings.mark("body.complete")
+    return BufferedResponse(response, content, truncated, timings)
+
+
+def declared_size(response: httpx.Response) -> Optional[int]:
+    try:
+        return int(response.headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def decode_body(content: bytes, encoding: Optional[str], truncated: bool) -> Any:
+    """JSON when the full body parses as JSON, text otherwise"""
+    if not truncated:
+        try:
+            return json.loads(content)
+        except ValueError:
+            pass
+    # A cut can land inside a multi-byte character, replace rather than fail
+    return content.decode(encoding or "utf-8", errors="replace")
+
+
+def passthrough_headers(response: httpx.Response) -> dict:
+    return {
+        name: value for name, value in response.headers.items()
+        if name.lower() not in HOP_BY_HOP_HEADERS
+    }
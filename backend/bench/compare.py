@@ -0,0 +1,89 @@
+# bench/compare.py
+"""Compare two benchmark result files written by bench/run.py.
+
+Prints every numeric result side by side. Timings (``*_ms``), pacing
+errors (``*_error_pct``) and throughput (``rps``) have a direction; those
+that got worse by more than --threshold percent are marked, and make the
+exit status 1.
+
+Run from backend/: python -m bench.compare baseline.json current.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Iterator, Optional
+
+# Below this, a timing difference is noise whatever its percentage
+MIN_CHANGE_MS = 0.5
+
+
+def flatten(results: dict, prefix: str = "") -> Iterator[tuple[str, float]]:
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+def direction(name: str) -> int:
+    """1 when higher is better, -1 when lower is, 0 for plain counts"""
+    key = name.rsplit(".", 1)[-1]
+    if key == "rps":
+        return 1
+    if key.startswith("max_"):
+        # A single sample, too noisy to gate on
+        return 0
+    if key.endswith("_ms") or key.endswith("_error_pct"):
+        return -1
+    return 0
+
+
+def worse_by(name: str, before: float, after: float) -> Optional[float]:
+    """Percent the metric got worse, None when it has no direction or did not"""
+    sense = direction(name)
+    if not sense or before == 0:
+        return None
+    if name.endswith("_ms") and abs(after - before) < MIN_CHANGE_MS:
+        return None
+    change = (after - before) / abs(before) * 100 * -sense
+    return change if change > 0 else None
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent a metric may get worse")
+    args = parser.parse_args(argv)
+
+    baseline, current = (json.loads(path.read_text()) for path in (args.baseline, args.current))
+    for label, report in (("baseline", baseline), ("current", current)):
+        meta = report["meta"]
+        print(f"{label}: {meta['commit'] or 'unknown'} at {meta['started_at']}{' (quick)' if meta['quick'] else ''}")
+    if baseline["meta"]["quick"] != current["meta"]["quick"]:
+        print("warning: comparing a --quick run with a full one", file=sys.stderr)
+
+    before = dict(flatten(baseline["results"]))
+    regressions = 0
+    width = max((len(name) for name, _ in flatten(current["results"])), default=0)
+    for name, after in flatten(current["results"]):
+        if name not in before:
+            print(f"{name:<{width}}  {'':>12}  {after:>12g}  (new)")
+            continue
+        old = before[name]
+        change = f"{(after - old) / abs(old) * 100:+.1f}%" if old else ""
+        worse = worse_by(name, old, after)
+        flag = ""
+        if worse is not None and worse > args.threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{name:<{width}}  {old:>12g}  {after:>12g}  {change:>8}{flag}")
+
+    print(f"\n{regressions} metric(s) worse by more than {args.threshold:g}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
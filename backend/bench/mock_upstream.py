@@ -0,0 +1,59 @@
+# bench/mock_upstream.py
+"""A local upstream for the benchmark suite, kept as cheap as possible so
+the numbers measure the app and not the thing it calls.
+
+Run with: uvicorn bench.mock_upstream:app --port 9100
+"""
+import asyncio
+from functools import lru_cache
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from bench.specs import synthetic_spec_bytes, with_nonce
+
+OK_BODY = b'{"ok":true}'
+
+
+@lru_cache(maxsize=16)
+def _filler(size: int) -> bytes:
+    return b"x" * size
+
+
+@lru_cache(maxsize=8)
+def _spec(operations: int) -> bytes:
+    return synthetic_spec_bytes(operations)
+
+
+async def ok(request: Request) -> Response:
+    return Response(OK_BODY, media_type="application/json")
+
+
+async def payload(request: Request) -> Response:
+    """``size`` bytes of text"""
+    return Response(_filler(int(request.query_params.get("size", "1024"))), media_type="text/plain")
+
+
+async def delay(request: Request) -> Response:
+    """Answers after ``ms`` milliseconds"""
+    await asyncio.sleep(float(request.query_params.get("ms", "10")) / 1000)
+    return Response(OK_BODY, media_type="application/json")
+
+
+async def spec(request: Request) -> Response:
+    """A synthetic spec of ``operations`` operations, its content changed by ``nonce``"""
+    content = _spec(int(request.query_params.get("operations", "20")))
+    nonce = request.query_params.get("nonce")
+    if nonce:
+        content = with_nonce(content, nonce)
+    return Response(content, media_type="application/json")
+
+
+app = Starlette(routes=[
+    Route("/ok", ok),
+    Route("/payload", payload),
+    Route("/delay", delay),
+    Route("/spec.json", spec),
+])
@@ -0,0 +1,437 @@
+# bench/run.py
+"""Benchmark suite for the app's hot paths, against a local mock upstream.
+
+Starts the mock upstream and the app on free local ports, against a
+throwaway SQLite database, and measures:
+
+- proxy: latency /api/proxy adds over calling the upstream directly,
+  and throughput of both at a fixed concurrency
+- rate_limit: how closely /api/rate-limit-test paces sends to the target rps
+- openapi: decode, parse and indexing time of synthetic specs, and
+  /api/load-openapi on a cache miss and a cache hit
+- auth: cost of authenticating a request, with a cached and a new token,
+  and of a login
+
+Results are written as JSON, to be compared run to run with bench/compare.py.
+
+Run from backend/: python -m bench.run [--quick] [--only proxy auth] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from App.services.benchmarks import percentile
+from bench.specs import SPEC_SIZES, synthetic_spec_bytes, with_nonce
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SUITES = ("proxy", "rate_limit", "openapi", "auth")
+STARTUP_TIMEOUT = 30.0  # seconds to wait for a server to answer
+
+# (full, --quick) iteration counts
+LATENCY_SAMPLES = (500, 100)
+WARMUP_REQUESTS = (50, 10)
+THROUGHPUT_SECONDS = (5, 2)
+THROUGHPUT_CONCURRENCY = 32
+PAYLOAD_BYTES = 256 * 1024
+PACING_TARGETS = ((50, 200, 1000), (50, 500))
+PACING_SECONDS = (5, 2)
+SPEC_REPEATS = {"small": (20, 5), "medium": (5, 2), "huge": (2, 1)}
+QUICK_HUGE_OPERATIONS = 5000
+LOGIN_SAMPLES = (10, 3)
+
+
+def summarize(samples: list[float]) -> dict:
+    """Latency summary in milliseconds"""
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 3) if samples else None,
+        "p50_ms": percentile(samples, 50),
+        "p90_ms": percentile(samples, 90),
+        "p99_ms": percentile(samples, 99),
+        "max_ms": round(max(samples), 3) if samples else None,
+    }
+
+
+def overhead(base: dict, measured: dict) -> dict:
+    """How much slower ``measured`` was than ``base``, percentile by percentile"""
+    return {
+        key: round(measured[key] - base[key], 3)
+        for key in ("mean_ms", "p50_ms", "p90_ms", "p99_ms")
+        if measured[key] is not None and base[key] is not None
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """A uvicorn process serving ``app`` on a free local port"""
+
+    def __init__(self, app: str, workdir: Path, env: Optional[dict] = None):
+        self.app = app
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.log_path = workdir / f"{app.split(':')[0]}.log"
+        self.env = {**os.environ, **(env or {})}
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, ready_path: str):
+        self._log = open(self.log_path, "wb")
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", self.app,
+                "--host", "127.0.0.1", "--port", str(self.port),
+                "--log-level", "warning", "--no-access-log",
+            ],
+            cwd=BACKEND_DIR, env=self.env, stdout=self._log, stderr=subprocess.STDOUT,
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                if httpx.get(self.url + ready_path, timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+        self.stop()
+        raise RuntimeError(f"{self.app} did not start, see {self.log_path}:\n{self.log_path.read_text()[-2000:]}")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.process:
+            self._log.close()
+
+
+def prepare_database(url: str):
+    from sqlmodel import SQLModel, create_engine
+    import App.models.models  # noqa: F401  registers the tables
+
+    SQLModel.metadata.create_all(create_engine(url))
+
+
+class Suite:
+    def __init__(self, app_url: str, upstream_url: str, quick: bool):
+        self.app_url = app_url
+        self.upstream_url = upstream_url
+        self.quick = quick
+        self.client = httpx.AsyncClient(
+            timeout=60, limits=httpx.Limits(max_connections=THROUGHPUT_CONCURRENCY * 2)
+        )
+        self.auth_headers: dict = {}
+
+    def pick(self, setting: tuple):
+        return setting[1] if self.quick else setting[0]
+
+    async def login(self) -> dict:
+        credentials = {"email": "bench@example.com", "password": "benchmark-password"}
+        await self.client.post(
+            f"{self.app_url}/api/auth/register", json={**credentials, "username": "bench"}
+        )
+        response = await self.client.post(f"{self.app_url}/api/auth/login", json=credentials)
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def setup(self):
+        self.auth_headers = await self.login()
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def timed(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        samples: int,
+        warmup: int,
+        expected: tuple[int, ...] = (200,),
+    ) -> list[float]:
+        """Latencies of ``samples`` sequential calls, after ``warmup`` untimed ones"""
+        latencies = []
+        for call in range(warmup + samples):
+            started = time.perf_counter()
+            response = await send()
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code not in expected:
+                raise RuntimeError(f"{response.request.url} answered {response.status_code}: {response.text[:200]}")
+            if call >= warmup:
+                latencies.append(elapsed)
+        return latencies
+
+    async def throughput(self, send: Callable[[], Awaitable[httpx.Response]], seconds: float) -> dict:
+        """Requests per second ``THROUGHPUT_CONCURRENCY`` callers sustain for ``seconds``"""
+        latencies: list[float] = []
+        errors = 0
+        deadline = time.perf_counter() + seconds
+
+        async def caller():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await send()
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(caller() for _ in range(THROUGHPUT_CONCURRENCY)))
+        elapsed = time.perf_counter() - started
+        return {
+            "concurrency": THROUGHPUT_CONCURRENCY,
+            "rps": round(len(latencies) / elapsed, 1),
+            "errors": errors,
+            **summarize(latencies),
+        }
+
+    def proxied(self, url: str) -> Callable[[], Awaitable[httpx.Response]]:
+        body = {"method": "GET", "url": url}
+        return lambda: self.client.post(f"{self.app_url}/api/proxy", json=body, headers=self.auth_headers)
+
+    def direct(self, url: str) -> Callable[[], Awaitable[httpx.Response]]:
+        return lambda: self.client.get(url)
+
+    async def proxy(self) -> dict:
+        samples, warmup = self.pick(LATENCY_SAMPLES), self.pick(WARMUP_REQUESTS)
+        targets = {
+            "small": f"{self.upstream_url}/ok",
+            "payload": f"{self.upstream_url}/payload?size={PAYLOAD_BYTES}",
+        }
+        latency = {}
+        for name, url in targets.items():
+            direct = summarize(await self.timed(self.direct(url), samples, warmup))
+            proxied = summarize(await self.timed(self.proxied(url), samples, warmup))
+            latency[name] = {"direct": direct, "proxied": proxied, "added": overhead(direct, proxied)}
+
+        seconds = self.pick(THROUGHPUT_SECONDS)
+        direct = await self.throughput(self.direct(targets["small"]), seconds)
+        proxied = await self.throughput(self.proxied(targets["small"]), seconds)
+        return {
+            "latency": latency,
+            "throughput": {
+                "direct": direct,
+                "proxied": proxied,
+                "proxied_share": round(proxied["rps"] / direct["rps"], 3) if direct["rps"] else None,
+            },
+        }
+
+    async def rate_limit(self) -> dict:
+        duration = self.pick(PACING_SECONDS)
+        results = {}
+        for target in self.pick(PACING_TARGETS):
+            started = time.perf_counter()
+            response = await self.client.post(
+                f"{self.app_url}/api/rate-limit-test",
+                json={"method": "GET", "url": f"{self.upstream_url}/ok", "rps": target, "duration": duration},
+                headers=self.auth_headers,
+                # An overloaded machine runs long, that is what is being measured
+                timeout=None,
+            )
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
+            result = response.json()
+            per_second = [second["sent"] for second in result["timeline"]]
+            results[f"rps_{target}"] = {
+                "target_rps": target,
+                "achieved_rps": result["achieved_rps"],
+                "rate_error_pct": round(abs(result["achieved_rps"] - target) / target * 100, 2),
+                # Worst second, how far its sends were from the target
+                "worst_second_error_pct": round(
+                    max(abs(sent - target) for sent in per_second) / target * 100, 2
+                ) if per_second else None,
+                "sent": result["total_requests"],
+                "dropped": result["dropped_requests"],
+                "late": result["late_requests"],
+                "errors": result["other_errors"],
+                "overrun_ms": round((elapsed - duration) * 1000, 1),
+                "latency_p50_ms": result["latency"]["p50_ms"],
+                "latency_p99_ms": result["latency"]["p99_ms"],
+            }
+        return results
+
+    async def openapi(self) -> dict:
+        from App.services.openapi_cache import ParsedSpec
+        from App.services.openapi_parser import load_spec_document, parse_spec
+
+        results = {}
+        for size, operations in SPEC_SIZES.items():
+            if self.quick and size == "huge":
+                operations = QUICK_HUGE_OPERATIONS
+            repeats = self.pick(SPEC_REPEATS[size])
+            content = synthetic_spec_bytes(operations)
+            spec_url = f"{self.upstream_url}/spec.json?operations={operations}"
+
+            # The app's own steps, in process: JSON decode, parse_spec, index and encode
+            phases = {"decode_ms": [], "parse_ms": [], "index_ms": []}
+            for _ in range(repeats):
+                started = time.perf_counter()
+                document = load_spec_document(content, "application/json", spec_url)
+                decoded = time.perf_counter()
+                parsed = parse_spec(document, spec_url)
+                parsed_at = time.perf_counter()
+                ParsedSpec(spec_url, "bench", parsed)
+                indexed = time.perf_counter()
+                phases["decode_ms"].append((decoded - started) * 1000)
+                phases["parse_ms"].append((parsed_at - decoded) * 1000)
+                phases["index_ms"].append((indexed - parsed_at) * 1000)
+
+            # The endpoint: a new nonce per load is a cache miss, the same URL again a hit
+            misses, hits = [], []
+            index_bytes = None
+            for _ in range(repeats):
+                url = f"{spec_url}&nonce={uuid.uuid4().hex[:16]}"
+                for samples, expected in ((misses, "miss"), (hits, "hit")):
+                    started = time.perf_counter()
+                    response = await self.client.post(
+                        f"{self.app_url}/api/load-openapi", json={"spec_url": url}, headers=self.auth_headers
+                    )
+                    samples.append((time.perf_counter() - started) * 1000)
+                    response.raise_for_status()
+                    if response.headers.get("x-spec-cache") != expected:
+                        raise RuntimeError(f"Expected a spec cache {expected} loading {url}")
+                    index_bytes = len(response.content)
+
+            results[size] = {
+                "operations": operations,
+                "spec_bytes": len(with_nonce(content, "0")),
+                "index_bytes": index_bytes,
+                **{name: round(statistics.median(values), 3) for name, values in phases.items()},
+                "load_miss_ms": round(statistics.median(misses), 3),
+                "load_hit_ms": round(statistics.median(hits), 3),
+            }
+        return results
+
+    async def auth(self) -> dict:
+        from App.auth.auth import create_access_token
+
+        samples, warmup = self.pick(LATENCY_SAMPLES), self.pick(WARMUP_REQUESTS)
+        me = f"{self.app_url}/api/auth/me"
+        # The same route turned away before authentication, as the baseline
+        rejected = summarize(await self.timed(
+            lambda: self.client.get(me), samples, warmup, expected=(401, 403)
+        ))
+        authenticated = summarize(await self.timed(
+            lambda: self.client.get(me, headers=self.auth_headers), samples, warmup
+        ))
+
+        # A token the app has not seen yet on every request, so each one is
+        # decoded and verified (the user itself stays cached). Signed here,
+        # which relies on the app sharing this process's SECRET_KEY.
+        user = (await self.client.get(me, headers=self.auth_headers)).json()
+        tokens = (
+            create_access_token({"user_id": user["id"], "email": user["email"]}, timedelta(days=1, seconds=number))
+            for number in range(warmup + samples)
+        )
+        new_token = summarize(await self.timed(
+            lambda: self.client.get(me, headers={"Authorization": f"Bearer {next(tokens)}"}), samples, warmup
+        ))
+
+        logins = []
+        for _ in range(self.pick(LOGIN_SAMPLES)):
+            started = time.perf_counter()
+            await self.login()
+            logins.append((time.perf_counter() - started) * 1000)
+        return {
+            "rejected": rejected,
+            "authenticated": authenticated,
+            "added": overhead(rejected, authenticated),
+            "new_token": new_token,
+            "new_token_added": overhead(rejected, new_token),
+            "login": summarize(logins),
+        }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_suites(suite: Suite, names: list[str]) -> dict:
+    await suite.setup()
+    results = {}
+    try:
+        for name in names:
+            print(f"Running {name}...", file=sys.stderr)
+            started = time.perf_counter()
+            results[name] = await getattr(suite, name)()
+            print(f"  {name} took {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    finally:
+        await suite.close()
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> Path:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=SUITES, default=list(SUITES), help="suites to run")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations and a smaller huge spec")
+    parser.add_argument("--output", type=Path, help="results file (default: bench/results/<time>-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    workdir = Path(tempfile.mkdtemp(prefix="playground-bench-"))
+    database_url = f"sqlite:///{workdir / 'bench.db'}"
+    prepare_database(database_url)
+    upstream = Server("bench.mock_upstream:app", workdir)
+    app = Server("App.main:app", workdir, {"DATABASE_URL": database_url})
+    started_at = datetime.now(timezone.utc)
+    try:
+        upstream.start("/ok")
+        app.start("/health")
+        suite = Suite(app.url, upstream.url, args.quick)
+        results = asyncio.run(run_suites(suite, args.only))
+    finally:
+        app.stop()
+        upstream.stop()
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "duration_s": round((datetime.now(timezone.utc) - started_at).total_seconds(), 1),
+            "commit": commit,
+            "quick": args.quick,
+            "suites": args.only,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{started_at:%Y%m%dT%H%M%SZ}-{commit or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    shutil.rmtree(workdir, ignore_errors=True)
+    print(f"Results written to {output}", file=sys.stderr)
+    return output
+
+
+if __name__ == "__main__":
+    main()
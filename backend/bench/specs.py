@@ -0,0 +1,91 @@
+# bench/specs.py
+import json
+import random
+
+# Operations in each synthetic spec size the suite loads
+SPEC_SIZES = {"small": 20, "medium": 1000, "huge": 20000}
+# Shared component schemas the operations point at through $ref
+SCHEMA_COUNT = 50
+TAG_COUNT = 20
+# Fixed-width placeholder in info, swapped per load so every load is a cache miss
+NONCE_PLACEHOLDER = "0" * 16
+METHODS = ("get", "post")
+
+
+def _schema(rng: random.Random, number: int) -> dict:
+    properties = {
+        "id": {"type": "integer", "format": "int64", "example": rng.randint(1, 10_000)},
+        "name": {"type": "string", "example": f"item-{number}"},
+        "status": {"type": "string", "enum": ["active", "pending", "archived"]},
+        "created_at": {"type": "string", "format": "date-time"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "score": {"type": "number", "format": "double", "minimum": 0, "maximum": 100},
+    }
+    for field in range(rng.randint(2, 8)):
+        properties[f"field_{field}"] = {"type": rng.choice(["string", "integer", "boolean"])}
+    if number + 1 < SCHEMA_COUNT:
+        # Chained, never cyclic, so example generation has some depth to walk
+        properties["child"] = {"$ref": f"#/components/schemas/Resource{number + 1}"}
+    return {
+        "type": "object",
+        "required": ["id", "name"],
+        "description": f"Resource number {number}, with a few typed fields.",
+        "properties": properties,
+    }
+
+
+def _operation(rng: random.Random, method: str, resource: int, schema: int) -> dict:
+    operation = {
+        "operationId": f"{method}Resource{resource}",
+        "summary": f"{'Fetch' if method == 'get' else 'Create'} resource {resource}",
+        "description": "Synthetic operation generated for benchmarking the spec loader.",
+        "tags": [f"group{resource % TAG_COUNT}"],
+        "parameters": [
+            {"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}},
+            {"name": "limit", "in": "query", "schema": {"type": "integer", "default": 20}},
+            {"name": "X-Trace-Id", "in": "header", "schema": {"type": "string"}},
+        ],
+        "responses": {
+            "200": {
+                "description": "OK",
+                "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/Resource{schema}"}}},
+            },
+            "404": {"description": "Not found"},
+        },
+    }
+    if method == "post":
+        operation["requestBody"] = {
+            "required": True,
+            "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/Resource{schema}"}}},
+        }
+    if rng.random() < 0.1:
+        operation["deprecated"] = True
+    return operation
+
+
+def synthetic_spec(operations: int, seed: int = 0) -> dict:
+    """A deterministic OpenAPI 3.0 document with ``operations`` operations"""
+    rng = random.Random(seed)
+    paths = {}
+    for resource in range((operations + len(METHODS) - 1) // len(METHODS)):
+        item = {}
+        for method in METHODS[:operations - resource * len(METHODS)]:
+            item[method] = _operation(rng, method, resource, rng.randrange(SCHEMA_COUNT))
+        paths[f"/resources{resource}/{{id}}"] = item
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": f"Benchmark spec ({operations} operations)", "version": "1.0.0", "x-nonce": NONCE_PLACEHOLDER},
+        "servers": [{"url": "http://127.0.0.1/api"}],
+        "paths": paths,
+        "components": {"schemas": {f"Resource{number}": _schema(rng, number) for number in range(SCHEMA_COUNT)}},
+    }
+
+
+def synthetic_spec_bytes(operations: int, seed: int = 0) -> bytes:
+    return json.dumps(synthetic_spec(operations, seed)).encode()
+
+
+def with_nonce(content: bytes, nonce: str) -> bytes:
+    """The spec with its nonce placeholder replaced, which changes its content hash"""
+    nonce = nonce[:len(NONCE_PLACEHOLDER)].rjust(len(NONCE_PLACEHOLDER), "0")
+    return content.replace(NONCE_PLACEHOLDER.encode(), nonce.encode(), 1)
@@ -0,0 +1,74 @@
+import math
+
+import pytest
+
+from App.models.models import BenchmarkRun
+from App.services.benchmarks import compare, slower_p_value
+
+# current [3, 4, 4, 5] against baseline [1, 2, 3, 4]; ranks of the merged
+# sample are 1, 2, 3.5, 3.5, 6, 6, 6, 8, so current's rank sum is 23.5 and
+# U = 23.5 - 4 * 5 / 2 = 13.5 (of 16 pairs). Ties of 2 and 3 give a tie
+# term of 6 + 24 = 30, variance 16 / 12 * (9 - 30 / 56) = 11.2857.
+CURRENT = [3, 4, 4, 5]
+BASELINE = [1, 2, 3, 4]
+VARIANCE = 16 / 12 * (9 - 30 / 56)
+
+
+def one_sided_p(u: float) -> float:
+    z = (u - 8 - 0.5) / math.sqrt(VARIANCE)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def test_slower_p_value_with_ties():
+    assert slower_p_value(CURRENT, BASELINE) == pytest.approx(one_sided_p(13.5))
+    assert slower_p_value(CURRENT, BASELINE) == pytest.approx(0.06833, abs=1e-5)
+
+
+def test_slower_p_value_the_other_way():
+    # U for the swapped samples is 16 - 13.5
+    assert slower_p_value(BASELINE, CURRENT) == pytest.approx(one_sided_p(2.5))
+    assert slower_p_value(BASELINE, CURRENT) == pytest.approx(0.96295, abs=1e-5)
+
+
+def test_slower_p_value_degenerate():
+    assert slower_p_value([], BASELINE) == 1.0
+    # All values tied, no variance to test against
+    assert slower_p_value([5, 5], [5, 5]) == 1.0
+
+
+def run(samples: list[float], status_counts: dict) -> BenchmarkRun:
+    return BenchmarkRun(
+        saved_request_id=1, user_id=1, trigger="manual",
+        iterations=len(samples), samples=samples, status_counts=status_counts,
+    )
+
+
+def test_compare_without_baseline():
+    assert compare([1.0, 2.0], {"200": 2}, []) is None
+
+
+def test_compare_flags_slower_latency():
+    baseline = [run([10.0 + i % 5 for i in range(20)], {"200": 20}) for _ in range(2)]
+    result = compare([20.0 + i % 5 for i in range(20)], {"200": 20}, baseline)
+    assert result["baseline_runs"] == 2
+    assert result["baseline_samples"] == 40
+    assert result["percentiles"]["p50"] == {
+        "baseline_ms": 12.0, "current_ms": 22.0, "delta_ms": 10.0, "delta_pct": 83.3,
+    }
+    assert result["p_value"] < 0.01
+    assert result["regression"] is True
+    assert result["reasons"] == ["latency"]
+
+
+def test_compare_same_latency_is_not_a_regression():
+    samples = [10.0 + i % 5 for i in range(20)]
+    result = compare(samples, {"200": 20}, [run(samples, {"200": 20})])
+    assert result["p_value"] > 0.5
+    assert result["regression"] is False
+
+
+def test_compare_flags_errors():
+    samples = [10.0 + i % 5 for i in range(20)]
+    result = compare(samples, {"200": 16, "503": 2, "error": 2}, [run(samples, {"200": 20})])
+    assert result["error_rate"] == {"baseline": 0.0, "current": 0.2}
+    assert result["reasons"] == ["errors"]
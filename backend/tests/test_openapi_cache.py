@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import httpx
+
+from App.services.openapi_cache import SpecCache
+
+SPEC_URL = "http://upstream.test/openapi.json"
+SPEC = json.dumps({
+    "openapi": "3.0.3",
+    "info": {"title": "Items", "version": "1"},
+    "paths": {"/items": {"get": {"operationId": "listItems", "summary": "List items"}}},
+}).encode()
+ETAG = '"v1"'
+
+
+def upstream(cache: SpecCache, requests: list[dict]) -> httpx.AsyncClient:
+    """Serves SPEC, answering a matching If-None-Match with a 304 after the
+    cache has dropped every parse, as another URL's load could meanwhile"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(dict(request.headers))
+        if request.headers.get("if-none-match") == ETAG:
+            for key in list(cache._parsed):
+                cache._remove(key)
+            return httpx.Response(304, headers={"etag": ETAG})
+        return httpx.Response(200, content=SPEC, headers={"etag": ETAG, "content-type": "application/json"})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_load_refetches_a_spec_evicted_during_revalidation():
+    async def scenario():
+        cache, requests = SpecCache(), []
+        async with upstream(cache, requests) as client:
+            first, _ = await cache.load(client, SPEC_URL)
+            second, cached = await cache.load(client, SPEC_URL)
+        return first, second, cached, requests
+
+    first, second, cached, requests = asyncio.run(scenario())
+    assert second.spec_id == first.spec_id
+    assert cached is False
+    # The first load, the conditional one that got a 304, then one without validators
+    assert [headers.get("if-none-match") for headers in requests] == [None, ETAG, None]
+
+
+def test_stream_refetches_a_spec_evicted_during_revalidation():
+    async def scenario():
+        cache, requests = SpecCache(), []
+        async with upstream(cache, requests) as client:
+            await cache.load(client, SPEC_URL)
+            return [event async for event in cache.stream(client, SPEC_URL, page_size=10)]
+
+    events = asyncio.run(scenario())
+    assert [entry["id"] for name, data in events if name == "endpoints" for entry in data["endpoints"]] == ["listItems"]
+    assert events[-1][0] == "done"
+    assert events[-1][1]["cache"] == "miss"
+
+
+def test_a_spec_over_budget_stays_resolvable_until_the_next():
+    async def scenario():
+        cache, requests = SpecCache(max_bytes=1), []
+        async with upstream(cache, requests) as client:
+            first, _ = await cache.load(client, SPEC_URL)
+            first_found = cache.get(first.spec_id)
+            second, _ = await cache.load(client, SPEC_URL.replace("openapi", "other"))
+        return cache, first, first_found, second
+
+    cache, first, first_found, second = asyncio.run(scenario())
+    assert first_found is first
+    assert cache.get(first.spec_id) is None
+    assert cache.get(second.spec_id) is second
+    assert cache.stats()["specs"] == 1
+    assert cache.size == second.size
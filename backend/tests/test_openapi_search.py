@@ -0,0 +1,90 @@
+import pytest
+
+from App.services.openapi_search import FUZZY_FACTOR, SearchIndex, _within_one_edit
+
+
+def endpoint(method: str, path: str, operation_id: str, summary: str, tags: list[str], parameters=()) -> dict:
+    return {
+        "id": operation_id,
+        "method": method,
+        "path": path,
+        "summary": summary,
+        "tags": tags,
+        "parameters": [{"name": name} for name in parameters],
+    }
+
+
+ENDPOINTS = [
+    endpoint("GET", "/users/{id}", "getUser", "Fetch a user", ["users"], ["id"]),
+    endpoint("GET", "/users", "listUsers", "List users", ["users"], ["limit"]),
+    endpoint("POST", "/orders", "createOrder", "Create an order for a user", ["orders"]),
+    endpoint("GET", "/orders/{id}", "getOrder", "Fetch an order", ["orders", "admin"], ["id"]),
+    endpoint("DELETE", "/invoices/{id}", "deleteInvoice", "Remove an invoice", ["billing"], ["id"]),
+]
+
+
+@pytest.fixture
+def index() -> SearchIndex:
+    return SearchIndex(ENDPOINTS)
+
+
+def positions(found: dict) -> list[int]:
+    return [position for position, _ in found["results"]]
+
+
+@pytest.mark.parametrize("a, b", [
+    ("from", "form"),    # adjacent swap
+    ("user", "users"),   # insertion
+    ("users", "user"),   # deletion
+    ("cat", "cut"),      # substitution
+    ("order", "order"),
+])
+def test_within_one_edit(a, b):
+    assert _within_one_edit(a, b)
+
+
+@pytest.mark.parametrize("a, b", [
+    ("user", "usrs"),    # two substitutions, not a swap
+    ("abc", "cab"),      # a rotation is two edits
+    ("user", "usersx"),  # two insertions
+])
+def test_not_within_one_edit(a, b):
+    assert not _within_one_edit(a, b)
+
+
+def test_every_term_must_match(index):
+    assert positions(index.search("order user")) == [2]
+    assert positions(index.search("fetch order")) == [3]
+    assert index.search("order billing")["total"] == 0
+
+
+def test_exact_words_rank_above_prefixes(index):
+    # "user" is a word of getUser and of createOrder's summary, only a
+    # prefix of listUsers' "users"; operationIds weigh more than summaries
+    found = index.search("user")
+    assert positions(found) == [0, 2, 1]
+    assert positions(index.search("inv")) == [4]
+
+
+def test_typos_match_at_a_lower_score(index):
+    exact = dict(index.search("order")["results"])
+    fuzzy = dict(index.search("ordr")["results"])
+    assert set(fuzzy) == {2, 3}
+    for position, score in fuzzy.items():
+        assert score == pytest.approx(exact[position] * FUZZY_FACTOR, abs=1e-3)
+    # Too short to be corrected
+    assert index.search("usr")["total"] == 0
+
+
+def test_facets_are_counted_before_the_tag_filter(index):
+    found = index.search("fetch", tags=["admin"])
+    assert positions(found) == [3]
+    assert found["total"] == 1
+    facets = {facet["tag"]: facet["count"] for facet in found["facets"]["tags"]}
+    assert facets == {"users": 1, "orders": 1, "admin": 1}
+
+
+def test_method_and_tags_without_a_query(index):
+    found = index.search("", tags=["users"], method="get")
+    assert positions(found) == [0, 1]
+    assert {facet["tag"] for facet in found["facets"]["tags"]} == {"users", "orders", "admin"}
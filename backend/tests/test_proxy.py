@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from App.routes.proxy import ClosingStreamingResponse, flight_key
+
+URL = "http://upstream.test/search"
+LIMIT = 1024
+
+
+def test_flight_key_tells_bodies_apart():
+    key = flight_key("GET", URL, {"Accept": "application/json"}, {"q": "a"}, LIMIT, "buffered")
+    assert key != flight_key("GET", URL, {"Accept": "application/json"}, {"q": "b"}, LIMIT, "buffered")
+    assert key != flight_key("GET", URL, {"Accept": "application/json"}, None, LIMIT, "buffered")
+
+
+def test_flight_key_ignores_header_case_and_key_order():
+    key = flight_key("GET", URL, {"Accept": "application/json"}, {"q": "a", "page": 1}, LIMIT, "buffered")
+    assert key == flight_key("GET", URL, {"accept": "application/json"}, {"page": 1, "q": "a"}, LIMIT, "buffered")
+
+
+async def chunks():
+    yield b"first"
+    yield b"second"
+
+
+def send_response(fail_on: int, sent: list, cleaned: list):
+    """Send a ClosingStreamingResponse to a client that goes away at its
+    ``fail_on``-th message (0 for never)"""
+    async def cleanup():
+        cleaned.append(True)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if len(sent) + 1 == fail_on:
+            raise OSError("client went away")
+        sent.append(message)
+
+    response = ClosingStreamingResponse(chunks(), cleanup)
+    asyncio.run(response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send))
+
+
+def test_stream_cleanup_after_the_body():
+    sent, cleaned = [], []
+    send_response(0, sent, cleaned)
+    assert [message.get("body") for message in sent[1:]] == [b"first", b"second", b""]
+    assert cleaned == [True]
+
+
+def test_stream_cleanup_when_the_client_is_gone_before_the_body():
+    sent, cleaned = [], []
+    with pytest.raises(ClientDisconnect):
+        send_response(1, sent, cleaned)
+    assert sent == []
+    assert cleaned == [True]
@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+
+from App.services.response_cache import ResponseCache, cache_key
+from App.services.timings import RequestTimings
+from App.services.upstream import BufferedResponse
+
+KEY = cache_key(1, "GET", "http://upstream.test/items", {})
+
+
+def buffered(status: int, content: bytes = b"", headers: dict = None) -> BufferedResponse:
+    response = httpx.Response(status, headers=headers or {})
+    return BufferedResponse(response, content, False, RequestTimings())
+
+
+def stored(content: bytes) -> BufferedResponse:
+    return buffered(200, content, {"etag": f'"{len(content)}"', "cache-control": "max-age=60"})
+
+
+async def revalidate(cache: ResponseCache, during) -> tuple:
+    """A 304 arriving after ``during`` ran, as it would while the proxy awaits the upstream"""
+    entry = cache.get(KEY, {})
+    await asyncio.sleep(0)
+    during()
+    cache.refresh(KEY, entry, buffered(304, headers={"cache-control": "max-age=120"}))
+    return entry
+
+
+def held_bytes(cache: ResponseCache) -> int:
+    return sum(entry.size for entry in cache._entries.values())
+
+
+def test_refresh_after_a_concurrent_put():
+    cache = ResponseCache()
+    cache.put(KEY, {}, stored(b"old body"))
+    entry = asyncio.run(revalidate(cache, lambda: cache.put(KEY, {}, stored(b"a much newer body"))))
+    assert cache.get(KEY, {}) is not entry
+    assert cache.size == held_bytes(cache)
+    # The caller still gets the revalidated headers
+    assert entry.headers["cache-control"] == "max-age=120"
+
+
+def test_refresh_after_eviction():
+    cache = ResponseCache()
+    cache.put(KEY, {}, stored(b"old body"))
+    asyncio.run(revalidate(cache, lambda: cache.clear(1)))
+    assert cache.size == 0
+    assert cache.stats()["entries"] == 0
+
+
+def test_refresh_of_a_held_entry():
+    cache = ResponseCache()
+    cache.put(KEY, {}, stored(b"old body"))
+    asyncio.run(revalidate(cache, lambda: None))
+    assert cache.size == held_bytes(cache)
+    assert cache.get(KEY, {}).headers["cache-control"] == "max-age=120"
@@ -53,7 +53,7 @@ function RequestBuilder({ onLogout }) {
     setLogsLoading(true);
     try {
       const token = localStorage.getItem("token");
-      const res = await fetch("http://localhost:8000/api/proxy/logs", {
+      const res = await fetch("http://localhost:8000/api/proxy/logs?limit=20", {
         headers: {
           "Authorization": `Bearer ${token}`,
         },
@@ -61,7 +61,7 @@ function RequestBuilder({ onLogout }) {
       
       if (res.ok) {
         const data = await res.json();
-        setLogs(data.slice(0, 20));
+        setLogs(data.items);
       }
     } catch (err) {
       console.error("Failed to fetch logs:", err);
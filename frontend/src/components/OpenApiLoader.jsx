@@ -11,6 +11,12 @@ function OpenAPILoader({ onLoadEndpoint }) {
   const [searchTerm, setSearchTerm] = useState("");
   const [error, setError] = useState(null);
   const [expandedEndpoints, setExpandedEndpoints] = useState({});
+  // Operation details by endpoint id, fetched when an endpoint is first expanded
+  const [details, setDetails] = useState({});
+  const [specId, setSpecId] = useState(null);
+  // Server-side search results, null while the search box is empty
+  const [searchResults, setSearchResults] = useState(null);
+  const [selectedTags, setSelectedTags] = useState([]);
 
   useEffect(() => {
     // Load from sessionStorage on mount
@@ -18,12 +24,14 @@ function OpenAPILoader({ onLoadEndpoint }) {
     const savedInfo = sessionStorage.getItem('openapi_info');
     const savedUrl = sessionStorage.getItem('openapi_url');
     const savedTime = sessionStorage.getItem('openapi_loaded_at');
+    const savedSpecId = sessionStorage.getItem('openapi_spec_id');
     
     if (savedEndpoints) {
       try {
         setEndpoints(JSON.parse(savedEndpoints));
         setApiInfo(JSON.parse(savedInfo));
         setSpecUrl(savedUrl);
+        setSpecId(savedSpecId);
         setLastLoaded(new Date(savedTime));
       } catch (err) {
         console.error("Failed to load saved spec:", err);
@@ -31,8 +39,66 @@ function OpenAPILoader({ onLoadEndpoint }) {
     }
   }, []);
 
+  function saveSpec(endpoints, info, spec_id, etag, loadedAt) {
+    sessionStorage.setItem('openapi_endpoints', JSON.stringify(endpoints));
+    sessionStorage.setItem('openapi_info', JSON.stringify(info));
+    sessionStorage.setItem('openapi_url', specUrl);
+    sessionStorage.setItem('openapi_loaded_at', loadedAt.toISOString());
+    sessionStorage.setItem('openapi_spec_id', spec_id);
+    sessionStorage.setItem('openapi_etag', etag || "");
+  }
+
+  // Loads through the event stream, showing endpoints page by page while a
+  // large spec is still downloading
+  async function streamSpec(headers) {
+    const res = await fetch("http://localhost:8000/api/load-openapi/stream", {
+      method: "POST",
+      headers,
+      body: JSON.stringify({ spec_url: specUrl }),
+    });
+    if (!res.ok) {
+      const data = await res.json();
+      throw new Error(data.detail || "Failed to load spec");
+    }
+
+    setEndpoints([]);
+    setApiInfo(null);
+    setDetails({});
+    setSelectedTags([]);
+    let loaded = [];
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let end;
+      while ((end = buffer.indexOf("\n\n")) !== -1) {
+        const frame = buffer.slice(0, end);
+        buffer = buffer.slice(end + 2);
+        const event = frame.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(frame.match(/^data: (.*)$/m)?.[1] || "{}");
+        if (event === "endpoints") {
+          loaded = loaded.concat(data.endpoints);
+          setEndpoints(loaded);
+        } else if (event === "error") {
+          throw new Error(data.detail || "Failed to load spec");
+        } else if (event === "done") {
+          const now = new Date();
+          setApiInfo(data.info);
+          setSpecId(data.spec_id);
+          setLastLoaded(now);
+          saveSpec(loaded, data.info, data.spec_id, data.etag, now);
+          return data.spec_id;
+        }
+      }
+    }
+    throw new Error("The spec stream ended before the load finished");
+  }
+
   async function loadSpec(isRefresh = false) {
-    if (!specUrl) return;
+    if (!specUrl) return null;
     
     if (isRefresh) {
       setRefreshing(true);
@@ -44,14 +110,33 @@ function OpenAPILoader({ onLoadEndpoint }) {
     
     try {
       const token = localStorage.getItem("token");
-      const res = await fetch("http://localhost:8000/api/load-openapi", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          "Authorization": `Bearer ${token}`,
-        },
-        body: JSON.stringify({ spec_url: specUrl }),
+      const headers = {
+        "Content-Type": "application/json",
+        "Authorization": `Bearer ${token}`,
+      };
+      if (!isRefresh || !specId) {
+        return await streamSpec(headers);
+      }
+      // Unchanged spec: the server answers 304 and we keep what we have
+      const savedEtag = sessionStorage.getItem('openapi_etag');
+      const refreshHeaders = { "Authorization": headers["Authorization"] };
+      if (savedEtag) {
+        refreshHeaders["If-None-Match"] = savedEtag;
+      }
+      const res = await fetch(`http://localhost:8000/api/openapi/${specId}`, {
+        headers: refreshHeaders,
       });
+      // The server dropped the spec (restart or eviction), load it from scratch
+      if (res.status === 404) {
+        return await streamSpec(headers);
+      }
+
+      const now = new Date();
+      if (res.status === 304) {
+        setLastLoaded(now);
+        sessionStorage.setItem('openapi_loaded_at', now.toISOString());
+        return specId;
+      }
       
       const data = await res.json();
       
@@ -61,21 +146,17 @@ function OpenAPILoader({ onLoadEndpoint }) {
       
       setEndpoints(data.endpoints);
       setApiInfo(data.info);
+      setSpecId(data.spec_id);
+      setDetails({});
+      setSelectedTags([]);
       
-      const now = new Date();
       setLastLoaded(now);
-      
-      // Save to sessionStorage
-      sessionStorage.setItem('openapi_endpoints', JSON.stringify(data.endpoints));
-      sessionStorage.setItem('openapi_info', JSON.stringify(data.info));
-      sessionStorage.setItem('openapi_url', specUrl);
-      sessionStorage.setItem('openapi_loaded_at', now.toISOString());
-      
-      if (isRefresh) {
-        setError(null);
-      }
+      saveSpec(data.endpoints, data.info, data.spec_id, res.headers.get("ETag"), now);
+      setError(null);
+      return data.spec_id;
     } catch (err) {
       setError(err.message);
+      return null;
     } finally {
       setLoading(false);
       setRefreshing(false);
@@ -89,24 +170,91 @@ function OpenAPILoader({ onLoadEndpoint }) {
     setLastLoaded(null);
     setError(null);
     setExpandedEndpoints({});
+    setDetails({});
+    setSpecId(null);
+    setSelectedTags([]);
     sessionStorage.removeItem('openapi_endpoints');
     sessionStorage.removeItem('openapi_info');
     sessionStorage.removeItem('openapi_url');
     sessionStorage.removeItem('openapi_loaded_at');
+    sessionStorage.removeItem('openapi_spec_id');
+    sessionStorage.removeItem('openapi_etag');
+  }
+
+  async function loadDetails(endpoint, id = specId, retried = false) {
+    const token = localStorage.getItem("token");
+    try {
+      const res = await fetch(
+        `http://localhost:8000/api/openapi/${id}/operations/${encodeURIComponent(endpoint.id)}`,
+        { headers: { "Authorization": `Bearer ${token}` } }
+      );
+      // The server dropped the spec (restart or eviction), load it again once
+      if (res.status === 404 && !retried) {
+        const newId = await loadSpec(false);
+        if (newId) await loadDetails(endpoint, newId, true);
+        return;
+      }
+      const data = await res.json();
+      if (!res.ok) {
+        throw new Error(data.detail || "Failed to load endpoint details");
+      }
+      setDetails(prev => ({ ...prev, [endpoint.id]: data }));
+    } catch (err) {
+      setError(err.message);
+    }
   }
 
-  function toggleEndpoint(idx) {
+  function toggleEndpoint(idx, endpoint) {
+    if (!expandedEndpoints[idx] && !details[endpoint.id]) {
+      loadDetails(endpoint);
+    }
     setExpandedEndpoints(prev => ({
       ...prev,
       [idx]: !prev[idx]
     }));
   }
 
-  const filteredEndpoints = endpoints.filter(e => 
-    e.path.toLowerCase().includes(searchTerm.toLowerCase()) ||
+  useEffect(() => {
+    if (!specId || (!searchTerm && selectedTags.length === 0)) {
+      setSearchResults(null);
+      return;
+    }
+    const controller = new AbortController();
+    // Wait for a pause in typing before searching
+    const timer = setTimeout(async () => {
+      const params = new URLSearchParams({ q: searchTerm, limit: "500" });
+      selectedTags.forEach(tag => params.append("tag", tag));
+      try {
+        const res = await fetch(
+          `http://localhost:8000/api/openapi/${specId}/search?${params}`,
+          {
+            headers: { "Authorization": `Bearer ${localStorage.getItem("token")}` },
+            signal: controller.signal,
+          }
+        );
+        // Falls back to filtering in the browser, e.g. when the server dropped the spec
+        setSearchResults(res.ok ? await res.json() : null);
+      } catch (err) {
+        if (err.name !== "AbortError") setSearchResults(null);
+      }
+    }, 150);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [searchTerm, selectedTags, specId]);
+
+  function toggleTag(tag) {
+    setSelectedTags(prev => prev.includes(tag) ? prev.filter(t => t !== tag) : [...prev, tag]);
+  }
+
+  const filteredEndpoints = searchResults ? searchResults.results : endpoints.filter(e => 
+    (e.path.toLowerCase().includes(searchTerm.toLowerCase()) ||
     e.summary.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    e.tags.some(t => t.toLowerCase().includes(searchTerm.toLowerCase()))
+    e.tags.some(t => t.toLowerCase().includes(searchTerm.toLowerCase()))) &&
+    selectedTags.every(tag => e.tags.includes(tag))
   );
+  const matchCount = searchResults ? searchResults.total : filteredEndpoints.length;
 
   const getMethodColor = (method) => {
     const colors = {
@@ -228,7 +376,7 @@ function OpenAPILoader({ onLoadEndpoint }) {
           <div className="border-b border-neutral-800 px-6 py-3">
             <div className="flex items-center justify-between gap-4">
               <h2 className="text-sm font-semibold text-white uppercase tracking-wide">
-                Available Endpoints ({filteredEndpoints.length})
+                Available Endpoints ({matchCount})
               </h2>
               <div className="relative">
                 <Search className="w-4 h-4 text-neutral-500 absolute left-3 top-1/2 -translate-y-1/2" />
@@ -240,6 +388,25 @@ function OpenAPILoader({ onLoadEndpoint }) {
                 />
               </div>
             </div>
+            {searchResults && searchResults.facets.tags.length > 0 && (
+              <div className="flex flex-wrap gap-2 mt-3">
+                {searchResults.facets.tags
+                  .filter(({ tag }, i) => i < 12 || selectedTags.includes(tag))
+                  .map(({ tag, count }) => (
+                    <button
+                      key={tag}
+                      onClick={() => toggleTag(tag)}
+                      className={`px-2 py-0.5 text-xs rounded border ${
+                        selectedTags.includes(tag)
+                          ? "bg-red-600 border-red-500 text-white"
+                          : "bg-neutral-900 border-neutral-700 text-neutral-400 hover:text-white"
+                      }`}
+                    >
+                      {tag} ({count})
+                    </button>
+                  ))}
+              </div>
+            )}
           </div>
 
           <div className="max-h-[600px] overflow-y-auto">
@@ -248,7 +415,9 @@ function OpenAPILoader({ onLoadEndpoint }) {
                 <p className="text-neutral-500 text-sm">No endpoints match your search</p>
               </div>
             ) : (
-              filteredEndpoints.map((endpoint, idx) => (
+              filteredEndpoints.map((endpoint, idx) => {
+                const detail = details[endpoint.id];
+                return (
                 <div
                   key={idx}
                   className="border-b border-neutral-800 last:border-b-0"
@@ -259,7 +428,7 @@ function OpenAPILoader({ onLoadEndpoint }) {
                     <div className="flex items-start justify-between gap-4">
                       <div 
                         className="flex-1 min-w-0 cursor-pointer"
-                        onClick={() => toggleEndpoint(idx)}
+                        onClick={() => toggleEndpoint(idx, endpoint)}
                       >
                         <div className="flex items-center gap-3 mb-2">
                           <span className={`px-2.5 py-1 rounded text-xs font-bold text-white ${getMethodColor(endpoint.method)}`}>
@@ -268,9 +437,9 @@ function OpenAPILoader({ onLoadEndpoint }) {
                           <span className="text-white text-sm font-mono">
                             {endpoint.url}
                           </span>
-                          {endpoint.examples && endpoint.examples.length > 0 && (
+                          {endpoint.example_count > 0 && (
                             <span className="px-2 py-0.5 bg-green-900 text-green-400 text-xs rounded">
-                              {endpoint.examples.length} example{endpoint.examples.length > 1 ? 's' : ''}
+                              {endpoint.example_count} example{endpoint.example_count > 1 ? 's' : ''}
                             </span>
                           )}
                           {expandedEndpoints[idx] ? (
@@ -282,8 +451,8 @@ function OpenAPILoader({ onLoadEndpoint }) {
                         {endpoint.summary && (
                           <p className="text-neutral-400 text-sm mb-2">{endpoint.summary}</p>
                         )}
-                        {endpoint.description && !endpoint.summary && (
-                          <p className="text-neutral-400 text-sm mb-2 line-clamp-2">{endpoint.description}</p>
+                        {detail?.description && !endpoint.summary && (
+                          <p className="text-neutral-400 text-sm mb-2 line-clamp-2">{detail.description}</p>
                         )}
                         {endpoint.tags.length > 0 && (
                           <div className="flex gap-2 flex-wrap">
@@ -298,16 +467,22 @@ function OpenAPILoader({ onLoadEndpoint }) {
                     </div>
 
                     {/* Expanded Details */}
-                    {expandedEndpoints[idx] && (
+                    {expandedEndpoints[idx] && !detail && (
+                      <div className="mt-4 flex items-center gap-2 text-neutral-500 text-xs">
+                        <Loader2 className="w-4 h-4 animate-spin" />
+                        Loading details...
+                      </div>
+                    )}
+                    {expandedEndpoints[idx] && detail && (
                       <div className="mt-4 space-y-3">
                         {/* Parameters */}
-                        {endpoint.parameters && endpoint.parameters.length > 0 && (
+                        {detail.parameters && detail.parameters.length > 0 && (
                           <div className="bg-neutral-900 rounded p-3 border border-neutral-800">
                             <h4 className="text-xs font-semibold text-neutral-400 uppercase tracking-wide mb-2">
                               Parameters
                             </h4>
                             <div className="space-y-2">
-                              {endpoint.parameters.map((param, i) => (
+                              {detail.parameters.map((param, i) => (
                                 <div key={i} className="text-xs">
                                   <div className="flex items-center gap-2">
                                     <span className="font-mono text-white">{param.name}</span>
@@ -330,24 +505,24 @@ function OpenAPILoader({ onLoadEndpoint }) {
                         )}
 
                         {/* Request Body Example */}
-                        {endpoint.requestBodyExample && (
+                        {detail.requestBodyExample && (
                           <div className="bg-neutral-900 rounded p-3 border border-neutral-800">
                             <h4 className="text-xs font-semibold text-neutral-400 uppercase tracking-wide mb-2">
                               Request Body Example
                             </h4>
                             <pre className="text-xs text-neutral-300 font-mono overflow-x-auto">
-                              {JSON.stringify(endpoint.requestBodyExample, null, 2)}
+                              {JSON.stringify(detail.requestBodyExample, null, 2)}
                             </pre>
                           </div>
                         )}
 
                         {/* Multiple Examples */}
-                        {endpoint.examples && endpoint.examples.length > 0 && (
+                        {detail.examples && detail.examples.length > 0 && (
                           <div className="space-y-2">
                             <h4 className="text-xs font-semibold text-neutral-400 uppercase tracking-wide">
                               Examples
                             </h4>
-                            {endpoint.examples.map((example, i) => (
+                            {detail.examples.map((example, i) => (
                               <div key={i} className="bg-neutral-900 rounded border border-neutral-800">
                                 <div className="px-3 py-2 border-b border-neutral-800 flex items-center justify-between">
                                   <span className="text-xs font-medium text-white">
@@ -356,7 +531,7 @@ function OpenAPILoader({ onLoadEndpoint }) {
                                   <button
                                     onClick={(e) => {
                                       e.stopPropagation();
-                                      onLoadEndpoint(endpoint, example);
+                                      onLoadEndpoint({ ...endpoint, ...detail }, example);
                                     }}
                                     className="px-2 py-1 bg-green-600 hover:bg-green-700 text-white rounded text-xs flex items-center gap-1"
                                   >
@@ -383,7 +558,7 @@ function OpenAPILoader({ onLoadEndpoint }) {
                         <button
                           onClick={(e) => {
                             e.stopPropagation();
-                            onLoadEndpoint(endpoint);
+                            onLoadEndpoint({ ...endpoint, ...detail });
                           }}
                           className="w-full px-4 py-2 bg-red-600 hover:bg-red-700 text-white rounded transition-colors flex items-center justify-center gap-2 text-sm font-medium"
                         >
@@ -394,7 +569,8 @@ function OpenAPILoader({ onLoadEndpoint }) {
                     )}
                   </div>
                 </div>
-              ))
+                );
+              })
             )}
           </div>
         </div>